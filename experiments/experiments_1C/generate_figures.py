@@ -0,0 +1,133 @@
+"""
+Render every figure of this directory in one invocation.
+
+Each generate_figure*.py script exposes render(cube), METRICS and ROLLUP.
+This driver loads each distinct rollup once (with the union of the metrics
+its figures need), places the cube arrays in shared memory and renders the
+figures in parallel on a pool of headless (Agg) worker processes. Workers
+attach to the shared cube instead of re-parsing or unpickling it.
+
+The printed data of each figure is captured and replayed in figure order,
+so the output is the same as running the scripts one after another.
+
+Renders are cached by content (see scripts/figure_cache.py): a figure whose
+input metrics and source are unchanged is restored from the cache instead
+of being drawn again. Pass --no-cache to always render.
+
+Usage:
+    python3 generate_figures.py [--rollup FILE] [--figures 1a,7,...] [--jobs N]
+                                [--cache-dir DIR | --no-cache]
+"""
+
+import argparse
+import glob
+import importlib
+import io
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'scripts'))
+from rollup_cube import load_cube, to_shared_memory, from_shared_memory
+from figure_cache import DEFAULT_CACHE, cached_render
+
+# Cubes attached by a worker process, keyed by rollup path
+_cubes = {}
+_blocks = []
+
+
+def discover():
+    """Return {figure name: module name} for every generate_figure*.py script."""
+    figures = {}
+    for path in sorted(glob.glob(os.path.join(HERE, 'generate_figure*.py'))):
+        module = os.path.splitext(os.path.basename(path))[0]
+        if path == os.path.abspath(__file__):
+            continue
+        figures[module[len('generate_figure'):]] = module
+    return figures
+
+
+def _attach(specs):
+    for path, spec in specs.items():
+        cube, blocks = from_shared_memory(spec)
+        _cubes[path] = cube
+        _blocks.extend(blocks)
+
+
+def _render(module, path, cache_dir):
+    t0 = time.time()
+    mod = importlib.import_module(module)
+    out = io.StringIO()
+    hit = False
+    with warnings.catch_warnings():
+        # plt.show() is a no-op under Agg
+        warnings.filterwarnings('ignore', message='.*non-interactive.*')
+        with redirect_stdout(out):
+            if cache_dir:
+                hit = cached_render(mod, _cubes[path], cache_dir)
+            else:
+                mod.render(_cubes[path])
+    plt.close('all')
+    return out.getvalue(), hit, time.time() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render all figures in parallel')
+    parser.add_argument('--rollup', help='rollup CSV or columnar directory used by every figure '
+                                         '(default: each figure\'s own ROLLUP)')
+    parser.add_argument('--figures', help='comma separated figures to render (default: all)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE, help='figure cache directory (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='always render, ignoring the figure cache')
+    args = parser.parse_args()
+
+    figures = discover()
+    names = list(figures)
+    if args.figures:
+        names = [n.strip() for n in args.figures.split(',') if n.strip()]
+        unknown = [n for n in names if n not in figures]
+        if unknown:
+            parser.error('unknown figure(s): %s (have: %s)' % (', '.join(unknown), ', '.join(figures)))
+
+    # Group figures by input so that each rollup is loaded once
+    modules = {n: importlib.import_module(figures[n]) for n in names}
+    inputs = {n: args.rollup or modules[n].ROLLUP for n in names}
+    metrics = {}
+    for n in names:
+        wanted = metrics.setdefault(inputs[n], [])
+        wanted.extend(m for m in modules[n].METRICS if m not in wanted)
+
+    blocks = []
+    try:
+        specs = {}
+        for path, wanted in metrics.items():
+            shm, specs[path] = to_shared_memory(load_cube(path, metrics=wanted))
+            blocks.extend(shm)
+
+        t0 = time.time()
+        jobs = max(1, min(args.jobs or 1, len(names)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_attach, initargs=(specs,)) as pool:
+            cache_dir = None if args.no_cache else args.cache_dir
+            futures = [pool.submit(_render, figures[n], inputs[n], cache_dir) for n in names]
+            for n, future in zip(names, futures):
+                output, hit, elapsed = future.result()
+                sys.stdout.write(output)
+                print('[figure %s] %s in %.1fs' % (n, 'cached' if hit else 'rendered', elapsed), file=sys.stderr)
+        print('Rendered %d figure(s) in %.1fs' % (len(names), time.time() - t0), file=sys.stderr)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import os
+import sys
+
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from rollup_cube import load_cube
+from bootstrap import bootstrap_means
+from multicore import core_count, sum_cores
+
+# 设置样式
+RC_PARAMS = {
+    'font.size': 12,
+    'axes.titlesize': 14,
+    'axes.labelsize': 13,
+    'legend.fontsize': 11,
+    'xtick.labelsize': 12,
+    'ytick.labelsize': 12,
+    'figure.titlesize': 15
+}
+
+# 四核rollup的核数（rollup_4C.mfile中每个核一组Core_<i>_*列）
+NCORES = 4
+
+# 需要的统计列（每个核一列，按核求和得到整个mix的LLC miss）
+miss_stats = ['LLC_load_miss', 'LLC_RFO_miss', 'LLC_prefetch_miss']
+
+METRICS = ['Core_%d_%s' % (i, stat) for stat in miss_stats for i in range(NCORES)]
+
+# 默认输入数据（rollup CSV或列式rollup目录）
+ROLLUP = 'rollup_4C.csv'
+
+# 定义预取器标签
+prefetcher_labels = ['SPP', 'Bingo', 'MLOP', 'Pythia']
+prefetcher_keys = ['spp', 'bingo', 'mlop', 'pythia']
+
+# 误差线的置信水平（对mix做bootstrap重采样）
+CI_LEVEL = 0.95
+
+# 定义颜色（按照堆叠顺序）
+colors = {
+    'coverage': '#4CAF50',      # 绿色 - 覆盖率（底部）
+    'uncovered': '#FFA726',     # 橙色 - 未覆盖率（中间）
+    'overprediction': '#EF5350' # 红色 - 过度预测率（顶部）
+}
+
+
+def calculate_miss_fractions(load_miss, read_miss):
+    """
+    对所有 (mix, 预取器) 一次计算相对于nopref的各个分数（第0列为nopref）
+    Coverage = (baseline_LLC_load_miss - prefetcher_LLC_load_miss) / baseline_LLC_load_miss
+    Overprediction = (prefetcher_read_miss - baseline_read_miss) / baseline_read_miss
+    Uncovered = 1 - Coverage
+    """
+    base_load = load_miss[:, :1]
+    base_read = read_miss[:, :1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        coverage = np.where(base_load > 0, np.clip((base_load - load_miss[:, 1:]) / base_load, 0, 1), 0.0)
+        overprediction = np.where(base_read > 0, np.maximum((read_miss[:, 1:] - base_read) / base_read, 0), 0.0)
+    return coverage, 1 - coverage, overprediction
+
+
+def render(cube):
+    """绘制四核图7并打印详细数据（cube为load_cube()返回的RollupCube）"""
+    plt.rcParams.update(RC_PARAMS)
+
+    mixes = cube.traces
+    available = [(label, key) for label, key in zip(prefetcher_labels, prefetcher_keys) if cube.has_exp(key)]
+    exps = ['nopref'] + [key for _, key in available]
+    ncores = core_count(cube, 'LLC_load_miss')
+
+    # ==================== 计算相关指标 ====================
+    # (mix, 实验) 的LLC miss，按核求和；LLC read misses = load + RFO + prefetch miss
+    load_miss = sum_cores(cube, 'LLC_load_miss', ncores, exps)
+    read_miss = load_miss + sum_cores(cube, 'LLC_RFO_miss', ncores, exps) + sum_cores(cube, 'LLC_prefetch_miss', ncores, exps)
+    valid = cube.mask(exps=exps)
+    usable = valid[:, :1] & valid[:, 1:]
+
+    coverage, uncovered, overprediction = calculate_miss_fractions(load_miss, read_miss)
+    coverage, uncovered, overprediction = (np.where(usable, m * 100, np.nan)
+                                           for m in (coverage, uncovered, overprediction))
+    total = coverage + uncovered + overprediction
+
+    labels = [label for label, _ in available]
+    avg_stats = {}
+    for j, pref_label in enumerate(labels):
+        if usable[:, j].any():
+            avg_stats[pref_label] = {
+                'avg_coverage': np.nanmean(coverage[:, j]),
+                'avg_uncovered': np.nanmean(uncovered[:, j]),
+                'avg_overprediction': np.nanmean(overprediction[:, j]),
+                'avg_total': np.nanmean(total[:, j])
+            }
+
+    # 平均覆盖率和平均过度预测率的bootstrap置信区间
+    coverage_ci = bootstrap_means(coverage, usable, labels=labels, level=CI_LEVEL)
+    overprediction_ci = bootstrap_means(overprediction, usable, labels=labels, level=CI_LEVEL)
+
+    # ==================== 创建图形 ====================
+    fig, ax = plt.subplots(figsize=(10, 7))
+
+    x = np.arange(len(prefetcher_labels))
+    width = 0.6
+
+    for i, pref_label in enumerate(prefetcher_labels):
+        if pref_label not in avg_stats:
+            continue
+        stats = avg_stats[pref_label]
+
+        # 堆叠顺序：覆盖率（底部）、未覆盖率（中间）、过度预测率（顶部）
+        bottom = 0
+        for part in ('coverage', 'uncovered', 'overprediction'):
+            ax.bar(x[i], stats['avg_' + part], width, bottom=bottom,
+                   color=colors[part], alpha=0.9,
+                   edgecolor='black', linewidth=1.2)
+            if stats['avg_' + part] > 5:
+                ax.text(x[i], bottom + stats['avg_' + part] / 2, f'{stats["avg_" + part]:.0f}%',
+                        ha='center', va='center', fontsize=10, fontweight='bold',
+                        color='black' if part == 'uncovered' else 'white')
+            bottom += stats['avg_' + part]
+
+        # 绘制覆盖率和总计的置信区间误差线
+        coverage_low, coverage_high = coverage_ci.interval(pref_label)
+        overpred_low, overpred_high = overprediction_ci.interval(pref_label)
+        base = stats['avg_total'] - stats['avg_overprediction']
+        ax.errorbar([x[i], x[i]], [stats['avg_coverage'], stats['avg_total']],
+                    yerr=[[stats['avg_coverage'] - coverage_low, stats['avg_overprediction'] - overpred_low],
+                          [coverage_high - stats['avg_coverage'], overpred_high - stats['avg_overprediction']]],
+                    fmt='none', ecolor='black', elinewidth=1.2, capsize=5)
+
+        # 在柱子顶部添加总计百分比
+        ax.text(x[i], base + overpred_high + 1.5, f'{stats["avg_total"]:.0f}%',
+                ha='center', va='bottom', fontsize=11, fontweight='bold')
+
+    # 设置图形属性
+    ax.set_xlabel('Prefetcher', fontsize=13)
+    ax.set_ylabel('Fraction of Baseline LLC Misses, All Cores (%)', fontsize=13)
+    ax.set_xticks(x)
+    ax.set_xticklabels(prefetcher_labels, fontsize=12)
+    ax.set_title(f'Figure 7 (4-core): Average Coverage and Overprediction of Prefetchers ({len(mixes)} mixes)',
+                 fontsize=15, fontweight='bold', pad=15)
+    ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+
+    max_total = max([stats['avg_total'] - stats['avg_overprediction'] + overprediction_ci.interval(pref)[1]
+                     for pref, stats in avg_stats.items()]) if avg_stats else 0
+    ax.set_ylim(0, max_total * 1.25)
+
+    # 添加100%参考线
+    ax.axhline(y=100, color='red', linestyle='--', linewidth=1.5, alpha=0.7)
+
+    legend_elements = [
+        mpatches.Patch(facecolor=colors['coverage'], edgecolor='black', linewidth=1.2,
+                       label='Coverage', alpha=0.9),
+        mpatches.Patch(facecolor=colors['uncovered'], edgecolor='black', linewidth=1.2,
+                       label='Uncovered', alpha=0.9),
+        mpatches.Patch(facecolor=colors['overprediction'], edgecolor='black', linewidth=1.2,
+                       label='Overprediction', alpha=0.9),
+        plt.Line2D([0], [0], color='red', linestyle='--', linewidth=1.5,
+                   label='Baseline (100%)')
+    ]
+    ax.legend(handles=legend_elements, loc='upper center', ncol=4, fontsize=11, frameon=True)
+
+    # 调整布局
+    plt.tight_layout()
+
+    # 保存图形
+    plt.savefig('figure7_4C_average_coverage_overprediction.png', dpi=300, bbox_inches='tight', pad_inches=0.1)
+    plt.savefig('figure7_4C_average_coverage_overprediction.pdf', bbox_inches='tight', pad_inches=0.1)
+
+    # 显示图形
+    plt.show()
+
+    # ==================== 打印详细数据 ====================
+    print("\n" + "="*80)
+    print("DETAILED ANALYSIS FOR FIGURE 7 (4-CORE)")
+    print("="*80)
+
+    print(f"\n{len(mixes)} mixes, {ncores} cores")
+
+    print("\n1. AVERAGE STATISTICS BY PREFETCHER:")
+    print("-"*96)
+    print(f"{'Prefetcher':<10} {'Coverage':<10} {f'{CI_LEVEL*100:.0f}% CI':<14} {'Uncovered':<10} "
+          f"{'Overpred':<10} {f'{CI_LEVEL*100:.0f}% CI':<14} {'Total':<10} {'# of Mixes':<10}")
+    print("-"*96)
+
+    for j, pref_label in enumerate(labels):
+        if pref_label in avg_stats:
+            stats = avg_stats[pref_label]
+            coverage_low, coverage_high = coverage_ci.interval(pref_label)
+            overpred_low, overpred_high = overprediction_ci.interval(pref_label)
+            print(f"{pref_label:<10} {stats['avg_coverage']:<10.1f} {f'{coverage_low:.1f}-{coverage_high:.1f}':<14} "
+                  f"{stats['avg_uncovered']:<10.1f} {stats['avg_overprediction']:<10.1f} "
+                  f"{f'{overpred_low:.1f}-{overpred_high:.1f}':<14} {stats['avg_total']:<10.1f} "
+                  f"{usable[:, j].sum():<10}")
+
+    print("\n2. DETAILED DATA FOR EACH MIX:")
+    print("-"*100)
+
+    rows, cols = np.nonzero(usable)
+    detailed_df = pd.DataFrame({
+        'Mix': [mixes[i] for i in rows],
+        'Prefetcher': [labels[j] for j in cols],
+        'Coverage_%': coverage[rows, cols],
+        'Uncovered_%': uncovered[rows, cols],
+        'Overprediction_%': overprediction[rows, cols],
+        'Total_%': total[rows, cols]
+    })
+    print(detailed_df.to_string(index=False, float_format=lambda x: f'{x:.1f}'))
+
+    print("\n3. PERFORMANCE RANKING:")
+    print("-"*50)
+
+    print("\nRanking by Coverage (highest to lowest):")
+    for rank, (pref, stats) in enumerate(sorted(avg_stats.items(), key=lambda s: s[1]['avg_coverage'], reverse=True), 1):
+        print(f"  {rank}. {pref}: {stats['avg_coverage']:.1f}%")
+
+    print("\nRanking by Overprediction (lowest to highest):")
+    for rank, (pref, stats) in enumerate(sorted(avg_stats.items(), key=lambda s: s[1]['avg_overprediction']), 1):
+        print(f"  {rank}. {pref}: {stats['avg_overprediction']:.1f}%")
+
+    print("\n4. INTERPRETATION:")
+    print("-"*50)
+    print("""
+- LLC misses of a mix are summed over all cores before comparing with the no prefetching run
+- Coverage: Percentage of baseline LLC load misses that were correctly prefetched
+- Uncovered: Remaining LLC load misses after prefetching
+- Overprediction: Additional LLC read misses due to incorrect prefetches
+- The shared LLC makes overprediction of one core cost the other cores of the mix
+""")
+
+
+if __name__ == '__main__':
+    # 读取数据（一次性加载为 Trace x Exp x Metric 数组，可传入CSV或列式rollup目录）
+    cube = load_cube(sys.argv[1] if len(sys.argv) > 1 else ROLLUP, metrics=METRICS)
+    render(cube)
@@ -0,0 +1,196 @@
+import os
+import sys
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'scripts'))
+from rollup_cube import load_cube
+from speedup import compute_speedups
+from bootstrap import bootstrap_speedups
+from multicore import mix_members, multicore_metrics
+
+# 设置样式
+RC_PARAMS = {
+    'font.size': 12,
+    'axes.titlesize': 14,
+    'axes.labelsize': 13,
+    'legend.fontsize': 11,
+    'xtick.labelsize': 12,
+    'ytick.labelsize': 12,
+    'figure.titlesize': 15
+}
+
+# 默认输入数据：四核rollup（rollup_4C.mfile）和单核隔离运行的rollup（需要Core_0_IPC）
+ROLLUP = 'rollup_4C.csv'
+ALONE_ROLLUP = os.path.join(HERE, '..', 'rollup_1C_base_config.csv')
+
+# 四核mix和单核trace的对应关系
+TLIST_FILE = os.path.join(HERE, '..', 'MICRO21_4C.tlist')
+ALONE_TLIST_FILE = os.path.join(HERE, '..', 'MICRO21_1C.tlist')
+
+# 隔离运行使用的实验（所有配置都与不使用预取器的单核运行比较）
+ALONE_EXP = 'nopref'
+
+# 误差线的置信水平（对mix做bootstrap重采样）
+CI_LEVEL = 0.95
+
+# 定义预取器
+prefetcher_labels = ['SPP', 'Bingo', 'MLOP', 'Pythia']
+prefetcher_keys = ['spp', 'bingo', 'mlop', 'pythia']
+
+# 定义颜色（为每个预取器分配不同颜色）
+colors = {
+    'SPP': '#1f77b4',    # 蓝色
+    'Bingo': '#2ca02c',  # 绿色
+    'MLOP': '#9467bd',   # 紫色
+    'Pythia': '#d62728'  # 红色
+}
+
+# 需要比较的多核指标
+speedup_metrics = {
+    'Weighted_Speedup': 'Weighted Speedup',
+    'Harmonic_Speedup': 'Harmonic Speedup'
+}
+
+
+def render(cube, alone_cube):
+    """绘制四核图9并打印详细数据（cube为四核rollup，alone_cube为单核隔离运行的rollup）"""
+    plt.rcParams.update(RC_PARAMS)
+
+    # ==================== 计算多核指标 ====================
+    # 一次计算所有 (mix, 预取器, 核) 的加权加速比、调和加速比和不公平性
+    members = mix_members(TLIST_FILE, ALONE_TLIST_FILE if os.path.isfile(ALONE_TLIST_FILE) else None)
+    mc = multicore_metrics(cube, alone_cube, members, alone_exp=ALONE_EXP)
+    mcube = mc.to_cube()
+
+    available_prefetchers = [(label, key) for label, key in zip(prefetcher_labels, prefetcher_keys)
+                             if mcube.has_exp(key)]
+    available_keys = [key for _, key in available_prefetchers]
+
+    # 相对nopref的归一化加速比（几何平均）及其bootstrap置信区间
+    speedups = {}
+    intervals = {}
+    for metric in speedup_metrics:
+        speedups[metric] = compute_speedups(mcube, metric=metric, baseline='nopref', exps=available_keys)
+        intervals[metric] = bootstrap_speedups(speedups[metric], level=CI_LEVEL)
+
+    # ==================== 创建图形 ====================
+    fig, axes = plt.subplots(1, len(speedup_metrics), figsize=(14, 7))
+
+    x = np.arange(len(prefetcher_labels))
+    width = 0.6
+
+    for ax, (metric, title) in zip(axes, speedup_metrics.items()):
+        result = speedups[metric]
+        ci = intervals[metric]
+        highs = []
+        for i, pref_label in enumerate(prefetcher_labels):
+            if pref_label not in dict(available_prefetchers):
+                continue
+            key = dict(available_prefetchers)[pref_label]
+            j = result.index(key)
+            if result.count[j] == 0:
+                continue
+            ratio = result.geomean[j]
+            low, high = ci.interval(key)
+            highs.append(high)
+
+            # 绘制柱状图及置信区间误差线
+            ax.bar(x[i], ratio, width,
+                   color=colors[pref_label], alpha=0.8,
+                   edgecolor='black', linewidth=1.5,
+                   yerr=[[ratio - low], [high - ratio]],
+                   error_kw={'elinewidth': 1.5, 'capsize': 6})
+
+            # 在误差线顶部添加数值标签
+            ax.text(x[i], high + 0.01, f'{ratio:.3f}',
+                    ha='center', va='bottom', fontsize=12, fontweight='bold')
+
+        ax.set_xlabel('Prefetcher', fontsize=13)
+        ax.set_ylabel(f'Normalized {title} (over No Prefetching)', fontsize=13)
+        ax.set_xticks(x)
+        ax.set_xticklabels(prefetcher_labels, fontsize=12)
+        ax.set_title(f'Geomean {title}', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3, axis='y', linestyle='--', linewidth=0.8)
+        ax.axhline(y=1.0, color='black', linestyle='--', linewidth=1.5, alpha=0.7)
+        if highs:
+            ax.set_ylim(min(0.8, min(result.geomean[result.count > 0]) * 0.95), max(highs) * 1.05)
+
+    fig.suptitle(f'Figure 9 (4-core): Multi-core Speedup of Prefetchers ({len(mc.mixes)} mixes)',
+                 fontsize=15, fontweight='bold')
+
+    # 调整布局
+    plt.tight_layout()
+
+    # 保存图形
+    plt.savefig('figure9_4C_multicore_speedup.png', dpi=300, bbox_inches='tight', pad_inches=0.1)
+    plt.savefig('figure9_4C_multicore_speedup.pdf', bbox_inches='tight', pad_inches=0.1)
+
+    # 显示图形
+    plt.show()
+
+    # ==================== 打印详细数据 ====================
+    print("\n" + "="*80)
+    print("DETAILED ANALYSIS FOR FIGURE 9 (4-CORE)")
+    print("="*80)
+
+    print(f"\n{len(mc.mixes)} mixes, {mc.ncores} cores, isolation runs: {ALONE_EXP}")
+
+    print("\n1. NORMALIZED MULTI-CORE SPEEDUP BY PREFETCHER:")
+    print("-"*90)
+    print(f"{'Prefetcher':<10} {'Weighted':<10} {f'{CI_LEVEL*100:.0f}% CI':<16} "
+          f"{'Harmonic':<10} {f'{CI_LEVEL*100:.0f}% CI':<16} {'Unfairness':<11} {'# of Mixes':<10}")
+    print("-"*90)
+
+    for pref_label, key in available_prefetchers:
+        row = f"{pref_label:<10} "
+        for metric in speedup_metrics:
+            result = speedups[metric]
+            j = result.index(key)
+            low, high = intervals[metric].interval(key)
+            row += f"{result.geomean[j]:<10.3f} {f'{low:.3f}-{high:.3f}':<16} "
+        j = mc.exps.index(key)
+        unfairness = np.nanmean(mc.unfairness[:, j]) if mc.valid[:, j].any() else np.nan
+        row += f"{unfairness:<11.3f} {speedups['Weighted_Speedup'].count[speedups['Weighted_Speedup'].index(key)]:<10}"
+        print(row)
+
+    print("\n2. DETAILED DATA FOR EACH MIX:")
+    print("-"*100)
+
+    detailed_df = mc.frame()
+    detailed_df = detailed_df[detailed_df['Exp'].isin(['nopref'] + available_keys)]
+    detailed_df = detailed_df.rename(columns={'Trace': 'Mix'}).drop(columns='Alone_Exp')
+    print(detailed_df.to_string(index=False, float_format=lambda x: f'{x:.3f}'))
+
+    print("\n3. PERFORMANCE RANKING:")
+    print("-"*50)
+
+    ranking = sorted([(label, speedups['Weighted_Speedup'].geomean[speedups['Weighted_Speedup'].index(key)], key)
+                      for label, key in available_prefetchers], key=lambda r: r[1], reverse=True)
+    print("\nRanking by Normalized Weighted Speedup (highest to lowest):")
+    for rank, (pref, ratio, key) in enumerate(ranking, 1):
+        line = f"  {rank}. {pref}: {ratio:.3f} ({(ratio-1.0)*100:+.1f}%)"
+        if rank > 1:
+            # 在bootstrap重采样中优于第一名的比例
+            prob = intervals['Weighted_Speedup'].prob_greater(key, ranking[0][2])
+            line += f", P(> {ranking[0][0]}) = {prob*100:.1f}%"
+        print(line)
+
+    print("\n4. INTERPRETATION:")
+    print("-"*50)
+    print("""
+- Weighted Speedup: sum over cores of IPC_shared / IPC_alone
+- Harmonic Speedup: cores / sum over cores of IPC_alone / IPC_shared
+- Unfairness: max slowdown / min slowdown over the cores of a mix (1.0 = fair)
+- Normalized values are per-mix ratios over the no prefetching run of the same mix,
+  averaged with the geometric mean
+""")
+
+
+if __name__ == '__main__':
+    # 读取数据（一次性加载为 Trace x Exp x Metric 数组，可传入CSV或列式rollup目录）
+    cube = load_cube(sys.argv[1] if len(sys.argv) > 1 else ROLLUP)
+    alone_cube = load_cube(sys.argv[2] if len(sys.argv) > 2 else ALONE_ROLLUP, metrics=['Core_0_IPC'])
+    render(cube, alone_cube)
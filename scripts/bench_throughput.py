@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Simulation throughput of ChampSim with every prefetcher configuration.
+
+Runs every trace of a short trace list with every config/*.ini (with the
+matching --l2c_prefetcher_types, as in MICRO21_1C.exp) on a short
+warmup + simulation window and measures, per run:
+
+    KIPS     simulated kilo-instructions per wall-clock second, from the
+             heartbeat lines (timestamped here as they are printed, since
+             the simulator's own clock only has whole seconds), so trace
+             decoder start-up and the final stats dump do not count
+    Wall_s   wall-clock time of the whole run
+    CPU_s    user + system time of the simulator
+    RSS_MB   peak resident set size of the simulator
+
+The results are stored per git commit of $PYTHIA_HOME (a commit with local
+changes gets a `-dirty` key) in a JSON file, and every configuration is
+compared with a baseline run: the geometric mean KIPS over the traces must
+not drop by more than --threshold percent, otherwise the configuration is
+flagged and the script exits with 1. The baseline is --baseline, or the
+latest other stored run of the same host and window.
+
+Example:
+    python3 bench_throughput.py --exe $PYTHIA_HOME/bin/perceptron-multi-multi-no-ship-1core \\
+        --configs nopref stride pythia --repeat 3
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import shlex
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from exp_files import parse_tlist
+from run_jobs import substitute_hooks
+
+DEFAULT_STORE = 'bench_throughput.json'
+DEFAULT_THRESHOLD = 10.0
+# the smoke window of MICRO21_1C.exp
+DEFAULT_WARMUP = 1000000
+DEFAULT_SIMULATION = 4000000
+
+# --l2c_prefetcher_types of a config file, where it is not the file name
+# (nopref.ini sets its own)
+PREFETCHER_TYPES = {'pythia': 'scooby'}
+
+_HEARTBEAT = re.compile(r'Heartbeat CPU\s+(\d+) instructions:\s+(\d+)')
+
+
+def config_knobs(path):
+    """Simulator knobs that select the prefetcher of a config/*.ini file."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path) as fh:
+        sets_type = any(line.split('=')[0].strip() == 'l2c_prefetcher_types' for line in fh)
+    if sets_type:
+        return '--config=%s' % path
+    return '--l2c_prefetcher_types=%s --config=%s' % (PREFETCHER_TYPES.get(name, name), path)
+
+
+def measure(argv):
+    """
+    Run one simulation; return its measurements, or raise RuntimeError
+    with the end of its output if it fails.
+    """
+    start = time.monotonic()
+    # per CPU: (time, instructions) of the first and the last heartbeat
+    first, last = {}, {}
+    tail = []
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace')
+    for line in proc.stdout:
+        now = time.monotonic()
+        m = _HEARTBEAT.match(line)
+        if m:
+            cpu, instructions = int(m.group(1)), int(m.group(2))
+            first.setdefault(cpu, (now, instructions))
+            last[cpu] = (now, instructions)
+        tail = (tail + [line])[-20:]
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.monotonic() - start
+    if proc.returncode != 0:
+        raise RuntimeError('exit %d:\n%s' % (proc.returncode, ''.join(tail)))
+    if not last:
+        raise RuntimeError('no heartbeat:\n%s' % ''.join(tail))
+    instructions = sum(last[cpu][1] - first[cpu][1] for cpu in last)
+    span = max(t for t, _ in last.values()) - min(t for t, _ in first.values())
+    return {
+        'KIPS': instructions / span / 1000 if span > 0 else float('nan'),
+        'Wall_s': wall,
+        'CPU_s': usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is in KB on Linux
+        'RSS_MB': usage.ru_maxrss / 1024,
+    }
+
+
+def bench(exe, traces, configs, warmup, simulation, repeat=1, jobs=1, pythia_home=None):
+    """
+    Run every (config, trace) pair `repeat` times and keep the fastest run.
+    Return {config name: {trace name: measurements}}; failed runs are left out.
+    """
+    pythia_home = pythia_home or os.environ['PYTHIA_HOME']
+    window = '--warmup_instructions=%d --simulation_instructions=%d' % (warmup, simulation)
+    runs = []
+    for path in configs:
+        config = os.path.splitext(os.path.basename(path))[0]
+        for trace in traces:
+            cmdline = '%s %s %s %s -traces %s' % (exe, window, config_knobs(path), trace.get('KNOBS', ''),
+                                                  trace['TRACE'])
+            cmdline = substitute_hooks(cmdline, config, trace['NAME'], len(trace['TRACE'].split()), pythia_home)
+            runs.append((config, trace['NAME'], shlex.split(cmdline)))
+
+    def run(item):
+        config, trace, argv = item
+        best = None
+        for _ in range(repeat):
+            try:
+                result = measure(argv)
+            except RuntimeError as e:
+                print('%s %s FAILED (%s)' % (config, trace, e), file=sys.stderr, flush=True)
+                return config, trace, None
+            if best is None or result['KIPS'] > best['KIPS']:
+                best = result
+        print('%-12s %-30s %8.1f KIPS %7.1f MB' % (config, trace, best['KIPS'], best['RSS_MB']),
+              file=sys.stderr, flush=True)
+        return config, trace, best
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for config, trace, result in pool.map(run, runs):
+            if result is not None:
+                results.setdefault(config, {})[trace] = result
+    return results
+
+
+def git_revision(path):
+    """Commit of the repository at `path`, with -dirty if tracked files changed, or None."""
+    try:
+        sha = subprocess.check_output(['git', '-C', path, 'rev-parse', 'HEAD'],
+                                      stderr=subprocess.DEVNULL, text=True).strip()
+        dirty = subprocess.check_output(['git', '-C', path, 'status', '--porcelain', '--untracked-files=no'],
+                                        stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sha + ('-dirty' if dirty else '')
+
+
+class BenchStore(object):
+    """Benchmark runs by revision, with the host and window they ran on."""
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.runs = {}
+        if os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            if data.get('version') == self.VERSION:
+                self.runs = data['runs']
+
+    def put(self, revision, host, window, exe, results):
+        run = self.runs.get(revision)
+        if run is None or run['host'] != host or run['window'] != window:
+            run = self.runs[revision] = {'host': host, 'window': window, 'results': {}}
+        run['exe'] = exe
+        run['time'] = time.time()
+        run['results'].update(results)
+
+    def baseline(self, revision):
+        """Latest other run on the same host and window as `revision`."""
+        run = self.runs[revision]
+        others = [(r['time'], rev) for rev, r in self.runs.items()
+                  if rev != revision and r['host'] == run['host'] and r['window'] == run['window']]
+        return max(others)[1] if others else None
+
+    def save(self):
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump({'version': self.VERSION, 'runs': self.runs}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def git_revision_of(path, rev):
+    """Full commit id of `rev` in the repository at `path`, or None."""
+    try:
+        return subprocess.check_output(['git', '-C', path, 'rev-parse', '--verify', rev + '^{commit}'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def stored_revision(store, path, rev):
+    """Key of the stored run of revision `rev` (a key, or anything git rev-parse takes), or None."""
+    if rev in store.runs:
+        return rev
+    sha = git_revision_of(path, rev)
+    for key in (sha, '%s-dirty' % sha):
+        if sha and key in store.runs:
+            return key
+    return None
+
+
+def geomean(values):
+    values = [v for v in values if v > 0]
+    return math.exp(sum(math.log(v) for v in values) / len(values)) if values else float('nan')
+
+
+def compare(current, baseline, threshold):
+    """
+    Summarize every configuration of `current` against `baseline` (results
+    of BenchStore runs, baseline may be None) over the traces both ran.
+    Return the rows (config, KIPS, baseline KIPS, change %, RSS MB, flagged).
+    """
+    rows = []
+    for config, traces in sorted(current.items()):
+        base = (baseline or {}).get(config, {})
+        common = [t for t in traces if t in base] if base else list(traces)
+        kips = geomean([traces[t]['KIPS'] for t in common])
+        rss = max(traces[t]['RSS_MB'] for t in traces)
+        if base and common:
+            base_kips = geomean([base[t]['KIPS'] for t in common])
+            change = 100.0 * (kips / base_kips - 1)
+            rows.append((config, kips, base_kips, change, rss, change < -threshold))
+        else:
+            rows.append((config, kips, None, None, rss, False))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ChampSim throughput with every prefetcher configuration')
+    parser.add_argument('--exe', help='ChampSim executable')
+    parser.add_argument('--tlist', help='trace list (default: $PYTHIA_HOME/experiments/MICRO21_1C.tlist)')
+    parser.add_argument('--configs', nargs='+', help='configurations to run, by name (default: all of config/*.ini)')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='warmup instructions (default: %(default)s)')
+    parser.add_argument('--simulation', type=int, default=DEFAULT_SIMULATION,
+                        help='simulation instructions (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per (config, trace); the fastest counts (default: 1)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='concurrent simulations (default: 1; more perturb the measurements)')
+    parser.add_argument('--store', help='result store (default: $PYTHIA_HOME/%s)' % DEFAULT_STORE)
+    parser.add_argument('--baseline', help='revision to compare with (default: the latest other stored run)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='flag slowdowns of more than this many percent (default: %(default)s)')
+    parser.add_argument('--report', action='store_true', help='do not run, compare the stored run of this revision')
+    args = parser.parse_args()
+
+    if 'PYTHIA_HOME' not in os.environ:
+        sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+    pythia_home = os.environ['PYTHIA_HOME']
+    revision = git_revision(pythia_home) or 'unknown'
+    store = BenchStore(args.store or os.path.join(pythia_home, DEFAULT_STORE))
+
+    if not args.report:
+        if not args.exe:
+            sys.exit('Supply exe')
+        configs = sorted(glob.glob(os.path.join(pythia_home, 'config', '*.ini')))
+        if args.configs:
+            known = {os.path.splitext(os.path.basename(c))[0]: c for c in configs}
+            unknown = [c for c in args.configs if c not in known]
+            if unknown:
+                sys.exit('unknown configs: %s' % ', '.join(unknown))
+            configs = [known[c] for c in args.configs]
+        traces = parse_tlist(args.tlist or os.path.join(pythia_home, 'experiments', 'MICRO21_1C.tlist'))
+        results = bench(args.exe, traces, configs, args.warmup, args.simulation, args.repeat, args.jobs, pythia_home)
+        store.put(revision, socket.gethostname(), [args.warmup, args.simulation], args.exe, results)
+        store.save()
+    elif revision not in store.runs:
+        sys.exit('no stored run of %s' % revision)
+
+    if args.baseline:
+        baseline = stored_revision(store, pythia_home, args.baseline)
+        if baseline is None:
+            sys.exit('no stored run of %s' % args.baseline)
+    else:
+        baseline = store.baseline(revision)
+
+    print('revision %s, baseline %s' % (revision, baseline or 'none'))
+    rows = compare(store.runs[revision]['results'], store.runs[baseline]['results'] if baseline else None,
+                   args.threshold)
+    print('%-12s %10s %10s %8s %9s' % ('Config', 'KIPS', 'Base_KIPS', 'Change', 'RSS_MB'))
+    for config, kips, base_kips, change, rss, flagged in rows:
+        print('%-12s %10.1f %10s %8s %9.1f%s' % (
+            config, kips, '-' if base_kips is None else '%.1f' % base_kips,
+            '-' if change is None else '%+.1f%%' % change, rss, '  SLOWDOWN' if flagged else ''))
+    slow = [row[0] for row in rows if row[5]]
+    if slow:
+        print('%d configs slowed down by more than %.0f%%: %s' % (len(slow), args.threshold, ', '.join(slow)),
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Vectorized bootstrap confidence intervals over traces.
+
+A geomean speedup over a handful of traces says little about whether one
+prefetcher really beats another: a single trace can move it by a few
+percent. bootstrap_means() resamples the traces with replacement and
+recomputes the (geometric) means of all columns for every resample at
+once. A resample is a row of multinomial trace counts, so `resamples`
+resamples are a (resamples, traces) weight matrix and the resampled sums
+of every column are one matrix product. The same resamples are used for
+all columns, which keeps the comparison between columns paired: the
+fraction of resamples in which column a beats column b (prob_greater) is
+the bootstrap probability that a beats b on this trace population.
+
+Cells that are not usable (missing or invalid runs) carry zero weight, so
+the resampled mean of a column only covers its usable traces.
+
+Usage:
+    from bootstrap import bootstrap_speedups
+    ci = bootstrap_speedups(compute_speedups(cube, exps=['spp', 'pythia']))
+    ci.low, ci.high, ci.prob_greater('pythia', 'spp')
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESAMPLES = 10000
+
+# Upper bound of the weight matrix chunk, in elements
+_CHUNK_ELEMENTS = 1 << 24
+
+
+def weight_chunks(n, resamples=DEFAULT_RESAMPLES, seed=0, chunk=None):
+    """
+    Yield (resamples, n) float64 matrices of bootstrap trace counts in
+    chunks of at most `chunk` rows: every row is the number of times each
+    of the n traces is drawn when n traces are drawn with replacement.
+    """
+    rng = np.random.default_rng(seed)
+    chunk = chunk or max(1, _CHUNK_ELEMENTS // max(n, 1))
+    pvals = np.full(n, 1.0 / n)
+    for start in range(0, resamples, chunk):
+        rows = min(chunk, resamples - start)
+        yield rng.multinomial(n, pvals, size=rows).astype(np.float64)
+
+
+def trace_weights(n, resamples=DEFAULT_RESAMPLES, seed=0):
+    """Return all bootstrap trace counts as one (resamples, n) matrix."""
+    return np.vstack(list(weight_chunks(n, resamples, seed, chunk=resamples)))
+
+
+class BootstrapResult(object):
+    """
+    Bootstrap distribution of the means of `labels`.
+
+    estimate  -- (k,) means on the original sample
+    samples   -- (resamples, k) resampled means; NaN where a resample drew
+                 no usable trace of a column
+    low, high -- (k,) percentile confidence bounds at `level`
+    """
+
+    def __init__(self, labels, estimate, samples, level):
+        self.labels = list(labels)
+        self.estimate = estimate
+        self.samples = samples
+        self.level = level
+        tail = (1.0 - level) / 2 * 100
+        with warnings.catch_warnings():
+            # Columns without any usable trace have all-NaN samples
+            warnings.simplefilter('ignore', RuntimeWarning)
+            bounds = np.nanpercentile(samples, [tail, 100 - tail], axis=0).reshape(2, samples.shape[1])
+        self.low, self.high = bounds
+
+    def index(self, label):
+        return self.labels.index(label)
+
+    def interval(self, label):
+        j = self.index(label)
+        return self.low[j], self.high[j]
+
+    def yerr(self, labels=None, scale=1.0):
+        """
+        Return the (2, k) asymmetric error bar lengths for matplotlib's
+        errorbar()/bar(yerr=) around estimate * scale.
+        """
+        cols = [self.index(l) for l in labels] if labels is not None else slice(None)
+        est, low, high = self.estimate[cols], self.low[cols], self.high[cols]
+        return np.vstack([(est - low) * scale, (high - est) * scale])
+
+    def prob_greater(self, a, b):
+        """Fraction of resamples in which the mean of `a` exceeds that of `b`."""
+        sa = self.samples[:, self.index(a)]
+        sb = self.samples[:, self.index(b)]
+        both = ~(np.isnan(sa) | np.isnan(sb))
+        return float(np.mean(sa[both] > sb[both])) if both.any() else np.nan
+
+    def summary(self):
+        """Estimate and bounds as a DataFrame indexed by label."""
+        return pd.DataFrame({'Estimate': self.estimate, 'Low': self.low, 'High': self.high},
+                            index=pd.Index(self.labels))
+
+
+def bootstrap_means(values, usable=None, labels=None, groups=None, log=False,
+                    resamples=DEFAULT_RESAMPLES, level=0.95, seed=0):
+    """
+    Bootstrap the column means of a (traces, k) array.
+
+    usable -- (traces, k) mask of the cells that enter the means
+              (default: finite cells)
+    groups -- optional (k,) group label per column; the columns of a group
+              are pooled into one mean over all of their usable cells,
+              with the traces resampled jointly
+    log    -- average in log space, i.e. bootstrap geometric means
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if usable is None:
+        usable = np.isfinite(values)
+    usable = np.asarray(usable, dtype=bool).reshape(values.shape)
+    if log:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            usable = usable & (values > 0)
+    data = np.zeros(values.shape)
+    if log:
+        np.log(values, out=data, where=usable)
+    else:
+        np.copyto(data, values, where=usable)
+    count = usable.astype(np.float64)
+
+    if groups is not None:
+        groups = list(groups)
+        names = list(dict.fromkeys(groups))
+        member = np.zeros((len(groups), len(names)))
+        member[np.arange(len(groups)), [names.index(g) for g in groups]] = 1.0
+        data, count = data @ member, count @ member
+        labels = names
+    elif labels is None:
+        labels = list(range(values.shape[1]))
+
+    n, k = data.shape
+    with np.errstate(invalid='ignore', divide='ignore'):
+        estimate = data.sum(axis=0) / count.sum(axis=0)
+    samples = np.full((resamples, k), np.nan)
+    if n:
+        start = 0
+        for w in weight_chunks(n, resamples, seed):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                samples[start:start + len(w)] = (w @ data) / (w @ count)
+            start += len(w)
+    if log:
+        estimate = np.exp(estimate)
+        samples = np.exp(samples)
+    return BootstrapResult(labels, estimate, samples, level)
+
+
+def bootstrap_speedups(speedups, resamples=DEFAULT_RESAMPLES, level=0.95, seed=0, geometric=True):
+    """
+    Bootstrap the geomean (or, with geometric=False, the arithmetic mean)
+    speedup of every experiment of a SpeedupResult.
+    """
+    return bootstrap_means(speedups.ratios, speedups.usable, labels=speedups.exps, log=geometric,
+                           resamples=resamples, level=level, seed=seed)
@@ -0,0 +1,384 @@
+"""
+Functional L1D/L2C/LLC model for screening prefetchers without a timing run.
+
+The load and store stream of a trace (champsim_trace.py) goes through a
+hierarchy of set-associative LRU caches with the geometry of inc/cache.h.
+The misses of one level are the accesses of the next. A level may have a
+prefetcher. Its requests are generated from the demand accesses of that
+level and inserted right after the access that triggered them; a request
+that hits is dropped and one that misses fills the line (and goes on to the
+next level as a prefetch access). The counters use ChampSim's stat names
+(LLC_load_miss, LLC_RFO_miss, LLC_prefetch_miss, ...), and miss_fractions()
+turns a baseline and a prefetched run into the coverage, uncovered and
+overprediction fractions of calculate_miss_fractions() in Figure 7.
+
+Everything is batched:
+  - the reference prefetchers (next_line, stride, streamer) follow
+    prefetcher/*.cc but find the previous access of the same PC (stride)
+    or page (streamer) for all accesses at once by sorting, instead of
+    going access by access through a bounded tracker table (the table is
+    unbounded here);
+  - a cache level sorts its accesses by set and steps through all sets in
+    lockstep: step k applies the k-th access of every set, which keeps the
+    per-set order, and LRU is exact.
+
+There is no timing: prefetches are never late, and writebacks are not
+modeled. Records are processed in chunks; the cache contents carry over,
+while the prefetcher training restarts at every chunk.
+
+Usage:
+    from cache_model import CacheModel, miss_fractions
+    base = CacheModel().run(read_chunks(path, count=10000000))
+    pref = CacheModel(prefetcher='stride').run(read_chunks(path, count=10000000))
+    coverage, uncovered, overprediction = miss_fractions(base, pref)
+
+Command line:
+    python3 cache_model.py trace.champsimtrace.xz [...] --prefetchers next_line stride streamer:degree=8
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from champsim_trace import read_chunks
+
+LOG2_BLOCK_SIZE = 6
+LOG2_PAGE_SIZE = 12
+BLOCKS_PER_PAGE = 1 << (LOG2_PAGE_SIZE - LOG2_BLOCK_SIZE)
+
+# Access types, as in ChampSim
+LOAD, RFO, PREFETCH = 0, 1, 2
+TYPE_NAMES = {LOAD: 'load', RFO: 'RFO', PREFETCH: 'prefetch'}
+
+# (name, sets, ways) of the single-core hierarchy (inc/cache.h)
+L1D = ('L1D', 64, 8)
+L2C = ('L2C', 512, 8)
+LLC = ('LLC', 2048, 16)
+
+DEFAULT_RECORDS = 10000000
+
+
+def _previous_in_group(keys):
+    """
+    Return (order, prev): `order` sorts the accesses by key, keeping
+    program order within a key, and prev[i] tells whether sorted access i
+    has an earlier access with the same key.
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    prev = np.zeros(len(keys), dtype=bool)
+    prev[1:] = sorted_keys[1:] == sorted_keys[:-1]
+    return order, prev
+
+
+def _candidates(trigger, page, start, step, degree, first):
+    """
+    Prefetch lines start + step * (first..first+degree-1) of each trigger,
+    stopping at the first offset that leaves the page.
+    Return (trigger index, slot, line) arrays.
+    """
+    k = np.arange(first, first + degree)
+    offsets = start[:, None] + step[:, None] * k[None, :]
+    inside = np.logical_and.accumulate((offsets >= 0) & (offsets < BLOCKS_PER_PAGE), axis=1)
+    lines = page[:, None] * BLOCKS_PER_PAGE + offsets
+    rows, slots = np.nonzero(inside)
+    return trigger[rows], slots, lines[rows, slots]
+
+
+class NextLine(object):
+    """next_line.cc: `degree` lines at `delta` steps after every access."""
+
+    def __init__(self, degree=2, delta=1):
+        self.degree = int(degree)
+        self.delta = int(delta)
+
+    def generate(self, lines, pcs):
+        n = len(lines)
+        return _candidates(np.arange(n), lines // BLOCKS_PER_PAGE, lines % BLOCKS_PER_PAGE,
+                           np.full(n, self.delta), self.degree, 1)
+
+
+class Stride(object):
+    """
+    stride.cc: per-PC stride in lines; an access whose stride repeats the
+    previous one of its PC prefetches `degree` lines at that stride
+    (starting at the accessed line, as stride.cc does). Accesses to the
+    same line as the previous one of the PC are ignored.
+    """
+
+    def __init__(self, degree=2):
+        self.degree = int(degree)
+
+    def generate(self, lines, pcs):
+        order, prev = _previous_in_group(pcs)
+        lines_s = lines[order]
+        stride = np.zeros(len(lines), dtype=np.int64)
+        stride[1:] = lines_s[1:] - lines_s[:-1]
+        # trained accesses: a tracker exists and the stride is not zero
+        trained = prev & (stride != 0)
+        kept = np.nonzero(trained)[0]
+        same_pc = np.zeros(len(kept), dtype=bool)
+        same_pc[1:] = pcs[order[kept[1:]]] == pcs[order[kept[:-1]]]
+        match = np.zeros(len(kept), dtype=bool)
+        match[1:] = same_pc[1:] & (stride[kept[1:]] == stride[kept[:-1]])
+        hits = kept[match]
+        trigger = order[hits]
+        return _candidates(trigger, lines[trigger] // BLOCKS_PER_PAGE, lines[trigger] % BLOCKS_PER_PAGE,
+                           stride[hits], self.degree, 0)
+
+
+class Streamer(object):
+    """
+    streamer.cc: per-page direction of the line offset; an access that
+    moves in the same direction as the previous one in its page prefetches
+    the next `degree` lines in that direction. Accesses to the same
+    offset as the previous one in the page are ignored.
+    """
+
+    def __init__(self, degree=5):
+        self.degree = int(degree)
+
+    def generate(self, lines, pcs):
+        pages = lines // BLOCKS_PER_PAGE
+        order, prev = _previous_in_group(pages)
+        offsets_s = (lines % BLOCKS_PER_PAGE)[order]
+        diff = np.zeros(len(lines), dtype=np.int64)
+        diff[1:] = offsets_s[1:] - offsets_s[:-1]
+        kept = np.nonzero(prev & (diff != 0))[0]
+        direction = np.sign(diff[kept])
+        same_page = np.zeros(len(kept), dtype=bool)
+        same_page[1:] = pages[order[kept[1:]]] == pages[order[kept[:-1]]]
+        match = np.zeros(len(kept), dtype=bool)
+        match[1:] = same_page[1:] & (direction[1:] == direction[:-1])
+        trigger = order[kept[match]]
+        return _candidates(trigger, pages[trigger], lines[trigger] % BLOCKS_PER_PAGE,
+                           direction[match], self.degree, 1)
+
+
+PREFETCHERS = {
+    'next_line': NextLine,
+    'stride': Stride,
+    'streamer': Streamer,
+}
+
+
+def make_prefetcher(spec):
+    """Build a prefetcher from 'name' or 'name:key=value,...', e.g. 'streamer:degree=8'."""
+    if spec is None or spec in ('', 'none', 'no'):
+        return None
+    name, _, args = spec.partition(':')
+    if name not in PREFETCHERS:
+        raise ValueError('unknown prefetcher %s (known: %s)' % (name, ', '.join(sorted(PREFETCHERS))))
+    kwargs = dict(arg.split('=', 1) for arg in args.split(',') if arg)
+    return PREFETCHERS[name](**kwargs)
+
+
+class CacheLevel(object):
+    """
+    Contents of one set-associative LRU cache. Every block holds its line
+    address, the time of its last use and whether it was brought in by a
+    prefetch and not used since.
+    """
+
+    def __init__(self, name, sets, ways, prefetcher=None):
+        self.name = name
+        self.sets = sets
+        self.ways = ways
+        self.prefetcher = prefetcher
+        self.lines = np.full((sets, ways), -1, dtype=np.int64)
+        self.stamp = np.full((sets, ways), -1, dtype=np.int64)
+        self.prefetched = np.zeros((sets, ways), dtype=bool)
+        self.clock = 0
+
+    def access(self, lines, is_prefetch):
+        """
+        Apply a stream of accesses in order. Return (hit, useful): whether
+        each access hit and whether it was a demand hit on a prefetched block.
+        """
+        n = len(lines)
+        hit = np.zeros(n, dtype=bool)
+        useful = np.zeros(n, dtype=bool)
+        if n == 0:
+            return hit, useful
+        sets = lines % self.sets
+        order = np.argsort(sets, kind='stable')
+        counts = np.bincount(sets, minlength=self.sets)
+        starts = np.cumsum(counts) - counts
+        time = self.clock + np.arange(n)
+        active = np.nonzero(counts)[0]
+        for k in range(counts.max()):
+            active = active[counts[active] > k]
+            idx = order[starts[active] + k]
+            line = lines[idx]
+            match = self.lines[active] == line[:, None]
+            h = match.any(axis=1)
+            way = np.where(h, match.argmax(axis=1), self.stamp[active].argmin(axis=1))
+            pf = is_prefetch[idx]
+            hit[idx] = h
+            useful[idx] = h & ~pf & self.prefetched[active, way]
+            # a prefetch that hits is dropped; anything else uses or fills the block
+            update = ~(h & pf)
+            s, w = active[update], way[update]
+            self.lines[s, w] = line[update]
+            self.stamp[s, w] = time[idx[update]]
+            self.prefetched[s, w] = pf[update] & ~h[update]
+        self.clock += n
+        return hit, useful
+
+
+def access_stream(records):
+    """
+    Return the (lines, pcs, types) of the memory accesses of a chunk of
+    records in program order: the loads of each record, then its stores.
+    """
+    addrs = np.concatenate([records['source_memory'], records['destination_memory']], axis=1)
+    types = np.empty(addrs.shape, dtype=np.int8)
+    types[:, :records['source_memory'].shape[1]] = LOAD
+    types[:, records['source_memory'].shape[1]:] = RFO
+    pcs = np.broadcast_to(records['ip'][:, None], addrs.shape)
+    valid = addrs != 0
+    return ((addrs[valid] >> np.uint64(LOG2_BLOCK_SIZE)).astype(np.int64),
+            pcs[valid].astype(np.int64), types[valid])
+
+
+class CacheModel(object):
+    """
+    A cache hierarchy, L1D -> L2C -> LLC by default, with an optional
+    prefetcher at `prefetch_level` (the L2C, like l2c_prefetcher_types).
+    """
+
+    def __init__(self, prefetcher=None, prefetch_level='L2C', levels=(L1D, L2C, LLC)):
+        if isinstance(prefetcher, str) or prefetcher is None:
+            prefetcher = make_prefetcher(prefetcher)
+        self.levels = [CacheLevel(name, sets, ways, prefetcher if name == prefetch_level else None)
+                       for name, sets, ways in levels]
+        self.stats = {}
+        for level in self.levels:
+            for kind in ('access', 'hit', 'miss'):
+                for t in TYPE_NAMES.values():
+                    self.stats['%s_%s_%s' % (level.name, t, kind)] = 0
+            self.stats['%s_prefetch_issued' % level.name] = 0
+            self.stats['%s_prefetch_useful' % level.name] = 0
+
+    def _count(self, name, types, hit, useful, issued):
+        for t, tname in TYPE_NAMES.items():
+            is_t = types == t
+            self.stats['%s_%s_access' % (name, tname)] += int(is_t.sum())
+            self.stats['%s_%s_hit' % (name, tname)] += int((is_t & hit).sum())
+            self.stats['%s_%s_miss' % (name, tname)] += int((is_t & ~hit).sum())
+        self.stats['%s_prefetch_issued' % name] += issued
+        self.stats['%s_prefetch_useful' % name] += int(useful.sum())
+
+    def step(self, lines, pcs, types):
+        """Send one chunk of accesses through the hierarchy."""
+        for level in self.levels:
+            issued = 0
+            if level.prefetcher is not None:
+                demand = np.nonzero(types != PREFETCH)[0]
+                trigger, slot, plines = level.prefetcher.generate(lines[demand], pcs[demand])
+                trigger = demand[trigger]
+                issued = len(plines)
+                # each request goes right after the access that triggered it
+                width = level.prefetcher.degree + 1
+                keys = np.concatenate([np.arange(len(lines)) * width, trigger * width + 1 + slot])
+                order = np.argsort(keys, kind='stable')
+                lines = np.concatenate([lines, plines])[order]
+                pcs = np.concatenate([pcs, pcs[trigger]])[order]
+                types = np.concatenate([types, np.full(len(plines), PREFETCH, dtype=np.int8)])[order]
+            hit, useful = level.access(lines, types == PREFETCH)
+            self._count(level.name, types, hit, useful, issued)
+            miss = ~hit
+            lines, pcs, types = lines[miss], pcs[miss], types[miss]
+
+    def run(self, chunks):
+        """Run the chunks of records of a trace and return the counters."""
+        for records in chunks:
+            self.step(*access_stream(records))
+        return dict(self.stats)
+
+
+def miss_fractions(baseline, prefetched, level='LLC'):
+    """
+    Coverage, uncovered and overprediction of `prefetched` over
+    `baseline` at `level`, as calculate_miss_fractions() of Figure 7 does
+    with the LLC_* stats of a timing run.
+    """
+    def read_misses(stats):
+        return sum(stats['%s_%s_miss' % (level, t)] for t in ('load', 'RFO', 'prefetch'))
+
+    base_load = baseline['%s_load_miss' % level]
+    coverage = 0.0
+    if base_load > 0:
+        coverage = min(1.0, max(0.0, (base_load - prefetched['%s_load_miss' % level]) / base_load))
+    base_read = read_misses(baseline)
+    overprediction = 0.0
+    if base_read > 0:
+        overprediction = max(0.0, (read_misses(prefetched) - base_read) / base_read)
+    return coverage, 1 - coverage, overprediction
+
+
+def screen(path, prefetchers, count=DEFAULT_RECORDS, cloudsuite=False):
+    """
+    Run the baseline and every prefetcher spec on the first `count` records
+    of a trace. Return one row per prefetcher.
+    """
+    models = [CacheModel()] + [CacheModel(spec) for spec in prefetchers]
+    for records in read_chunks(path, cloudsuite=cloudsuite, count=count):
+        stream = access_stream(records)
+        for model in models:
+            model.step(*stream)
+    baseline = models[0].stats
+    rows = []
+    for spec, model in zip(prefetchers, models[1:]):
+        coverage, uncovered, overprediction = miss_fractions(baseline, model.stats)
+        issued = model.stats['L2C_prefetch_issued']
+        rows.append({
+            'Trace': os.path.basename(path),
+            'Prefetcher': spec,
+            'Coverage_%': coverage * 100,
+            'Uncovered_%': uncovered * 100,
+            'Overprediction_%': overprediction * 100,
+            'Total_%': (coverage + uncovered + overprediction) * 100,
+            'L2C_Accuracy_%': 100.0 * model.stats['L2C_prefetch_useful'] / issued if issued else 0.0,
+            'LLC_load_miss': model.stats['LLC_load_miss'],
+            'Baseline_LLC_load_miss': baseline['LLC_load_miss'],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen prefetchers on a functional cache model')
+    parser.add_argument('traces', nargs='+', help='traces to run')
+    parser.add_argument('--prefetchers', nargs='+', default=['next_line', 'stride', 'streamer'],
+                        help='L2C prefetchers, as name or name:key=value,... (default: %(default)s)')
+    parser.add_argument('--count', type=int, default=DEFAULT_RECORDS,
+                        help='records to run per trace (default: %(default)s)')
+    parser.add_argument('--cloudsuite', action='store_true', help='CloudSuite record format')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: all CPUs)')
+    parser.add_argument('--out', help='also write the per-trace results to a CSV file')
+    args = parser.parse_args()
+
+    for spec in args.prefetchers:
+        try:
+            make_prefetcher(spec)
+        except (ValueError, TypeError) as e:
+            sys.exit('invalid prefetcher %s: %s' % (spec, e))
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(screen, path, args.prefetchers, args.count, args.cloudsuite) for path in args.traces]
+        rows = [row for future in futures for row in future.result()]
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False, float_format=lambda x: '%.1f' % x))
+    print('\nAverage over %d traces:' % len(args.traces))
+    print(df.groupby('Prefetcher', sort=False)[['Coverage_%', 'Uncovered_%', 'Overprediction_%', 'Total_%']]
+          .mean().to_string(float_format=lambda x: '%.1f' % x))
+    if args.out:
+        df.to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Stream ChampSim binary traces as NumPy structured arrays.
+
+A trace is a flat sequence of fixed-size `input_instr` records
+(inc/instruction.h), or of `cloudsuite_instr` records for the CloudSuite
+traces (ChampSim's -cloudsuite knob). INPUT_INSTR and CLOUDSUITE_INSTR
+describe the same C layout, padding included, so a buffer of raw trace
+bytes is an array of records as is.
+
+read_chunks() decompresses the trace with lzma/gzip (picked from the file
+extension, like main.cc) straight into the memory of a freshly allocated
+record array of `chunk` records and yields it, so there are no per-record
+Python objects and no copy between the decompressor and the array. Only
+the chunk being processed is alive, so multi-GB traces stream in constant
+memory. The chunks are independent arrays and may be kept.
+
+Usage:
+    from champsim_trace import read_chunks
+    for records in read_chunks('602.gcc_s-734B.champsimtrace.xz'):
+        loads = records['source_memory'] != 0       # (n, 4) mask
+        ...
+
+    write_chunks('slice.champsimtrace.xz', read_chunks(path, count=1000000))
+
+Command line (dump records as text):
+    python3 champsim_trace.py trace.champsimtrace.xz [--skip N] [--count N] [--cloudsuite]
+"""
+
+import argparse
+import gzip
+import lzma
+import os
+import sys
+
+import numpy as np
+
+NUM_INSTR_DESTINATIONS_SPARC = 4
+NUM_INSTR_DESTINATIONS = 2
+NUM_INSTR_SOURCES = 4
+
+# class input_instr (64 bytes)
+INPUT_INSTR = np.dtype([
+    ('ip', '<u8'),
+    ('is_branch', 'u1'),
+    ('branch_taken', 'u1'),
+    ('destination_registers', 'u1', (NUM_INSTR_DESTINATIONS,)),
+    ('source_registers', 'u1', (NUM_INSTR_SOURCES,)),
+    ('destination_memory', '<u8', (NUM_INSTR_DESTINATIONS,)),
+    ('source_memory', '<u8', (NUM_INSTR_SOURCES,)),
+], align=True)
+
+# class cloudsuite_instr (96 bytes)
+CLOUDSUITE_INSTR = np.dtype([
+    ('ip', '<u8'),
+    ('is_branch', 'u1'),
+    ('branch_taken', 'u1'),
+    ('destination_registers', 'u1', (NUM_INSTR_DESTINATIONS_SPARC,)),
+    ('source_registers', 'u1', (NUM_INSTR_SOURCES,)),
+    ('destination_memory', '<u8', (NUM_INSTR_DESTINATIONS_SPARC,)),
+    ('source_memory', '<u8', (NUM_INSTR_SOURCES,)),
+    ('asid', 'u1', (2,)),
+], align=True)
+
+# Records per chunk (64 MB of input_instr)
+CHUNK_RECORDS = 1 << 20
+
+
+def trace_dtype(cloudsuite=False):
+    return CLOUDSUITE_INSTR if cloudsuite else INPUT_INSTR
+
+
+def open_trace(path, mode='rb', preset=None):
+    """
+    Open a trace for binary reading or writing: gzip for a .g* extension,
+    lzma for .x* and uncompressed otherwise (e.g. a named pipe of
+    trace_server.py). `preset` is the compression level when writing.
+    """
+    ext = os.path.splitext(path)[1]
+    if ext.startswith('.g'):
+        return gzip.open(path, mode, **({} if preset is None else {'compresslevel': preset}))
+    if ext.startswith('.x'):
+        return lzma.open(path, mode, preset=preset if 'w' in mode else None)
+    return open(path, mode)
+
+
+def _fill(f, buf):
+    """readinto() until `buf` is full or the stream ends; return the bytes read."""
+    view = memoryview(buf).cast('B')
+    filled = 0
+    while filled < len(view):
+        n = f.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+class _borrowed(object):
+    """Context manager that leaves an already open file object open."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        return self.f
+
+    def __exit__(self, *exc):
+        return False
+
+
+def read_chunks(path, chunk=CHUNK_RECORDS, cloudsuite=False, skip=0, count=None):
+    """
+    Yield the records of a trace as structured arrays of at most `chunk`
+    records, starting after the first `skip` records and stopping after
+    `count` records (default: the whole trace). A truncated last record is
+    dropped, as ChampSim does.
+    """
+    dtype = trace_dtype(cloudsuite)
+    with open_trace(path) if isinstance(path, (str, os.PathLike)) else _borrowed(path) as f:
+        if skip:
+            scratch = np.empty(min(skip, chunk), dtype)
+            while skip:
+                n = _fill(f, scratch[:min(skip, chunk)]) // dtype.itemsize
+                if not n:
+                    return
+                skip -= n
+        remaining = count
+        while remaining is None or remaining > 0:
+            n = chunk if remaining is None else min(chunk, remaining)
+            records = np.empty(n, dtype)
+            got = _fill(f, records) // dtype.itemsize
+            if got:
+                yield records[:got]
+                if remaining is not None:
+                    remaining -= got
+            if got < n:
+                return
+
+
+def read_trace(path, cloudsuite=False, skip=0, count=None):
+    """Return (part of) a trace as one structured array."""
+    chunks = list(read_chunks(path, cloudsuite=cloudsuite, skip=skip, count=count))
+    return np.concatenate(chunks) if chunks else np.empty(0, trace_dtype(cloudsuite))
+
+
+def write_chunks(path, chunks, preset=None):
+    """
+    Write record arrays to a trace, compressed according to the extension
+    of `path`. Return the number of records written.
+    """
+    written = 0
+    with open_trace(path, 'wb', preset) as f:
+        for records in chunks:
+            f.write(memoryview(np.ascontiguousarray(records)).cast('B'))
+            written += len(records)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dump the records of a ChampSim trace')
+    parser.add_argument('trace', help='.champsimtrace.xz/.gz or uncompressed trace')
+    parser.add_argument('--skip', type=int, default=0, help='records to skip (default: %(default)s)')
+    parser.add_argument('--count', type=int, default=20, help='records to dump (default: %(default)s)')
+    parser.add_argument('--cloudsuite', action='store_true', help='CloudSuite record format')
+    args = parser.parse_args()
+
+    out = sys.stdout
+    index = args.skip
+    for records in read_chunks(args.trace, cloudsuite=args.cloudsuite, skip=args.skip, count=args.count):
+        for r in records:
+            out.write('%d ip=%#x branch=%d taken=%d dst_reg=%s src_reg=%s dst_mem=%s src_mem=%s\n' % (
+                index, r['ip'], r['is_branch'], r['branch_taken'],
+                r['destination_registers'].tolist(), r['source_registers'].tolist(),
+                [hex(a) for a in r['destination_memory'] if a], [hex(a) for a in r['source_memory'] if a]))
+            index += 1
+
+
+if __name__ == '__main__':
+    main()
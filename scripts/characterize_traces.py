@@ -0,0 +1,322 @@
+"""
+Offline characterization of ChampSim traces, kept in a persistent index.
+
+`index` reads every trace of a trace list (scripts/artifact_traces.csv by
+default) on a process pool, one trace per worker, and computes per-trace
+characteristics chunk by chunk on the NumPy records of champsim_trace.py:
+
+    Records                   records read
+    Mem_Fraction              fraction of instructions with a memory operand
+    Load_Fraction/Store_Fraction
+    Branch_Fraction           fraction of branches
+    Taken_Fraction            fraction of branches that are taken
+    PCs                       unique instruction pointers
+    Footprint_Lines/Pages     unique 64B lines / 4KB pages touched
+    Lines_Per_Page            Footprint_Lines / Footprint_Pages
+    Top_Delta, Top_Delta_Fraction
+                              most common nonzero line delta between
+                              consecutive accesses to the same page
+    Offset_Hist               histogram of the line offset within the page (64 bins)
+    Delta_Hist                histogram of those deltas, -63..63 (127 bins)
+
+The index (trace_index.json) remembers the size and mtime of every trace
+it has characterized, so a rerun only reads new or changed traces.
+
+`query` filters the index with a pandas query expression and prints the
+matching traces, or writes them as a .tlist:
+
+    python3 characterize_traces.py index --trace-dir $PYTHIA_HOME/traces --jobs 16
+    python3 characterize_traces.py query 'Mem_Fraction > 0.3 and Footprint_Pages > 10000' \\
+        --tlist memory_intensive.tlist
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from champsim_trace import read_chunks
+from exp_files import write_tlist
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TRACES = os.path.join(HERE, 'artifact_traces.csv')
+DEFAULT_INDEX = 'trace_index.json'
+
+LOG2_LINE = 6
+LOG2_PAGE = 12
+LINES_PER_PAGE = 1 << (LOG2_PAGE - LOG2_LINE)
+
+# Column order of the index frame; the histograms are kept as lists
+COLUMNS = ['Trace', 'Records', 'Mem_Fraction', 'Load_Fraction', 'Store_Fraction', 'Branch_Fraction',
+           'Taken_Fraction', 'PCs', 'Footprint_Lines', 'Footprint_Pages', 'Lines_Per_Page',
+           'Top_Delta', 'Top_Delta_Fraction']
+
+
+class DistinctValues(object):
+    """
+    Distinct values seen so far. The distinct values of each chunk wait in
+    a list and are merged into the sorted set once they outnumber it, so
+    each value is merged a logarithmic number of times rather than once per
+    chunk.
+    """
+
+    def __init__(self):
+        self.values = np.empty(0, np.uint64)
+        self.pending = []
+        self.pending_size = 0
+
+    def add(self, values):
+        values = np.unique(values)
+        self.pending.append(values)
+        self.pending_size += len(values)
+        if self.pending_size > len(self.values):
+            self.merge()
+
+    def merge(self):
+        if self.pending:
+            self.values = np.unique(np.concatenate([self.values] + self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def __len__(self):
+        self.merge()
+        return len(self.values)
+
+
+class TraceProfile(object):
+    """Running characterization of one trace, updated one chunk at a time."""
+
+    def __init__(self):
+        self.records = 0
+        self.mem = 0
+        self.loads = 0
+        self.stores = 0
+        self.branches = 0
+        self.taken = 0
+        self.pcs = DistinctValues()
+        self.lines = DistinctValues()
+        self.pages = DistinctValues()
+        self.offset_hist = np.zeros(LINES_PER_PAGE, np.int64)
+        self.delta_hist = np.zeros(2 * LINES_PER_PAGE - 1, np.int64)
+        # last accessed line offset of every page touched in the previous chunk
+        self._last_pages = np.empty(0, np.uint64)
+        self._last_offsets = np.empty(0, np.int64)
+
+    def update(self, records):
+        src = records['source_memory']
+        dst = records['destination_memory']
+        is_load = (src != 0).any(axis=1)
+        is_store = (dst != 0).any(axis=1)
+        self.records += len(records)
+        self.loads += int(is_load.sum())
+        self.stores += int(is_store.sum())
+        self.mem += int((is_load | is_store).sum())
+        branch = records['is_branch'] != 0
+        self.branches += int(branch.sum())
+        self.taken += int((branch & (records['branch_taken'] != 0)).sum())
+        self.pcs.add(records['ip'])
+
+        # Accesses in program order: the sources, then the destinations of each record
+        addrs = np.concatenate([src, dst], axis=1).ravel()
+        addrs = addrs[addrs != 0]
+        lines = addrs >> np.uint64(LOG2_LINE)
+        pages = addrs >> np.uint64(LOG2_PAGE)
+        offsets = (lines & np.uint64(LINES_PER_PAGE - 1)).astype(np.int64)
+        self.lines.add(lines)
+        self.pages.add(pages)
+        self.offset_hist += np.bincount(offsets, minlength=LINES_PER_PAGE)
+
+        # Line deltas between consecutive accesses to the same page. The last
+        # access of each page of the previous chunk goes first, so deltas
+        # across the chunk boundary are counted too.
+        pages = np.concatenate([self._last_pages, pages])
+        offsets = np.concatenate([self._last_offsets, offsets])
+        order = np.argsort(pages, kind='stable')
+        pages, offsets = pages[order], offsets[order]
+        same = pages[1:] == pages[:-1]
+        deltas = (offsets[1:] - offsets[:-1])[same]
+        self.delta_hist += np.bincount(deltas + LINES_PER_PAGE - 1, minlength=len(self.delta_hist))
+        if len(pages):
+            last = np.append(pages[1:] != pages[:-1], True)
+            self._last_pages, self._last_offsets = pages[last], offsets[last]
+
+    def entry(self):
+        n = max(self.records, 1)
+        nonzero = self.delta_hist.copy()
+        nonzero[LINES_PER_PAGE - 1] = 0
+        top = int(np.argmax(nonzero))
+        return {
+            'Records': self.records,
+            'Mem_Fraction': self.mem / n,
+            'Load_Fraction': self.loads / n,
+            'Store_Fraction': self.stores / n,
+            'Branch_Fraction': self.branches / n,
+            'Taken_Fraction': self.taken / max(self.branches, 1),
+            'PCs': len(self.pcs),
+            'Footprint_Lines': len(self.lines),
+            'Footprint_Pages': len(self.pages),
+            'Lines_Per_Page': len(self.lines) / max(len(self.pages), 1),
+            'Top_Delta': top - (LINES_PER_PAGE - 1) if nonzero[top] else 0,
+            'Top_Delta_Fraction': float(nonzero[top] / max(self.delta_hist.sum(), 1)),
+            'Offset_Hist': self.offset_hist.tolist(),
+            'Delta_Hist': self.delta_hist.tolist(),
+        }
+
+
+def characterize(path, count=None, cloudsuite=False):
+    """Return the index entry of one trace (optionally of its first `count` records)."""
+    profile = TraceProfile()
+    for records in read_chunks(path, cloudsuite=cloudsuite, count=count):
+        profile.update(records)
+    return profile.entry()
+
+
+def read_trace_list(path):
+    """Return the trace file names of an artifact_traces.csv style list (or one name per line)."""
+    names = []
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                names.append(line.split(',')[0].strip())
+    return names
+
+
+def trace_name(filename):
+    """Trace NAME used in .tlist files: the file name without .champsimtrace.xz."""
+    for suffix in ('.champsimtrace.xz', '.champsimtrace.gz', '.trace.xz', '.trace.gz'):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+class TraceIndex(object):
+    """
+    Persistent characterization index, keyed by trace file name. Every
+    entry remembers the size and mtime of the trace and the record limit it
+    was computed with.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            if data.get('version') == self.VERSION:
+                self.entries = data['entries']
+
+    def current(self, filename, st, count):
+        entry = self.entries.get(filename)
+        return (entry is not None and entry['Size'] == st.st_size and entry['Mtime'] == st.st_mtime_ns
+                and entry['Count'] == count)
+
+    def put(self, filename, st, count, entry):
+        entry = dict(entry, Size=st.st_size, Mtime=st.st_mtime_ns, Count=count)
+        self.entries[filename] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump({'version': self.VERSION, 'entries': self.entries}, fh, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def frame(self):
+        """Scalar characteristics as a DataFrame, one row per trace, with its File and NAME."""
+        rows = []
+        for filename, entry in sorted(self.entries.items()):
+            row = {'Trace': trace_name(filename), 'File': filename}
+            row.update((k, entry[k]) for k in COLUMNS[1:])
+            rows.append(row)
+        return pd.DataFrame(rows, columns=COLUMNS + ['File'])
+
+    def histograms(self, filename):
+        """Return the (offset, delta) histograms of a trace as arrays."""
+        entry = self.entries[filename]
+        return np.array(entry['Offset_Hist']), np.array(entry['Delta_Hist'])
+
+
+def build_index(index, trace_dir, filenames, count=None, cloudsuite=False, jobs=None):
+    """
+    Characterize the traces of `filenames` in `trace_dir` that are missing
+    from the index or changed since. Return the file names that were read.
+    """
+    todo = []
+    for filename in filenames:
+        path = os.path.join(trace_dir, filename)
+        try:
+            st = os.stat(path)
+        except OSError:
+            print('warning: %s not found, skipped' % path, file=sys.stderr)
+            continue
+        if not index.current(filename, st, count):
+            todo.append((filename, path, st))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(characterize, path, count, cloudsuite): (filename, st)
+                   for filename, path, st in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            filename, st = futures[future]
+            index.put(filename, st, count, future.result())
+            print('[%d/%d] %s' % (done, len(todo), filename), file=sys.stderr)
+            # Save as we go, so an interrupted run keeps the traces already read
+            index.save()
+    return [t[0] for t in todo]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Characterize ChampSim traces and query the characterization index')
+    parser.add_argument('--index', default=DEFAULT_INDEX, help='index file (default: %(default)s)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('index', help='characterize new or changed traces')
+    p.add_argument('--traces', default=DEFAULT_TRACES, help='trace list (default: artifact_traces.csv)')
+    p.add_argument('--trace-dir', help='directory of the traces (default: $PYTHIA_HOME/traces)')
+    p.add_argument('--count', type=int, help='characterize only the first COUNT records of each trace')
+    p.add_argument('--cloudsuite', action='store_true', help='CloudSuite record format')
+    p.add_argument('--jobs', type=int, help='worker processes (default: all CPUs)')
+
+    p = sub.add_parser('query', help='select traces from the index')
+    p.add_argument('expr', nargs='?', help='pandas query expression over the index columns')
+    p.add_argument('--sort', help='column to sort by (descending)')
+    p.add_argument('--tlist', help='write the matching traces as a .tlist')
+    args = parser.parse_args()
+
+    index = TraceIndex(args.index)
+    if args.command == 'index':
+        trace_dir = args.trace_dir
+        if trace_dir is None:
+            if 'PYTHIA_HOME' not in os.environ:
+                sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+            trace_dir = os.path.join(os.environ['PYTHIA_HOME'], 'traces')
+        done = build_index(index, trace_dir, read_trace_list(args.traces), args.count, args.cloudsuite, args.jobs)
+        print('%d traces characterized, %d in the index' % (len(done), len(index.entries)), file=sys.stderr)
+        return
+
+    frame = index.frame()
+    if args.expr:
+        frame = frame.query(args.expr)
+    if args.sort:
+        frame = frame.sort_values(args.sort, ascending=False)
+    if args.tlist:
+        with open(args.tlist, 'w') as out:
+            write_tlist([{'NAME': row['Trace'], 'TRACE': '$(PYTHIA_HOME)/traces/' + row['File']}
+                         for _, row in frame.iterrows()], out)
+        print('%d traces written to %s' % (len(frame), args.tlist), file=sys.stderr)
+    else:
+        print(frame.drop(columns='File').to_string(index=False, float_format=lambda x: '%.3f' % x))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,7 @@ my $slurm_partition = "slurm_part";
 my $exclude_list;
 my $include_list;
 my $extra;
+my $ledger;
 
 GetOptions('tlist=s' => \$tlist_file,
 	   'exp=s' => \$exp_file,
@@ -26,6 +27,7 @@ GetOptions('tlist=s' => \$tlist_file,
 	   'exclude=s' => \$exclude_list,
 	   'include=s' => \$include_list,
 	   'extra=s' => \$extra,
+	   'ledger=s' => \$ledger,
 ) or die "Usage: $0 --exe <executable> --exp <exp file> --tlist <trace list>\n";
 
 die "\$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?\n" unless defined $ENV{'PYTHIA_HOME'};
@@ -97,6 +99,10 @@ foreach $trace (@trace_info)
 		if($local)
 		{
 			$cmdline = "$exe $exp_knobs $trace_knobs -traces $trace_input > ${trace_name}_${exp_name}.out 2>&1";
+			if (defined $ledger)
+			{
+				$cmdline = "python3 $ENV{'PYTHIA_HOME'}/scripts/job_ledger.py run --db $ledger --trace $trace_name --exp $exp_name -- $cmdline";
+			}
 		}
 		else
 		{
@@ -115,6 +121,10 @@ foreach $trace (@trace_info)
 			}
 			$slurm_cmd = $slurm_cmd." -c $ncores -J ${trace_name}_${exp_name} -o ${trace_name}_${exp_name}.out -e ${trace_name}_${exp_name}.err";
 			$cmdline = "$slurm_cmd $ENV{'PYTHIA_HOME'}/wrapper.sh $exe \"$exp_knobs $trace_knobs -traces $trace_input\"";
+			if (defined $ledger)
+			{
+				$cmdline = $cmdline." $ledger $trace_name $exp_name";
+			}
 		}
 		
 		# Additional hook replace
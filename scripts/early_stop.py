@@ -0,0 +1,226 @@
+"""
+Early termination of simulations that cannot catch up with the best one.
+
+ChampSim prints a heartbeat line every STAT_PRINTING_PERIOD (1M) retired
+instructions of every core:
+
+    Heartbeat CPU  0 instructions:   12000003 cycles:    9876543 heartbeat IPC: 1.2 cumulative IPC: 1.1 (...)
+
+A Trajectory follows the output of a running job and keeps the heartbeat
+IPC of every interval after the warmup. The Pruner compares every running
+job of a sweep with the best other job on the same trace and simulation
+window, i.e. the one with the highest cumulative IPC so far (running or
+done), on the intervals both of them have simulated:
+
+    x_i = log(IPC_i of the job) - log(IPC_i of the best job)
+
+Both jobs run the same trace, so the differences cancel most of the phase
+behaviour of the trace. With k of the n intervals of the window simulated,
+the job ends up within `margin` of the best job only if the mean of the
+remaining n - k differences reaches
+
+    need = (n log(1 - margin) - k mean(x)) / (n - k)
+
+Taking the remaining intervals to be like the ones seen so far, their mean
+is normal around mean(x) with standard error sd(x) sqrt(1/k + 1/(n - k)),
+and a job whose chance to reach `need` is below `alpha` is pruned. The
+estimate only gets more certain as the job progresses, and a job is never
+judged on fewer than `min_intervals` intervals.
+
+run_jobs.py --prune checks the running jobs every few seconds, kills the
+pruned ones and records them as pruned in the job ledger. A `Pruned 1`
+record is appended to the output of a pruned job so that rollup.py reports
+it as pruned (Filter -1) rather than failed.
+"""
+
+import math
+import os
+import re
+import threading
+
+import numpy as np
+
+from job_ledger import PRUNED_RECORD
+
+HEARTBEAT = re.compile(r'^Heartbeat CPU\s+(\d+) instructions:\s+(\d+) cycles:\s+(\d+) '
+                       r'heartbeat IPC: (\S+) cumulative IPC: (\S+)')
+WARMUP_COMPLETE = re.compile(r'^Warmup complete CPU\s+(\d+)')
+SIMULATION_KNOB = re.compile(r'--simulation_instructions=(\d+)')
+WARMUP_KNOB = re.compile(r'--warmup_instructions=(\d+)')
+
+# STAT_PRINTING_PERIOD of inc/ooo_cpu.h, until two heartbeats tell otherwise
+HEARTBEAT_PERIOD = 1000000
+DEFAULT_ALPHA = 0.01
+DEFAULT_MARGIN = 0.01
+DEFAULT_MIN_INTERVALS = 5
+DEFAULT_KEEP = ['nopref']
+
+
+class Trajectory(object):
+    """Heartbeat IPCs after the warmup of every core, read incrementally from a job's output."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.roi = set()
+        self.ipc = {}
+        self.instructions = {}
+        self.cumulative = None
+
+    def update(self):
+        """Read the lines written since the last update."""
+        try:
+            with open(self.path, 'rb') as fh:
+                fh.seek(self.offset)
+                data = fh.read()
+        except OSError:
+            return
+        # a line that is still being written is read next time
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        for line in data[:end].decode('latin-1').splitlines():
+            m = HEARTBEAT.match(line)
+            if m:
+                cpu = int(m.group(1))
+                if cpu in self.roi:
+                    self.ipc.setdefault(cpu, []).append(float(m.group(4)))
+                    self.instructions.setdefault(cpu, []).append(int(m.group(2)))
+                    if cpu == 0:
+                        self.cumulative = float(m.group(5))
+                continue
+            m = WARMUP_COMPLETE.match(line)
+            if m:
+                self.roi.add(int(m.group(1)))
+
+    @property
+    def period(self):
+        ins = self.instructions.get(0, [])
+        if len(ins) < 2:
+            return HEARTBEAT_PERIOD
+        return int(round((ins[-1] - ins[0]) / float(len(ins) - 1), -3)) or HEARTBEAT_PERIOD
+
+    def intervals(self):
+        """Log heartbeat IPC of every interval, averaged over the cores, for the intervals all cores reached."""
+        if not self.ipc:
+            return np.empty(0)
+        k = min(len(series) for series in self.ipc.values())
+        ipc = np.array([series[:k] for series in self.ipc.values()])
+        if (ipc <= 0).any():
+            ipc = np.maximum(ipc, 1e-6)
+        return np.log(ipc).mean(axis=0)
+
+
+def window(cmdline):
+    """(warmup, simulation) instructions of a command line; None where the knob is not given."""
+    w = WARMUP_KNOB.findall(cmdline)
+    s = SIMULATION_KNOB.findall(cmdline)
+    # like the ChampSim knob parser, the last occurrence wins
+    return (int(w[-1]) if w else None, int(s[-1]) if s else None)
+
+
+def catch_up_probability(x, total, margin=DEFAULT_MARGIN):
+    """
+    Chance that a job whose first k interval differences to the best job are
+    `x` ends up within `margin` of it after `total` intervals.
+    """
+    k = len(x)
+    rest = total - k
+    if rest <= 0 or k < 2:
+        return 1.0
+    mean = float(x.mean())
+    need = (total * math.log(1.0 - margin) - k * mean) / rest
+    se = max(float(x.std(ddof=1)), 1e-6) * math.sqrt(1.0 / k + 1.0 / rest)
+    return 0.5 * math.erfc((need - mean) / (se * math.sqrt(2.0)))
+
+
+class Pruner(object):
+    """
+    Trajectories of the jobs of a sweep, by job name. Jobs of the `keep`
+    experiments (e.g. the baseline every speedup needs) are never pruned.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA, margin=DEFAULT_MARGIN, min_intervals=DEFAULT_MIN_INTERVALS,
+                 keep=DEFAULT_KEEP):
+        self.alpha = alpha
+        self.margin = margin
+        self.min_intervals = max(2, min_intervals)
+        self.keep = set(keep or [])
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.trajectories = {}
+        self.running = set()
+
+    def _key(self, job):
+        return (job.trace, window(job.cmdline))
+
+    def add_done(self, job, path):
+        """Add a finished job (e.g. of an earlier run of the sweep) that running jobs are compared with."""
+        if not os.path.exists(path):
+            return
+        trajectory = Trajectory(path)
+        trajectory.update()
+        with self.lock:
+            self.jobs[job.name] = job
+            self.trajectories[job.name] = trajectory
+
+    def start(self, job, path):
+        with self.lock:
+            self.jobs[job.name] = job
+            self.trajectories[job.name] = Trajectory(path)
+            self.running.add(job.name)
+
+    def finish(self, job, done):
+        """A job ended; only jobs that are done stay in the comparison."""
+        with self.lock:
+            self.running.discard(job.name)
+            if done:
+                self.trajectories[job.name].update()
+            else:
+                self.trajectories.pop(job.name, None)
+                self.jobs.pop(job.name, None)
+
+    def check(self):
+        """Read the running jobs' new heartbeats; return [(job, reason)] of the jobs to prune."""
+        with self.lock:
+            for name in self.running:
+                self.trajectories[name].update()
+            groups = {}
+            for name, trajectory in self.trajectories.items():
+                groups.setdefault(self._key(self.jobs[name]), []).append(name)
+            verdicts = []
+            for name in sorted(self.running):
+                job = self.jobs[name]
+                if job.exp in self.keep:
+                    continue
+                reason = self._verdict(name, groups[self._key(job)])
+                if reason is not None:
+                    verdicts.append((job, reason))
+            return verdicts
+
+    def _verdict(self, name, peers):
+        job, trajectory = self.jobs[name], self.trajectories[name]
+        simulation = window(job.cmdline)[1]
+        x = trajectory.intervals()
+        k = len(x)
+        if simulation is None or k < self.min_intervals:
+            return None
+        best = None
+        for peer in peers:
+            other = self.trajectories[peer]
+            if peer == name or other.cumulative is None or len(other.intervals()) < k:
+                continue
+            if best is None or other.cumulative > self.trajectories[best].cumulative:
+                best = peer
+        if best is None or self.trajectories[best].cumulative <= trajectory.cumulative:
+            return None
+        total = int(math.ceil(simulation / float(trajectory.period)))
+        p = catch_up_probability(x - self.trajectories[best].intervals()[:k], total, self.margin)
+        if p >= self.alpha:
+            return None
+        return 'P(catch up with %s) = %.2g after %d of %d intervals' % (self.jobs[best].exp, p, k, total)
+
+
+def mark_pruned(path, reason):
+    """Append the record rollup.py reports pruned jobs by to a job's output."""
+    with open(path, 'a') as out:
+        out.write('\n%s 1\nPruned: %s\n' % (PRUNED_RECORD, reason))
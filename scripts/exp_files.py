@@ -0,0 +1,138 @@
+"""
+Python readers for the experiment description files used by the scripts in
+this directory. They follow Trace.pm, Exp.pm and Metric.pm line for line, so
+a .tlist/.exp/.mfile means exactly the same thing to the Perl and the Python
+tools.
+
+  parse_tlist(path) -> [{'NAME': ..., 'TRACE': ..., 'KNOBS': ...}, ...]
+  parse_exp(path)   -> [{'NAME': ..., 'KNOBS': ...}, ...]
+  parse_mfile(path) -> [{'NAME': ..., 'TYPE': ...}, ...]
+  write_tlist(traces, out) writes records in the parse_tlist() format
+
+The knob .ini files are read the way inc/ini.h reads them:
+
+  ini_line(line)  -> (name, value), or None for comments, sections and errors
+  read_ini(path)  -> [(name, value), ...] in file order
+"""
+
+import re
+
+# ini.h: INI_START_COMMENT_PREFIXES, INI_INLINE_COMMENT_PREFIXES
+INI_COMMENT_PREFIXES = ';#'
+INI_INLINE_COMMENT_PREFIXES = ';'
+MFILE_TYPES = ('sum', 'mean', 'nzmean', 'min', 'max', 'standard_deviation', 'variance', 'array')
+
+
+def _read_lines(filename):
+    with open(filename) as fh:
+        return [line.rstrip('\n') for line in fh]
+
+
+def parse_tlist(filename):
+    """
+    Parse a trace list. Every non-empty line is KEY=VALUE (split at the first
+    '='); a NAME key starts a new record. Values are kept verbatim.
+    """
+    traces = []
+    rec = None
+    for line in _read_lines(filename):
+        if line == '':
+            continue
+        key, _, value = line.partition('=')
+        if key == 'NAME' and rec is not None:
+            traces.append(rec)
+            rec = None
+        if rec is None:
+            rec = {}
+        rec[key] = value
+    if rec is not None:
+        traces.append(rec)
+    return traces
+
+
+def write_tlist(traces, out):
+    """Write trace records (dicts with NAME, TRACE and KNOBS) as a trace list."""
+    for rec in traces:
+        out.write('NAME=%s\nTRACE=%s\nKNOBS=%s\n\n' % (rec['NAME'], rec['TRACE'], rec.get('KNOBS', '')))
+
+
+def parse_exp_configs(filename):
+    """
+    Parse an experiment file and return (configs, exps), where configs are
+    the `VAR = value` definitions and exps the expanded experiment records.
+    """
+    configs = {}
+    exps = []
+    for line in _read_lines(filename):
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+        tokens = line.split()
+        if len(tokens) > 1 and tokens[1] == '=':
+            configs[tokens[0]] = ' '.join(tokens[2:])
+            continue
+        args = []
+        for token in tokens[1:]:
+            if token.startswith('$'):
+                var = re.sub(r'[$()]', '', token)
+                if var not in configs:
+                    raise ValueError('%s is not defined before exp %s' % (var, tokens[0]))
+                args.append(configs[var])
+            else:
+                args.append(token)
+        exps.append({'NAME': tokens[0], 'KNOBS': ' '.join(args)})
+    return configs, exps
+
+
+def parse_exp(filename):
+    """
+    Parse an experiment file. `VAR = value` lines define configurations;
+    every other line is `name knob...`, where a knob token starting with '$'
+    (e.g. `$(BASE)`) is replaced by the configuration defined before it.
+    """
+    return parse_exp_configs(filename)[1]
+
+
+def parse_mfile(filename):
+    """Parse a metric file of `name : reducer` lines."""
+    metrics = []
+    for line in _read_lines(filename):
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+        fields = line.split(':')
+        name = fields[0].strip()
+        mtype = fields[1].strip() if len(fields) > 1 else ''
+        metrics.append({'NAME': name, 'TYPE': mtype})
+    return metrics
+
+
+def ini_line(line):
+    """
+    (name, value) of an ini line as inih reads it, or None for comments,
+    sections and lines without a value. The name ends at the first '=' or
+    ':', and an inline ';' comment needs whitespace in front of it. ChampSim
+    reads every `--name=value` argument (without the dashes) the same way.
+    """
+    line = line.strip()
+    if line == '' or line[0] in INI_COMMENT_PREFIXES or line.startswith('['):
+        return None
+    cuts = [i for i in (line.find('='), line.find(':')) if i > 0]
+    if not cuts:
+        return None
+    name, value = line[:min(cuts)].rstrip(), line[min(cuts) + 1:]
+    for i in range(1, len(value)):
+        if value[i] in INI_INLINE_COMMENT_PREFIXES and value[i - 1].isspace():
+            value = value[:i]
+            break
+    return name, value.strip()
+
+
+def read_ini(path):
+    """Return the `name = value` pairs of a knob .ini file in order."""
+    pairs = []
+    for line in _read_lines(path):
+        parsed = ini_line(line)
+        if parsed is not None:
+            pairs.append(parsed)
+    return pairs
@@ -0,0 +1,511 @@
+"""
+Offline replay of Pythia's featurewise learning engine, to rank feature
+combinations without a timing run.
+
+gen_feature_exps.pl turns every 1- and 2-feature combination of the 20
+features of --le_featurewise_active_features into a full simulation. This
+script replays the same agent on the L2C demand stream of a trace instead
+(the loads and stores that miss the functional L1D of cache_model.py) and
+reports, per combination, how accurate its prefetches are and how many of
+the baseline L2C misses they cover. Only the top combinations then need a
+full simulation.
+
+The replay follows prefetcher/scooby.cc and src/feature_knowledge.cc with
+the knobs of config/pythia.ini:
+  - the state of every access (PC, page, offset, delta and the PC, offset
+    and delta signatures of its signature table entry) and the tile index
+    of every feature and tiling (folded XOR, tiling offset, jenkins hash)
+    are computed for the whole stream at once;
+  - the agent itself is sequential, one access at a time, but all
+    combinations of the same size run in lockstep: their Q-tables are one
+    array, their prefetch trackers are one array, and consultQ, the
+    max-pooled getMaxAction, the tracker search and the SARSA update of
+    the evicted tracker entries are one NumPy operation for all of them.
+    Every combination sees the same exploration draws.
+
+It is an approximation: there is no bandwidth or accuracy feedback (the
+action fallback is always on and the rewards are the low-bandwidth ones),
+a prefetch is "filled" `fill_delay` L2C accesses after it was issued, and
+prefetches are degree 1. The exploration draws come from NumPy, not from
+the C++ generator.
+
+Usage:
+    python3 featurewise_replay.py trace.champsimtrace.xz [...] --top 10 --exp top_features.exp
+"""
+
+import argparse
+import collections
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from cache_model import L1D, L2C, BLOCKS_PER_PAGE, LOG2_BLOCK_SIZE, DEFAULT_RECORDS, CacheLevel, access_stream
+from champsim_trace import read_chunks
+
+# Same order as MapFeatureTypeString (src/feature_knowledge.cc) and gen_feature_exps.pl
+FEATURE_NAMES = ["PC", "Offset", "Delta", "Address", "PC_Offset", "PC_Address", "PC_Page", "PC_Path",
+                 "Delta_Path", "Offset_Path", "PC_Delta", "PC_Offset_Delta", "Page", "PC_Path_Offset",
+                 "PC_Path_Offset_Path", "PC_Path_Delta", "PC_Path_Delta_Path", "PC_Path_Offset_Path_Delta_Path",
+                 "Offset_Path_PC", "Delta_Path_PC"]
+
+# config/pythia.ini
+ALPHA = 0.006508802942367162
+GAMMA = 0.556300959940946
+EPSILON = 0.0018228444309622588
+SEED = 200
+ACTIONS = np.array([1, 3, 4, 5, 10, 11, 12, 22, 23, 30, 32, -1, -3, -6, 0])
+PT_SIZE = 256
+ST_SIZE = 64
+REWARD_CORRECT_TIMELY = 20
+REWARD_CORRECT_UNTIMELY = 12
+REWARD_INCORRECT = -8
+REWARD_NONE = -4
+REWARD_OUT_OF_BOUNDS = -12
+NUM_TILINGS = 3
+NUM_TILES = 128
+HASH_TYPE = 2
+POOLING_TYPE = 2
+
+# L2C accesses between issuing a prefetch and its fill
+DEFAULT_FILL_DELAY = 8
+
+# inc/feature_knowledge_helper.h
+DELTA_BITS = 7
+TILING_OFFSET = np.array([
+    0xaca081b9, 0x666a1c67, 0xc11d6a53, 0x8e5d97c1, 0x0d1cad54, 0x874f71cb, 0x20d2fa13, 0x73f7c4a7,
+    0x0b701f6c, 0x8388d86d, 0xf72ac9f2, 0xbab16d82, 0x524ac258, 0xb5900302, 0xb48ccc72, 0x632f05bf,
+    0xe7111073, 0xeb602af4, 0xf3f29ebb, 0x2a6184f2, 0x461da5da, 0x6693471d, 0x62fd0138, 0xc484efb3,
+    0x81c9eeeb, 0x860f3766, 0x334faf86, 0x5e81e881, 0x14bc2195, 0xf47671a8, 0x75414279, 0x357bc5e0,
+], dtype=np.uint32)
+
+# prefetcher/scooby_helper.cc
+PC_SIG_SHIFT, PC_SIG_MAX_BITS = 4, 32
+OFFSET_SIG_SHIFT, OFFSET_SIG_MAX_BITS = 4, 24
+SIG_SHIFT, SIG_BIT, SIG_DELTA_BIT = 3, 12, 7
+SIG_LENGTH = 4
+
+# Prefetch tracker addresses of entries without a prefetch (0xdeadbeef) and of free slots
+NO_PREFETCH = -1
+FREE = -2
+
+_U32 = np.uint64(0xffffffff)
+
+
+def _u64(x, shift=0):
+    return x.astype(np.uint64) << np.uint64(shift)
+
+
+def folded_xor(value):
+    """32-bit folded XOR of 64-bit values (util.cc, num_folds = 2)."""
+    return ((value ^ (value >> np.uint64(32))) & _U32).astype(np.uint32)
+
+
+def jenkins(key):
+    """Robert Jenkins' 32 bit mix function (HashZoo::jenkins) of a uint32 array."""
+    key = key.astype(np.uint32)
+    key += key << np.uint32(12)
+    key ^= key >> np.uint32(22)
+    key += key << np.uint32(4)
+    key ^= key >> np.uint32(9)
+    key += key << np.uint32(10)
+    key ^= key >> np.uint32(2)
+    key += key << np.uint32(7)
+    key ^= key >> np.uint32(12)
+    return key
+
+
+HASHES = {1: lambda key: key, 2: jenkins}
+
+
+def demand_stream(chunks):
+    """
+    Return the (lines, pcs) of the L2C demand accesses of a trace: its
+    loads and stores that miss the L1D.
+    """
+    l1d = CacheLevel(*L1D)
+    lines, pcs = [], []
+    for records in chunks:
+        chunk_lines, chunk_pcs, _ = access_stream(records)
+        hit, _ = l1d.access(chunk_lines, np.zeros(len(chunk_lines), dtype=bool))
+        lines.append(chunk_lines[~hit])
+        pcs.append(chunk_pcs[~hit])
+    if not lines:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    return np.concatenate(lines), np.concatenate(pcs)
+
+
+def signature_table_misses(pages, size=ST_SIZE):
+    """Whether each access allocates a new entry in the LRU signature table of `size` pages."""
+    table = collections.OrderedDict()
+    miss = np.zeros(len(pages), dtype=bool)
+    for i, page in enumerate(pages.tolist()):
+        if page in table:
+            table.move_to_end(page)
+        else:
+            miss[i] = True
+            if len(table) >= size:
+                table.popitem(last=False)
+            table[page] = None
+    return miss
+
+
+def access_states(lines, pcs):
+    """
+    Return the State fields of every access (Scooby::invoke_prefetcher) as
+    arrays: pc, address, page, offset, delta, and the pc_path, offset_path
+    and delta_path signatures of the last four accesses to the page since
+    its signature table entry was allocated.
+    """
+    pages = lines // BLOCKS_PER_PAGE
+    offsets = lines % BLOCKS_PER_PAGE
+    n = len(lines)
+
+    # Accesses of the same table entry are consecutive in page order
+    order = np.argsort(pages, kind='stable')
+    entry = np.cumsum(signature_table_misses(pages)[order])
+    pc, off = pcs[order].astype(np.uint64), offsets[order]
+
+    def lagged(x, lag, fill=0):
+        out = np.full(n, fill, dtype=x.dtype)
+        out[lag:] = x[:n - lag]
+        return out
+
+    same = [np.ones(n, dtype=bool)] + [lagged(entry, lag, -1) == entry for lag in range(1, SIG_LENGTH + 1)]
+    delta = np.where(same[1], off - lagged(off, 1), 0)
+    sig_delta = np.where(delta < 0, -delta + (1 << (SIG_DELTA_BIT - 1)), delta).astype(np.uint64)
+
+    pc_path = np.zeros(n, np.uint64)
+    offset_path = np.zeros(n, np.uint64)
+    delta_path = np.zeros(n, np.uint64)
+    for lag in range(SIG_LENGTH):
+        pc_path ^= np.where(same[lag], (lagged(pc, lag) << np.uint64(PC_SIG_SHIFT * lag)) & _U32, 0)
+        offset_path ^= np.where(same[lag], lagged(off, lag).astype(np.uint64) << np.uint64(OFFSET_SIG_SHIFT * lag), 0)
+        # the lag-th last delta exists if there is an access before it
+        delta_path ^= np.where(same[lag + 1], lagged(sig_delta, lag) << np.uint64(SIG_SHIFT * lag), 0)
+
+    states = {
+        'pc': pc,
+        'page': pages[order].astype(np.uint64),
+        'offset': off,
+        'delta': delta,
+        'pc_path': pc_path & np.uint64((1 << PC_SIG_MAX_BITS) - 1),
+        'offset_path': offset_path & np.uint64((1 << OFFSET_SIG_MAX_BITS) - 1),
+        'delta_path': delta_path & np.uint64((1 << SIG_BIT) - 1),
+    }
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = np.arange(n)
+    states = {k: v[inverse] for k, v in states.items()}
+    states['address'] = _u64(lines, LOG2_BLOCK_SIZE)
+    return states
+
+
+def feature_keys(states, feature):
+    """The 32-bit index of one feature (FeatureKnowledge::process_*) before tiling and hashing."""
+    s = states
+    pc, page, address = s['pc'], s['page'], s['address']
+    offset = s['offset'].astype(np.uint64)
+    delta = s['delta']
+    unsigned_delta = np.where(delta < 0, -delta + (1 << (DELTA_BITS - 1)), delta).astype(np.uint64)
+    pc_path, offset_path, delta_path = s['pc_path'], s['offset_path'], s['delta_path']
+    u = np.uint64
+    name = FEATURE_NAMES[feature]
+    if name == 'PC':
+        return folded_xor(pc)
+    if name == 'Offset':
+        return offset.astype(np.uint32)
+    if name == 'Delta':
+        return unsigned_delta.astype(np.uint32)
+    if name == 'Address':
+        return folded_xor(address)
+    if name == 'PC_Offset':
+        return folded_xor((pc << u(6)) + offset)
+    if name == 'PC_Address':
+        return folded_xor((pc << u(16)) ^ address)
+    if name == 'PC_Page':
+        return folded_xor((pc << u(16)) ^ page)
+    if name == 'PC_Path':
+        return pc_path.astype(np.uint32)
+    if name == 'Delta_Path':
+        return delta_path.astype(np.uint32)
+    if name == 'Offset_Path':
+        return offset_path.astype(np.uint32)
+    if name == 'PC_Delta':
+        return folded_xor((pc << u(7)) + unsigned_delta)
+    if name == 'PC_Offset_Delta':
+        return folded_xor((((pc << u(6)) + offset) << u(7)) + unsigned_delta)
+    if name == 'Page':
+        return folded_xor(page)
+    if name == 'PC_Path_Offset':
+        return folded_xor((pc_path << u(6)) + offset)
+    if name == 'PC_Path_Offset_Path':
+        return folded_xor((pc_path << u(16)) + offset_path)
+    if name == 'PC_Path_Delta':
+        return folded_xor((pc_path << u(7)) + unsigned_delta)
+    if name == 'PC_Path_Delta_Path':
+        return folded_xor((pc_path << u(16)) + delta_path)
+    if name == 'PC_Path_Offset_Path_Delta_Path':
+        return folded_xor((((pc_path << u(10)) ^ offset_path) << u(10)) ^ delta_path)
+    if name == 'Offset_Path_PC':
+        return folded_xor((offset_path << u(32)) + pc)
+    if name == 'Delta_Path_PC':
+        return folded_xor((delta_path << u(32)) + pc)
+    raise ValueError('unknown feature %d' % feature)
+
+
+def tile_indices(states, feature, tilings=NUM_TILINGS, tiles=NUM_TILES, hash_type=HASH_TYPE):
+    """Tile index of every access in every tiling of a feature, as an (accesses, tilings) array."""
+    key = feature_keys(states, feature)
+    out = np.empty((len(key), tilings), dtype=np.min_scalar_type(tiles - 1))
+    for tiling in range(tilings):
+        out[:, tiling] = HASHES[hash_type](key ^ TILING_OFFSET[tiling]) % np.uint32(tiles)
+    return out
+
+
+class FeaturewiseReplay(object):
+    """
+    The featurewise agents of a set of feature combinations of the same
+    size, replayed in lockstep on one access stream. The Q-tables of all
+    combinations, features and tilings are the rows of one (rows, actions)
+    array; the prefetch tracker arrays are [combination, slot], a FIFO per
+    combination that starts at `head`.
+    """
+
+    def __init__(self, combos, tilings=NUM_TILINGS, tiles=NUM_TILES, fill_delay=DEFAULT_FILL_DELAY):
+        self.combos = np.array(combos, dtype=np.int64)
+        ncombos, nfeatures = self.combos.shape
+        self.tilings = tilings
+        self.tiles = tiles
+        self.fill_delay = fill_delay
+        self.q = np.full((ncombos * nfeatures * tilings * tiles, len(ACTIONS)), 1.0 / (1 - GAMMA), dtype=np.float32)
+        # row of tile 0 of every (combination, feature, tiling)
+        self.base = np.arange(ncombos * nfeatures * tilings).reshape(ncombos, nfeatures, tilings) * tiles
+
+        # tracker entries are indexed combination * PT_SIZE + slot; an entry
+        # keeps the Q-table cells (row * actions + action) of its state and action
+        self.pt_addr = np.full((ncombos, PT_SIZE), FREE, dtype=np.int64)
+        self.pt_time = np.zeros(ncombos * PT_SIZE, dtype=np.int64)
+        self.pt_cells = np.zeros((ncombos * PT_SIZE, nfeatures, tilings), dtype=np.int64)
+        self.pt_reward = np.zeros(ncombos * PT_SIZE, dtype=np.float32)
+        self.pt_has_reward = np.zeros(ncombos * PT_SIZE, dtype=bool)
+        self.head = np.zeros(ncombos, dtype=np.int64)
+        self.size = np.zeros(ncombos, dtype=np.int64)
+
+        # the last entry evicted from the tracker, trained with the next one
+        self.last_valid = np.zeros(ncombos, dtype=bool)
+        self.last_addr = np.zeros(ncombos, dtype=np.int64)
+        self.last_cells = np.zeros((ncombos, nfeatures, tilings), dtype=np.int64)
+        self.last_reward = np.zeros(ncombos, dtype=np.float32)
+        self.last_has_reward = np.zeros(ncombos, dtype=bool)
+
+        self.issued = np.zeros(ncombos, dtype=np.int64)
+        self.useful = np.zeros(ncombos, dtype=np.int64)
+        self.covered = np.zeros(ncombos, dtype=np.int64)
+
+    def consult(self, rows):
+        """consultQ() of every action for all combinations, given the Q rows of their state."""
+        q = self.q.take(rows, axis=0)
+        q = sum(q[:, :, tiling] for tiling in range(self.tilings))
+        pooled = q[:, 0]
+        for feature in range(1, q.shape[1]):
+            pooled = np.maximum(pooled, q[:, feature]) if POOLING_TYPE == 2 else pooled + q[:, feature]
+        return pooled
+
+    def _train(self, cells1, reward, cells2):
+        """SARSA update of every feature and tiling, as FeatureKnowledge::updateQ()."""
+        q = self.q.reshape(-1)
+        q1 = q[cells1]
+        q[cells1] = q1 + ALPHA * (reward[:, None, None] + GAMMA * q[cells2] - q1)
+
+    def step(self, tiles, i, line, offset, explore, random_action, baseline_miss):
+        # Scooby::reward(address): the oldest tracker entry of the line gets the demand reward
+        match = self.pt_addr == line
+        found = np.nonzero(match.any(axis=1))[0]
+        if len(found):
+            time = np.where(match[found], self.pt_time.reshape(-1, PT_SIZE)[found], i)
+            entry = found * PT_SIZE + time.argmin(axis=1)
+            fresh = ~self.pt_has_reward[entry]
+            c, entry = found[fresh], entry[fresh]
+            timely = i - self.pt_time[entry] >= self.fill_delay
+            self.pt_reward[entry] = np.where(timely, REWARD_CORRECT_TIMELY, REWARD_CORRECT_UNTIMELY)
+            self.pt_has_reward[entry] = True
+            self.useful[c] += 1
+            self.covered[c] += baseline_miss
+
+        # chooseAction(): epsilon-greedy, getMaxAction() with the action fallback
+        rows = self.base + tiles[i].take(self.combos, axis=0)
+        if explore:
+            action = np.full(len(self.combos), random_action)
+        else:
+            q = self.consult(rows)
+            action = q.argmax(axis=1)
+            action[q.max(axis=1) <= 0] = 0
+
+        # predict() and track()
+        delta = ACTIONS[action]
+        target = offset + delta
+        in_page = (delta != 0) & (target >= 0) & (target < BLOCKS_PER_PAGE)
+        addr = np.where(in_page, line - offset + target, NO_PREFETCH)
+        tracked = in_page & (self.pt_addr == addr[:, None]).any(axis=1)
+        self.issued += in_page & ~tracked
+        push = np.nonzero(~tracked)[0]
+
+        # a full tracker evicts its oldest entry, which trains the previously evicted one
+        full = push[self.size[push] == PT_SIZE]
+        evicted = full * PT_SIZE + self.head[full]
+        valid = self.last_valid[full]
+        if valid.any():
+            train = full[valid]
+            reward = np.where(self.last_has_reward[train], self.last_reward[train],
+                              np.where(self.last_addr[train] == NO_PREFETCH, REWARD_NONE, REWARD_INCORRECT))
+            self._train(self.last_cells[train], reward, self.pt_cells[evicted[valid]])
+        self.last_valid[full] = True
+        self.last_addr[full] = self.pt_addr.reshape(-1)[evicted]
+        self.last_cells[full] = self.pt_cells[evicted]
+        self.last_reward[full] = self.pt_reward[evicted]
+        self.last_has_reward[full] = self.pt_has_reward[evicted]
+
+        entry = push * PT_SIZE + (self.head[push] + self.size[push]) % PT_SIZE
+        out_of_bounds = (delta[push] != 0) & ~in_page[push]
+        self.pt_addr.reshape(-1)[entry] = addr[push]
+        self.pt_time[entry] = i
+        self.pt_cells[entry] = rows[push] * len(ACTIONS) + action[push, None, None]
+        self.pt_reward[entry] = np.where(out_of_bounds, REWARD_OUT_OF_BOUNDS, 0)
+        self.pt_has_reward[entry] = out_of_bounds
+        self.head[full] = (self.head[full] + 1) % PT_SIZE
+        self.size[push] = np.minimum(self.size[push] + 1, PT_SIZE)
+
+    def run(self, tiles, lines, baseline_miss, seed=SEED):
+        """Replay the access stream; `tiles` is indexed [access, feature, tiling]."""
+        offsets = lines % BLOCKS_PER_PAGE
+        rng = np.random.default_rng(seed)
+        explore = rng.random(len(lines)) < EPSILON
+        random_action = rng.integers(0, len(ACTIONS), len(lines))
+        for i, (line, offset, e, a, m) in enumerate(zip(lines.tolist(), offsets.tolist(), explore.tolist(),
+                                                         random_action.tolist(), baseline_miss.tolist())):
+            self.step(tiles, i, line, offset, e, a, m)
+
+
+def feature_combinations(features, sizes):
+    """Feature combinations in the order of gen_feature_exps.pl."""
+    return [combo for size in sizes for combo in itertools.combinations(features, size)]
+
+
+def combination_name(combo):
+    return '+'.join(FEATURE_NAMES[f] for f in combo)
+
+
+def replay(path, combos, count=DEFAULT_RECORDS, cloudsuite=False, tilings=NUM_TILINGS, tiles=NUM_TILES,
+           fill_delay=DEFAULT_FILL_DELAY):
+    """
+    Replay the feature combinations `combos` on the first `count` records
+    of a trace. Return one row per combination.
+    """
+    lines, pcs = demand_stream(read_chunks(path, cloudsuite=cloudsuite, count=count))
+    baseline_hit, _ = CacheLevel(*L2C).access(lines, np.zeros(len(lines), dtype=bool))
+    baseline_miss = ~baseline_hit
+    states = access_states(lines, pcs)
+    used = sorted(set(f for combo in combos for f in combo))
+    feature_tiles = np.zeros((len(lines), len(FEATURE_NAMES), tilings), dtype=np.min_scalar_type(tiles - 1))
+    for f in used:
+        feature_tiles[:, f] = tile_indices(states, f, tilings, tiles)
+    del states
+
+    rows = []
+    for size in sorted(set(len(c) for c in combos)):
+        group = [c for c in combos if len(c) == size]
+        agent = FeaturewiseReplay(group, tilings, tiles, fill_delay)
+        agent.run(feature_tiles, lines, baseline_miss)
+        for combo, issued, useful, covered in zip(group, agent.issued, agent.useful, agent.covered):
+            rows.append({
+                'Trace': os.path.basename(path),
+                'Features': combination_name(combo),
+                'Feature_IDs': ','.join(str(f) for f in combo),
+                'Issued': int(issued),
+                'Useful': int(useful),
+                'Accuracy_%': 100.0 * useful / issued if issued else 0.0,
+                'Coverage_%': 100.0 * covered / max(int(baseline_miss.sum()), 1),
+                'Baseline_L2C_miss': int(baseline_miss.sum()),
+            })
+    return rows
+
+
+def featurewise_knobs(combo, tilings=NUM_TILINGS, tiles=NUM_TILES):
+    """The --le_featurewise_* knobs that run a feature combination, as gen_feature_exps.pl writes them."""
+    n = len(combo)
+    return ('--le_featurewise_active_features=%s --le_featurewise_num_tilings=%s --le_featurewise_num_tiles=%s '
+            '--le_featurewise_hash_types=%s --le_featurewise_enable_tiling_offset=%s '
+            '--le_featurewise_feature_weights=%s' % (
+                ','.join(str(f) for f in combo), ','.join([str(tilings)] * n), ','.join([str(tiles)] * n),
+                ','.join(['2'] * n), ','.join(['1'] * n), ','.join(['1'] * n)))
+
+
+def write_exp(combos, out, tilings=NUM_TILINGS, tiles=NUM_TILES):
+    """Write experiment lines for the combinations, as gen_feature_exps.pl does."""
+    for combo in combos:
+        out.write('scooby_%s_%dx%d  $(BASE) $(SCOOBY) %s\n' % (
+            combination_name(combo), tilings, tiles, featurewise_knobs(combo, tilings, tiles)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank featurewise Pythia feature combinations by offline replay')
+    parser.add_argument('traces', nargs='+', help='traces to replay')
+    parser.add_argument('--features', type=int, nargs='+', default=list(range(len(FEATURE_NAMES))),
+                        help='feature IDs to combine (default: all)')
+    parser.add_argument('--num-combs', type=int, nargs='+', default=[1, 2],
+                        help='numbers of features per combination (default: %(default)s)')
+    parser.add_argument('--tilings', type=int, default=NUM_TILINGS, help='tilings per feature (default: %(default)s)')
+    parser.add_argument('--tiles', type=int, default=NUM_TILES, help='tiles per tiling (default: %(default)s)')
+    parser.add_argument('--count', type=int, default=DEFAULT_RECORDS,
+                        help='records to replay per trace (default: %(default)s)')
+    parser.add_argument('--cloudsuite', action='store_true', help='CloudSuite record format')
+    parser.add_argument('--fill-delay', type=int, default=DEFAULT_FILL_DELAY,
+                        help='L2C accesses until a prefetch counts as filled (default: %(default)s)')
+    parser.add_argument('--sort', default='Coverage_%', choices=['Coverage_%', 'Accuracy_%'],
+                        help='ranking column (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=20, help='combinations to print (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: all CPUs)')
+    parser.add_argument('--out', help='also write the per-trace results to a CSV file')
+    parser.add_argument('--exp', help='write the top combinations as experiment lines to this file')
+    args = parser.parse_args()
+
+    for f in args.features:
+        if not 0 <= f < len(FEATURE_NAMES):
+            sys.exit('invalid feature %d' % f)
+    if args.tilings > len(TILING_OFFSET):
+        sys.exit('at most %d tilings are supported' % len(TILING_OFFSET))
+    combos = feature_combinations(sorted(set(args.features)), args.num_combs)
+
+    # one task per trace and share of the combinations, so that a few traces still use all workers
+    jobs = args.jobs or os.cpu_count()
+    shares = max(1, -(-jobs // len(args.traces)))
+    tasks = [(path, combos[k::shares]) for path in args.traces for k in range(shares) if combos[k::shares]]
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(replay, path, share, args.count, args.cloudsuite, args.tilings, args.tiles,
+                               args.fill_delay) for path, share in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows.extend(future.result())
+            print('[%d/%d] replayed' % (done, len(tasks)), file=sys.stderr)
+
+    df = pd.DataFrame(rows)
+    other = 'Accuracy_%' if args.sort == 'Coverage_%' else 'Coverage_%'
+    ranking = (df.groupby(['Features', 'Feature_IDs'], sort=False)[['Coverage_%', 'Accuracy_%', 'Issued']].mean()
+               .sort_values([args.sort, other], ascending=False).reset_index())
+    print('Average over %d traces, top %d of %d combinations:' % (len(args.traces), min(args.top, len(ranking)),
+                                                                  len(ranking)))
+    print(ranking.head(args.top).to_string(index=False, float_format=lambda x: '%.1f' % x))
+    if args.out:
+        df.to_csv(args.out, index=False)
+    if args.exp:
+        top = [tuple(int(f) for f in ids.split(',')) for ids in ranking['Feature_IDs'].head(args.top)]
+        with open(args.exp, 'w') as out:
+            out.write('#Top %d combinations by offline replay (%s)\n' % (len(top), args.sort))
+            write_exp(top, out, args.tilings, args.tiles)
+
+
+if __name__ == '__main__':
+    main()
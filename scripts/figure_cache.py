@@ -0,0 +1,186 @@
+"""
+Content-addressed cache for figure renders.
+
+A figure is a pure function of its input data and its own code: the
+RollupCube slice it reads (the METRICS columns of its rollup) and the
+module source, which holds the figure configuration (prefetcher lists,
+colors, labels, DRAM bandwidths, ...), together with every module of this
+repository it imports, directly or not. Module-level `*_FILE` paths (e.g.
+the EXP_FILE a figure reads its sweep axes from) are configuration too and
+are hashed with the source. cached_render() hashes all of these and, on
+a hit, restores the saved PNG/PDF files and replays the printed data
+instead of calling render() again. On a miss it records every file the
+figure saves and stores it under the key.
+
+Cache layout (default `.figure_cache/` next to the outputs):
+    <key>/manifest.json   -- {"outputs": {saved path: blob}, "stdout": ...}
+    <key>/<blob>          -- copy of each saved file
+
+Usage:
+    from figure_cache import cached_render
+    hit = cached_render(module, cube)          # module exposes render(cube)
+"""
+
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import matplotlib
+import matplotlib.figure
+import numpy as np
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = '.figure_cache'
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _local_sources(module):
+    """
+    Return the files the figure depends on: the module itself, the modules
+    of this repository it imports, directly or through other modules of
+    this repository (sweep_axes.py -> speedup.py, bootstrap.py, ...), and
+    its *_FILE inputs.
+    """
+    root = os.path.dirname(_HERE)
+    files = {os.path.abspath(module.__file__)}
+    todo = [module]
+    while todo:
+        for value in list(vars(todo.pop()).values()):
+            dep = value if inspect.ismodule(value) else inspect.getmodule(value)
+            path = getattr(dep, '__file__', None)
+            if not path:
+                continue
+            path = os.path.abspath(path)
+            if path.startswith(root + os.sep) and path not in files:
+                files.add(path)
+                todo.append(dep)
+    for name, value in vars(module).items():
+        if name.endswith('_FILE') and isinstance(value, str) and os.path.isfile(value):
+            files.add(os.path.abspath(value))
+    return sorted(files)
+
+
+def _update(h, arr):
+    arr = np.ascontiguousarray(arr)
+    h.update(('%s%s' % (arr.dtype.str, arr.shape)).encode())
+    h.update(memoryview(arr).cast('B'))
+
+
+def figure_key(module, cube):
+    """
+    Return the cache key of rendering `module` on `cube`. Only the metric
+    columns listed in the module's METRICS are part of the input.
+    """
+    h = hashlib.sha256()
+    h.update(('figure-cache %d matplotlib %s\n' % (CACHE_VERSION, matplotlib.__version__)).encode())
+    for path in _local_sources(module):
+        with open(path, 'rb') as f:
+            h.update(os.path.basename(path).encode() + b'\0' + f.read())
+    metrics = [m for m in getattr(module, 'METRICS', cube.metrics) if cube.has_metric(m)]
+    h.update(json.dumps([cube.traces, cube.exps, metrics]).encode())
+    _update(h, cube.select(metrics=metrics))
+    _update(h, cube.present)
+    _update(h, cube.valid)
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _record_saves():
+    """Record the path of every file saved through Figure.savefig."""
+    saved = []
+    original = matplotlib.figure.Figure.savefig
+
+    def savefig(self, fname, *args, **kwargs):
+        result = original(self, fname, *args, **kwargs)
+        if isinstance(fname, (str, os.PathLike)):
+            path = os.fspath(fname)
+            if path not in saved:
+                saved.append(path)
+        return result
+
+    matplotlib.figure.Figure.savefig = savefig
+    try:
+        yield saved
+    finally:
+        matplotlib.figure.Figure.savefig = original
+
+
+def _read_entry(entry):
+    """Return the manifest of a complete cache entry, or None."""
+    try:
+        with open(os.path.join(entry, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.isfile(os.path.join(entry, b)) for b in manifest['outputs'].values()):
+        return None
+    return manifest
+
+
+def _restore(entry, manifest):
+    for path, blob in manifest['outputs'].items():
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        shutil.copyfile(os.path.join(entry, blob), path)
+    sys.stdout.write(manifest['stdout'])
+
+
+def _store(entry, saved, stdout):
+    """
+    Write a cache entry atomically; a concurrent writer of the same key
+    wins. An incomplete entry (e.g. of a crashed run) is replaced.
+    """
+    parent = os.path.dirname(entry)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        outputs = {}
+        for i, path in enumerate(saved):
+            if not os.path.isfile(path):
+                continue
+            blob = '%d%s' % (i, os.path.splitext(path)[1])
+            shutil.copyfile(path, os.path.join(tmp, blob))
+            outputs[path] = blob
+        with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+            json.dump({'outputs': outputs, 'stdout': stdout}, f, indent=1)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            if not os.path.isdir(entry) or _read_entry(entry) is not None:
+                raise
+            shutil.rmtree(entry, ignore_errors=True)
+            os.rename(tmp, entry)
+    except OSError:
+        if _read_entry(entry) is not None:
+            return
+        raise
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+
+
+def cached_render(module, cube, cache_dir=DEFAULT_CACHE):
+    """
+    Render `module` (which exposes render(cube)) on `cube` unless an
+    identical render is cached. Return True on a cache hit. Printed output
+    goes to sys.stdout in both cases.
+    """
+    entry = os.path.join(cache_dir, figure_key(module, cube))
+    manifest = _read_entry(entry)
+    if manifest is not None:
+        _restore(entry, manifest)
+        return True
+
+    out = io.StringIO()
+    with _record_saves() as saved, contextlib.redirect_stdout(out):
+        module.render(cube)
+    sys.stdout.write(out.getvalue())
+    _store(entry, saved, out.getvalue())
+    return False
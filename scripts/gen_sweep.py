@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Experiment files for knob searches: designed subsets and successive halving.
+
+A knob space is a text file with one knob per line, in the spirit of the
+`VAR = value` lines of an .exp file:
+
+    # choices, separated by whitespace (values may contain commas)
+    scooby_pt_size = 128 256 512
+    le_featurewise_num_tilings = 3,3 4,4
+    # ranges: lo:hi (float), lo:hi:int, lo:hi:log (log-uniform)
+    scooby_alpha = 0.001:0.05:log
+    scooby_gamma = 0.3:0.9
+
+`--features` adds the feature combinations of gen_feature_exps.pl as one
+more choice axis (the --le_featurewise_* knobs of every combination).
+
+`design` writes one .exp file with the candidates of a design:
+
+    factorial  every combination of the choices (ranges take --levels
+               evenly spaced values)
+    lhs        --samples points of a Latin hypercube
+    random     --samples uniformly random points
+
+Successive halving runs every candidate on a small simulation budget and
+promotes only the best 1/eta of them to a budget eta times larger, until
+the last round runs the survivors with the full window:
+
+    gen_sweep.py halving --space pythia.space --out-dir sweep   # sweep/round0.exp
+    (run round0.exp and roll it up, then)
+    gen_sweep.py promote --state sweep/halving.json --rollup round0.csv   # sweep/round1.exp
+    ...
+
+or `gen_sweep.py run --state sweep/halving.json --exe ... --tlist ...`,
+which runs every round with run_jobs.py in sweep/round<r>/ and rolls it up
+itself. Candidates are ranked by the geometric mean of --metric over the
+traces; a candidate without a usable value on some trace ranks last. With
+the same traces for every candidate this is the order of the geometric mean
+speedup over any common baseline.
+
+A warmup of --warmup instructions goes with the full budget; earlier rounds
+warm up for the same fraction of their budget.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from exp_files import parse_tlist
+from featurewise_replay import (FEATURE_NAMES, NUM_TILES, NUM_TILINGS, combination_name,
+                                feature_combinations, featurewise_knobs)
+from rollup import rollup, write_csv
+from rollup_cube import load_cube
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE = 'halving.json'
+
+DEFAULT_CONFIG = '--l2c_prefetcher_types=scooby --config=$(PYTHIA_HOME)/config/pythia.ini'
+DEFAULT_METRIC = 'Core_0_IPC'
+# the BASE window of MICRO21_1C.exp
+DEFAULT_WARMUP = 10000000
+DEFAULT_SIMULATION = 50000000
+
+
+class Axis(object):
+    """
+    One knob of the space: a list of choices, or a range (kind 'float',
+    'int' or 'log') between lo and hi.
+    """
+
+    def __init__(self, name, choices=None, lo=None, hi=None, kind='choice'):
+        self.name = name
+        self.choices = choices
+        self.lo = lo
+        self.hi = hi
+        self.kind = kind
+
+    def levels(self, n):
+        """Values of a full-factorial design: the choices, or n evenly spaced values of the range."""
+        if self.kind == 'choice':
+            return list(self.choices)
+        return self.values(np.linspace(0, 1, n) if n > 1 else np.array([0.5]))
+
+    def values(self, u):
+        """Map points u in [0, 1] to values of the axis."""
+        if self.kind == 'choice':
+            return [self.choices[min(int(x * len(self.choices)), len(self.choices) - 1)] for x in u]
+        if self.kind == 'log':
+            return ['%.6g' % v for v in np.exp(np.log(self.lo) + u * (np.log(self.hi) - np.log(self.lo)))]
+        if self.kind == 'int':
+            # every integer of [lo, hi] gets the same share of [0, 1]
+            return ['%d' % min(int(self.lo + x * (self.hi - self.lo + 1)), int(self.hi)) for x in u]
+        return ['%.6g' % v for v in self.lo + u * (self.hi - self.lo)]
+
+    def knobs(self, value):
+        return '--%s=%s' % (self.name, value)
+
+
+class FeatureAxis(Axis):
+    """Feature combinations of the featurewise learning engine, as a choice axis."""
+
+    def __init__(self, features, sizes, tilings=NUM_TILINGS, tiles=NUM_TILES):
+        Axis.__init__(self, 'features', choices=feature_combinations(features, sizes))
+        self.tilings = tilings
+        self.tiles = tiles
+
+    def knobs(self, combo):
+        return featurewise_knobs(combo, self.tilings, self.tiles)
+
+    def label(self, combo):
+        return '%s_%dx%d' % (combination_name(combo), self.tilings, self.tiles)
+
+
+def parse_space(path):
+    """Read a knob space file. Return its axes in file order."""
+    axes = []
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if line == '' or line.startswith('#'):
+                continue
+            name, sep, spec = line.partition('=')
+            name, tokens = name.strip().lstrip('-'), spec.split()
+            if not sep or not tokens:
+                raise ValueError('%s: expected `knob = values`: %s' % (path, line))
+            if len(tokens) == 1 and ':' in tokens[0]:
+                fields = tokens[0].split(':')
+                kind = fields[2] if len(fields) > 2 else 'float'
+                if kind not in ('float', 'int', 'log'):
+                    raise ValueError('%s: unknown range type %s of %s' % (path, kind, name))
+                lo, hi = float(fields[0]), float(fields[1])
+                if kind == 'log' and lo <= 0:
+                    raise ValueError('%s: log range of %s must be positive' % (path, name))
+                axes.append(Axis(name, lo=lo, hi=hi, kind=kind))
+            else:
+                axes.append(Axis(name, choices=tokens))
+    return axes
+
+
+def design(axes, kind, samples=None, levels=3, seed=0):
+    """Return the points of a design, as lists of one value per axis (duplicates removed)."""
+    if kind == 'factorial':
+        points = itertools.product(*[axis.levels(levels) for axis in axes])
+    else:
+        rng = np.random.default_rng(seed)
+        if kind == 'lhs':
+            # one point in every 1/samples stratum of every axis
+            u = np.stack([(rng.permutation(samples) + rng.random(samples)) / samples for _ in axes], axis=1)
+        elif kind == 'random':
+            u = rng.random((samples, len(axes)))
+        else:
+            raise ValueError('unknown design %s' % kind)
+        columns = [axis.values(u[:, k]) for k, axis in enumerate(axes)]
+        points = zip(*columns)
+    unique = []
+    seen = set()
+    for point in points:
+        key = tuple(point)
+        if key not in seen:
+            seen.add(key)
+            unique.append(list(point))
+    return unique
+
+
+def candidates(axes, points, prefix):
+    """Return [(name, knobs)] of the points of a design."""
+    features = [k for k, axis in enumerate(axes) if isinstance(axis, FeatureAxis)]
+    only_features = len(axes) == len(features) == 1
+    width = len(str(max(len(points) - 1, 0)))
+    result = []
+    for i, point in enumerate(points):
+        knobs = ' '.join(axis.knobs(value) for axis, value in zip(axes, point))
+        if only_features:
+            # the names of gen_feature_exps.pl
+            name = '%s_%s' % (prefix, axes[0].label(point[0]))
+        else:
+            name = '%s_%0*d' % (prefix, width, i)
+        result.append((name, knobs))
+    return result
+
+
+def write_exp(out, cands, warmup, simulation, config, baseline=None, comment=None):
+    """Write an experiment file: BASE and CONFIG definitions, then one line per candidate."""
+    if comment:
+        out.write('# %s\n\n' % comment)
+    out.write('BASE = --warmup_instructions=%d --simulation_instructions=%d\n' % (warmup, simulation))
+    out.write('CONFIG = %s\n\n' % config)
+    if baseline:
+        out.write('%s\n' % baseline)
+    width = max([len(name) for name, _ in cands] + [1])
+    for name, knobs in cands:
+        out.write('%-*s  $(BASE) $(CONFIG) %s\n' % (width, name, knobs))
+
+
+def rank(cube, exps, metric, minimize=False):
+    """
+    Return [(exp, score)] best first, where score is the geometric mean of
+    `metric` over the traces of the cube (None if some trace has no usable
+    value; those rank last).
+    """
+    values = cube.metric(metric, exps=exps)
+    usable = cube.present[:, cube.exp_index(exps)] & np.isfinite(values) & (values > 0)
+    scores = []
+    for k, exp in enumerate(exps):
+        if len(values) and usable[:, k].all():
+            scores.append((exp, float(np.exp(np.log(values[:, k]).mean()))))
+        else:
+            scores.append((exp, None))
+    sign = 1 if minimize else -1
+    return sorted(scores, key=lambda s: (s[1] is None, sign * (s[1] or 0)))
+
+
+class Halving(object):
+    """
+    State of a successive-halving search, kept in <dir>/halving.json.
+
+    candidates -- {name: knobs}
+    rounds     -- [{'budget':, 'warmup':, 'exps': [...], 'ranking': [[exp, score], ...] or None}]
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def create(cls, directory, cands, budgets, warmup, eta, config, metric, minimize, baseline):
+        os.makedirs(directory, exist_ok=True)
+        data = {'version': cls.VERSION, 'eta': eta, 'budgets': budgets, 'warmup': warmup, 'config': config,
+                'metric': metric, 'minimize': minimize, 'baseline': baseline,
+                'candidates': dict(cands), 'order': [name for name, _ in cands], 'rounds': []}
+        state = cls(os.path.join(directory, STATE), data)
+        state.start_round([name for name, _ in cands])
+        return state
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            data = json.load(fh)
+        if data.get('version') != cls.VERSION:
+            sys.exit('%s: unknown halving state version' % path)
+        return cls(path, data)
+
+    def save(self):
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump(self.data, fh, indent=1)
+        os.replace(tmp, self.path)
+
+    @property
+    def rounds(self):
+        return self.data['rounds']
+
+    @property
+    def current(self):
+        return len(self.rounds) - 1
+
+    @property
+    def finished(self):
+        return len(self.rounds) == len(self.data['budgets']) and self.rounds[-1]['ranking'] is not None
+
+    def exp_file(self, r):
+        return os.path.join(os.path.dirname(self.path), 'round%d.exp' % r)
+
+    def start_round(self, exps):
+        r = len(self.rounds)
+        budget = self.data['budgets'][r]
+        # the full warmup goes with the full budget
+        warmup = int(round(self.data['warmup'] * budget / self.data['budgets'][-1]))
+        self.rounds.append({'budget': budget, 'warmup': warmup, 'exps': exps, 'ranking': None})
+        with open(self.exp_file(r), 'w') as out:
+            write_exp(out, [(name, self.data['candidates'][name]) for name in exps], warmup, budget,
+                      self.data['config'], self.data['baseline'],
+                      'successive halving round %d (last round %d): %d candidates'
+                      % (r, len(self.data['budgets']) - 1, len(exps)))
+        self.save()
+
+    def promote(self, cube):
+        """Rank the current round on a rollup of it and start the next round, if any."""
+        current = self.rounds[-1]
+        missing = [e for e in current['exps'] if not cube.has_exp(e)]
+        if missing:
+            raise ValueError('%d experiments of round %d are not in the rollup, e.g. %s'
+                             % (len(missing), self.current, missing[0]))
+        current['ranking'] = rank(cube, current['exps'], self.data['metric'], self.data['minimize'])
+        if len(self.rounds) < len(self.data['budgets']):
+            keep = max(1, int(math.ceil(len(current['exps']) / float(self.data['eta']))))
+            self.start_round([exp for exp, _ in current['ranking'][:keep]])
+        else:
+            self.save()
+        return current['ranking']
+
+
+def budgets(min_budget, max_budget, eta, rounds=None):
+    """Simulation budgets of the rounds: min_budget * eta^r, the last one max_budget."""
+    if rounds is None:
+        rounds = 1
+        while min_budget * eta ** (rounds - 1) < max_budget:
+            rounds += 1
+    return [int(min(min_budget * eta ** r, max_budget)) for r in range(rounds - 1)] + [int(max_budget)]
+
+
+def print_ranking(ranking, metric, top):
+    print('%-50s %s' % ('Exp', metric))
+    for exp, score in ranking[:top]:
+        print('%-50s %s' % (exp, 'n/a' if score is None else '%.6f' % score))
+
+
+def run_rounds(state, exe, tlist, jobs=None, ncores=1, retries=0):
+    """Run and promote the remaining rounds of a halving search with run_jobs.py."""
+    traces = parse_tlist(tlist)
+    metrics = [{'NAME': state.data['metric'], 'TYPE': 'sum'}]
+    while not state.finished:
+        r = state.current
+        round_dir = os.path.join(os.path.dirname(state.path), 'round%d' % r)
+        os.makedirs(round_dir, exist_ok=True)
+        exp_file = os.path.abspath(state.exp_file(r))
+        print('round %d: %d candidates x %d traces, %d instructions'
+              % (r, len(state.rounds[r]['exps']), len(traces), state.rounds[r]['budget']), file=sys.stderr)
+        cmd = [sys.executable, os.path.join(HERE, 'run_jobs.py'), '--exe', exe, '--tlist', os.path.abspath(tlist),
+               '--exp', exp_file, '--dir', round_dir, '--ncores', str(ncores), '--resume',
+               '--retries', str(retries)]
+        if jobs:
+            cmd += ['--jobs', str(jobs)]
+        # failed runs rank last; they do not stop the search
+        subprocess.call(cmd)
+        exps = [{'NAME': name} for name in state.rounds[r]['exps']]
+        rows = rollup(traces, exps, metrics, directory=round_dir)
+        csv = os.path.join(round_dir, 'rollup.csv')
+        with open(csv, 'w') as out:
+            write_csv(rows, metrics, out)
+        state.promote(load_cube(csv))
+
+
+def add_space_args(parser):
+    parser.add_argument('--space', help='knob space file')
+    parser.add_argument('--features', type=int, nargs='+',
+                        help='add the combinations of these featurewise feature IDs as an axis')
+    parser.add_argument('--num-combs', type=int, nargs='+', default=[1, 2],
+                        help='numbers of features per combination (default: %(default)s)')
+    parser.add_argument('--tilings', type=int, default=NUM_TILINGS, help='tilings per feature (default: %(default)s)')
+    parser.add_argument('--tiles', type=int, default=NUM_TILES, help='tiles per tiling (default: %(default)s)')
+    parser.add_argument('--design', choices=['factorial', 'lhs', 'random'], default='factorial',
+                        help='design (default: %(default)s)')
+    parser.add_argument('--samples', type=int, help='points of an lhs or random design')
+    parser.add_argument('--levels', type=int, default=3, help='values per range axis of a factorial design (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the lhs and random designs (default: 0)')
+    parser.add_argument('--prefix', default='scooby', help='experiment name prefix (default: %(default)s)')
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help='knobs every candidate starts from '
+                        '(default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help='warmup instructions of the full budget (default: %(default)s)')
+    parser.add_argument('--baseline', help='experiment line to add to every .exp, e.g. '
+                        '"nopref $(BASE) --config=$(PYTHIA_HOME)/config/nopref.ini"')
+
+
+def space_candidates(args):
+    axes = parse_space(args.space) if args.space else []
+    if args.features:
+        unknown = [f for f in args.features if not 0 <= f < len(FEATURE_NAMES)]
+        if unknown:
+            sys.exit('unknown feature IDs: %s' % ' '.join(map(str, unknown)))
+        axes.append(FeatureAxis(args.features, args.num_combs, args.tilings, args.tiles))
+    if not axes:
+        sys.exit('supply --space and/or --features')
+    if args.design != 'factorial' and not args.samples:
+        sys.exit('--design %s needs --samples' % args.design)
+    return candidates(axes, design(axes, args.design, args.samples, args.levels, args.seed), args.prefix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate experiment files for knob searches')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('design', help='write an .exp file with the candidates of a design')
+    add_space_args(p)
+    p.add_argument('--simulation', type=int, default=DEFAULT_SIMULATION,
+                   help='simulation instructions (default: %(default)s)')
+    p.add_argument('--out', help='output .exp file (default: stdout)')
+
+    p = sub.add_parser('halving', help='start a successive-halving search')
+    add_space_args(p)
+    p.add_argument('--out-dir', required=True, help='directory of the search state and round .exp files')
+    p.add_argument('--min-budget', type=int, default=2000000,
+                   help='simulation instructions of the first round (default: %(default)s)')
+    p.add_argument('--max-budget', type=int, default=DEFAULT_SIMULATION,
+                   help='simulation instructions of the last round (default: %(default)s)')
+    p.add_argument('--eta', type=int, default=3, help='keep the best 1/eta of every round (default: %(default)s)')
+    p.add_argument('--rounds', type=int, help='number of rounds (default: until max-budget is reached)')
+    p.add_argument('--metric', default=DEFAULT_METRIC, help='metric to rank by (default: %(default)s)')
+    p.add_argument('--minimize', action='store_true', help='lower metric values are better')
+
+    p = sub.add_parser('promote', help='rank the current round from its rollup and write the next round')
+    p.add_argument('--state', required=True, help='halving.json of the search')
+    p.add_argument('--rollup', required=True, help='rollup of the current round (CSV or columnar directory)')
+    p.add_argument('--top', type=int, default=20, help='candidates of the ranking to print (default: 20)')
+
+    p = sub.add_parser('run', help='run the remaining rounds of a search locally with run_jobs.py')
+    p.add_argument('--state', required=True, help='halving.json of the search')
+    p.add_argument('--exe', required=True, help='ChampSim executable')
+    p.add_argument('--tlist', required=True, help='trace list')
+    p.add_argument('--ncores', type=int, default=1, help='value of the $(NCORES) hook (default: 1)')
+    p.add_argument('--jobs', type=int, help='concurrent simulations (default: all cores)')
+    p.add_argument('--retries', type=int, default=0, help='reruns of a failed job (default: 0)')
+    p.add_argument('--top', type=int, default=20, help='candidates of the final ranking to print (default: 20)')
+    args = parser.parse_args()
+
+    if args.command == 'design':
+        cands = space_candidates(args)
+        comment = '%s design: %d candidates' % (args.design, len(cands))
+        if args.out:
+            with open(args.out, 'w') as out:
+                write_exp(out, cands, args.warmup, args.simulation, args.config, args.baseline, comment)
+        else:
+            write_exp(sys.stdout, cands, args.warmup, args.simulation, args.config, args.baseline, comment)
+        print('%d candidates' % len(cands), file=sys.stderr)
+        return
+
+    if args.command == 'halving':
+        cands = space_candidates(args)
+        plan = budgets(args.min_budget, args.max_budget, args.eta, args.rounds)
+        state = Halving.create(args.out_dir, cands, plan, args.warmup, args.eta, args.config, args.metric,
+                               args.minimize, args.baseline)
+        n, full = len(cands), 0
+        for r, budget in enumerate(plan):
+            print('round %d: %5d candidates x %11d instructions' % (r, n, budget), file=sys.stderr)
+            full += n * budget
+            n = max(1, int(math.ceil(n / float(args.eta))))
+        print('%.1fx fewer simulated instructions than running all candidates at %d'
+              % (len(cands) * plan[-1] / float(full), plan[-1]), file=sys.stderr)
+        print('wrote %s' % state.exp_file(0), file=sys.stderr)
+        return
+
+    if 'PYTHIA_HOME' not in os.environ and args.command == 'run':
+        sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+    state = Halving.load(args.state)
+    if state.finished:
+        print_ranking(state.rounds[-1]['ranking'], state.data['metric'], args.top)
+        return
+    if args.command == 'promote':
+        try:
+            ranking = state.promote(load_cube(args.rollup))
+        except ValueError as e:
+            sys.exit('%s: %s' % (args.rollup, e))
+    else:
+        run_rounds(state, args.exe, args.tlist, args.jobs, args.ncores, args.retries)
+        ranking = state.rounds[-1]['ranking']
+    if state.finished:
+        print_ranking(ranking, state.data['metric'], args.top)
+    else:
+        print('round %d: %d candidates promoted, wrote %s'
+              % (state.current, len(state.rounds[-1]['exps']), state.exp_file(state.current)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
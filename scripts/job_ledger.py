@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+SQLite ledger of the simulation jobs of a sweep.
+
+Every job is a (trace, exp, knob hash) triple; the knob hash is the SHA-1 of
+the job's full command line (executable, experiment and trace knobs, trace
+files, after the create_jobfile.pl hook substitution), so a job rerun with
+other knobs is a new job. For every job the ledger keeps its state, exit
+code, wall time, host and number of attempts, and one row per attempt with
+why it ended the way it did.
+
+A job is `done` only if it exited with 0 and its output is complete, i.e.
+it holds the [ROI Statistics] block and the DRAM statistics that ChampSim
+prints last. Otherwise it is `failed` (nonzero exit or killed) or
+`incomplete` (exit 0, but the output stops early), and a resumed sweep runs
+it again. A job that is still `running` when a sweep is resumed was lost
+with the sweep (or is still running elsewhere). A job that run_jobs.py
+--prune stopped because it could not catch up with the best job on its
+trace (see early_stop.py) is `pruned`, and is not run again.
+
+run_jobs.py reports into <dir>/.jobs.db by default. Batch jobs report
+through wrapper.sh (see create_jobfile.pl --ledger), or any scheduler can
+run its command through
+
+    python3 job_ledger.py run --db jobs.db --trace T --exp E --output T_E.out -- <command>
+
+Usage:
+    python3 job_ledger.py status --db jobs.db              # states, failed jobs and why
+    python3 job_ledger.py resume --db jobs.db jobfile.sh > rerun.sh
+"""
+
+import argparse
+import hashlib
+import os
+import shlex
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+DEFAULT_LEDGER = '.jobs.db'
+
+# printed by main.cc at the end of the simulation, in this order
+ROI_MARKER = b'\n[ROI Statistics]\n'
+FINAL_MARKER = b'\nDRAM_bw_pochs '
+# `Pruned 1` record appended to the output of a pruned job
+PRUNED_RECORD = 'Pruned'
+
+PENDING, RUNNING, DONE, FAILED, INCOMPLETE, PRUNED = 'pending', 'running', 'done', 'failed', 'incomplete', 'pruned'
+STATES = [PENDING, RUNNING, DONE, FAILED, INCOMPLETE, PRUNED]
+# states of the jobs that a resumed sweep does not run again
+FINAL_STATES = (DONE, PRUNED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    trace     TEXT NOT NULL,
+    exp       TEXT NOT NULL,
+    knob_hash TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    cmdline   TEXT,
+    output    TEXT,
+    state     TEXT NOT NULL,
+    exit_code INTEGER,
+    reason    TEXT,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    wall_time REAL,
+    started   REAL,
+    finished  REAL,
+    host      TEXT,
+    PRIMARY KEY (trace, exp, knob_hash)
+);
+CREATE INDEX IF NOT EXISTS jobs_name ON jobs (name);
+CREATE TABLE IF NOT EXISTS attempts (
+    trace     TEXT NOT NULL,
+    exp       TEXT NOT NULL,
+    knob_hash TEXT NOT NULL,
+    attempt   INTEGER NOT NULL,
+    state     TEXT NOT NULL,
+    exit_code INTEGER,
+    reason    TEXT,
+    wall_time REAL,
+    started   REAL,
+    finished  REAL,
+    host      TEXT,
+    PRIMARY KEY (trace, exp, knob_hash, attempt)
+);
+"""
+
+
+def knob_hash(cmdline):
+    """Hash of a job's command line, with runs of whitespace collapsed."""
+    return hashlib.sha1(' '.join(cmdline.split()).encode()).hexdigest()
+
+
+def check_output(path):
+    """Return None if a ChampSim output is complete, else why it is not."""
+    try:
+        with open(path, 'rb') as fh:
+            data = fh.read()
+    except OSError:
+        return 'no output'
+    roi = data.find(ROI_MARKER)
+    if roi < 0:
+        return 'no [ROI Statistics] block'
+    if data.find(FINAL_MARKER, roi) < 0:
+        return 'statistics truncated'
+    return None
+
+
+def exit_reason(returncode):
+    if returncode is None:
+        return 'not started'
+    if returncode < 0:
+        return 'killed by signal %d' % -returncode
+    # the shell reports a signal as 128 + N
+    if returncode > 128:
+        return 'exit %d (signal %d?)' % (returncode, returncode - 128)
+    return 'exit %d' % returncode
+
+
+class JobLedger(object):
+    """
+    Job states in an SQLite database. One connection per ledger; the ledger
+    can be used from several threads, and several processes (e.g. batch jobs)
+    can report into the same database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # rollback journal rather than WAL: batch jobs on other nodes share the file
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _write(self, *statements):
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, args in statements:
+                    self.db.execute(sql, args)
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+
+    def register(self, jobs):
+        """Add the run_jobs.Job objects (trace, exp, name, cmdline, output) that are not in the ledger yet."""
+        self._write(*[('INSERT OR IGNORE INTO jobs (trace, exp, knob_hash, name, cmdline, output, state) '
+                       'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (job.trace, job.exp, knob_hash(job.cmdline), job.name, job.cmdline, job.output, PENDING))
+                      for job in jobs])
+
+    def start(self, trace, exp, cmdline, output, name=None):
+        """Record that a job started; return the start time."""
+        started = time.time()
+        key = (trace, exp, knob_hash(cmdline))
+        self._write(
+            ('INSERT OR IGNORE INTO jobs (trace, exp, knob_hash, name, cmdline, output, state) '
+             'VALUES (?, ?, ?, ?, ?, ?, ?)',
+             key + (name or '%s_%s' % (trace, exp), cmdline, output, PENDING)),
+            ('UPDATE jobs SET state = ?, attempts = attempts + 1, started = ?, finished = NULL, '
+             'exit_code = NULL, reason = NULL, host = ? WHERE trace = ? AND exp = ? AND knob_hash = ?',
+             (RUNNING, started, socket.gethostname()) + key))
+        return started
+
+    def finish(self, trace, exp, cmdline, returncode, wall_time, output, pruned=None):
+        """
+        Record the end of a job, checking its output. Return (state, reason):
+        DONE and None, or FAILED/INCOMPLETE and why. A job that was stopped
+        for the reason `pruned` is PRUNED.
+        """
+        if pruned is not None:
+            state, reason = PRUNED, pruned
+        elif returncode != 0:
+            state, reason = FAILED, exit_reason(returncode)
+        else:
+            reason = check_output(output)
+            state = DONE if reason is None else INCOMPLETE
+        finished = time.time()
+        key = (trace, exp, knob_hash(cmdline))
+        self._write(
+            ('UPDATE jobs SET state = ?, exit_code = ?, reason = ?, wall_time = ?, finished = ? '
+             'WHERE trace = ? AND exp = ? AND knob_hash = ?',
+             (state, returncode, reason, wall_time, finished) + key),
+            ('INSERT OR REPLACE INTO attempts (trace, exp, knob_hash, attempt, state, exit_code, reason, '
+             'wall_time, started, finished, host) '
+             'SELECT trace, exp, knob_hash, attempts, ?, ?, ?, ?, started, ?, host FROM jobs '
+             'WHERE trace = ? AND exp = ? AND knob_hash = ?',
+             (state, returncode, reason, wall_time, finished) + key))
+        return state, reason
+
+    def todo(self, jobs, max_attempts=None):
+        """
+        Return the jobs that are not done or pruned, in the given order, leaving out
+        jobs that already used up `max_attempts` attempts.
+        """
+        rows = {(trace, exp, h): (state, attempts) for trace, exp, h, state, attempts in
+                self.db.execute('SELECT trace, exp, knob_hash, state, attempts FROM jobs')}
+        todo = []
+        for job in jobs:
+            state, attempts = rows.get((job.trace, job.exp, knob_hash(job.cmdline)), (None, 0))
+            if state in FINAL_STATES or (max_attempts is not None and attempts >= max_attempts):
+                continue
+            todo.append(job)
+        return todo
+
+    def counts(self):
+        return dict(self.db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'))
+
+    def problems(self):
+        """(name, state, reason, attempts, host) of the jobs that failed, are incomplete or still running."""
+        return self.db.execute(
+            'SELECT name, state, reason, attempts, host FROM jobs WHERE state IN (?, ?, ?) ORDER BY name',
+            (FAILED, INCOMPLETE, RUNNING)).fetchall()
+
+
+def run_command(ledger, trace, exp, command, output, name=None):
+    """Run a shell command as a job of the ledger; return its exit code."""
+    started = ledger.start(trace, exp, command, output, name)
+    returncode = subprocess.call(command, shell=True)
+    ledger.finish(trace, exp, command, returncode, time.time() - started, output)
+    return returncode
+
+
+def jobfile_command(line):
+    """Simulator command line of a create_jobfile.pl line (what the ledger hashes), or None."""
+    tokens = shlex.split(line)
+    for i, token in enumerate(tokens):
+        if token.endswith('wrapper.sh') and len(tokens) > i + 2:
+            return '%s %s' % (tokens[i + 1], tokens[i + 2])
+    if '>' in tokens:
+        tokens = tokens[:tokens.index('>')]
+        # `job_ledger.py run ... -- <command>` lines of create_jobfile.pl --local 1 --ledger
+        if '--' in tokens:
+            tokens = tokens[tokens.index('--') + 1:]
+        return ' '.join(tokens)
+    return None
+
+
+def resume_jobfile(ledger, lines, max_attempts=None):
+    """
+    Yield the lines of a create_jobfile.pl jobfile, without the commands of
+    the jobs that are done or pruned (with the same command line) or ran out of attempts.
+    """
+    done = set()
+    attempts = {}
+    for cmd_hash, state, n in ledger.db.execute('SELECT knob_hash, state, attempts FROM jobs'):
+        if state in FINAL_STATES:
+            done.add(cmd_hash)
+        attempts[cmd_hash] = max(attempts.get(cmd_hash, 0), n)
+    for line in lines:
+        command = None if line.startswith('#') else jobfile_command(line)
+        if command is not None:
+            h = knob_hash(command)
+            if h in done or (max_attempts is not None and attempts.get(h, 0) >= max_attempts):
+                continue
+        yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite ledger of simulation jobs')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help='run a command as a job and record it')
+    p.add_argument('--db', default=DEFAULT_LEDGER, help='ledger database (default: %(default)s)')
+    p.add_argument('--trace', required=True, help='trace name')
+    p.add_argument('--exp', required=True, help='experiment name')
+    p.add_argument('--output', help='output file of the job to check (default: ${trace}_${exp}.out)')
+    p.add_argument('cmd', nargs=argparse.REMAINDER, help='command to run (after --)')
+
+    p = sub.add_parser('status', help='print the job states and the jobs that failed')
+    p.add_argument('--db', default=DEFAULT_LEDGER, help='ledger database (default: %(default)s)')
+
+    p = sub.add_parser('resume', help='filter a create_jobfile.pl jobfile down to the jobs that are not done')
+    p.add_argument('--db', default=DEFAULT_LEDGER, help='ledger database (default: %(default)s)')
+    p.add_argument('--max-attempts', type=int, help='leave out jobs that already ran this many times')
+    p.add_argument('jobfile', help='jobfile written by create_jobfile.pl')
+    args = parser.parse_args()
+
+    if args.command != 'run' and not os.path.exists(args.db):
+        sys.exit('%s does not exist' % args.db)
+    ledger = JobLedger(args.db)
+    if args.command == 'run':
+        cmd = args.cmd[1:] if args.cmd[:1] == ['--'] else args.cmd
+        if not cmd:
+            sys.exit('no command to run')
+        output = args.output or '%s_%s.out' % (args.trace, args.exp)
+        sys.exit(run_command(ledger, args.trace, args.exp, ' '.join(cmd), output))
+
+    if args.command == 'status':
+        counts = ledger.counts()
+        print('  '.join('%s %d' % (state, counts.get(state, 0)) for state in STATES))
+        for name, state, reason, attempts, host in ledger.problems():
+            print('%-60s %-10s %-30s attempts %d on %s' % (name, state, reason or '', attempts, host))
+        return
+
+    with open(args.jobfile) as fh:
+        for line in resume_jobfile(ledger, fh, args.max_attempts):
+            sys.stdout.write(line)
+
+
+if __name__ == '__main__':
+    main()
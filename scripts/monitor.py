@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Live monitor of running ChampSim simulations.
+
+Tails every `${trace}_${exp}.${ext}` file of a .tlist x .exp sweep at once
+and parses the heartbeat lines as they are written:
+
+    Heartbeat CPU  0 instructions:   10000003 cycles:    5123456 heartbeat IPC: 1.95 cumulative IPC: 1.95 (Simulation time: 0 hr 1 min 2 sec)
+
+For every job it reports the retired instructions against the
+warmup_instructions + simulation_instructions target printed at the start of
+the log, the simulation speed in KIPS (kilo-instructions per wall-clock
+second) and an ETA. Jobs that hit print_deadlock(), failed an assertion or
+have not written anything for --stall seconds are flagged; with --kill the
+processes writing their logs are terminated.
+
+With --rollup FILE, a provisional rollup CSV of the ROI cumulative IPC of
+every core seen so far is written after each refresh. It has the same
+Trace/Exp/Core_<i>_IPC/Filter layout as rollup.pl, plus a Progress column,
+so load_cube() and compute_speedups() work on it; Filter is 1 for a trace
+once every experiment of it has an ROI IPC for every core.
+
+Example:
+    cd experiments_1C/
+    python3 ../../scripts/monitor.py --tlist ../MICRO21_1C.tlist --exp ../MICRO21_1C.exp --rollup partial.csv
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import signal
+import sys
+import time
+
+from exp_files import parse_exp, parse_tlist
+
+HEARTBEAT = re.compile(rb'Heartbeat CPU\s+(\d+) instructions:\s+(\d+) cycles:\s+(\d+) '
+                       rb'heartbeat IPC: (\S+) cumulative IPC: (\S+) '
+                       rb'\(Simulation time: (\d+) hr (\d+) min (\d+) sec\)')
+WARMUP = re.compile(rb'Warmup complete CPU\s+(\d+) ')
+FINISHED = re.compile(rb'Finished CPU\s+(\d+) instructions: (\d+) cycles: (\d+) cumulative IPC: (\S+)')
+TRACE = re.compile(rb'trace_(\d+) ')
+KNOB = re.compile(rb'(warmup_instructions|simulation_instructions) (\d+)$')
+
+STATES = ('pending', 'starting', 'warmup', 'running', 'finished', 'DEADLOCK', 'FAILED', 'STALLED')
+ACTIVE = ('starting', 'warmup', 'running')
+FLAGGED = ('DEADLOCK', 'FAILED', 'STALLED')
+
+
+class CoreProgress(object):
+    def __init__(self):
+        self.instructions = 0
+        self.elapsed = 0
+        self.ipc = None
+        self.roi = False
+        self.finished = False
+        self.history = []
+
+
+class JobProgress(object):
+    """Incrementally parsed state of one simulation log."""
+
+    def __init__(self, trace, exp, path):
+        self.trace = trace
+        self.exp = exp
+        self.path = path
+        self.name = '%s_%s' % (trace, exp)
+        self.reset()
+
+    def reset(self):
+        self.ncores = 0
+        self.warmup = 0
+        self.simulation = 0
+        self.cores = {}
+        self.exists = False
+        self.offset = 0
+        self.partial = b''
+        self.mtime = None
+        self.deadlock = False
+        self.failed = False
+        self.completed = False
+
+    def core(self, i):
+        if i not in self.cores:
+            self.cores[i] = CoreProgress()
+        return self.cores[i]
+
+    def feed(self, data):
+        """Parse newly appended bytes; an unterminated last line is kept."""
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self.parse_line(line)
+
+    def parse_line(self, line):
+        m = HEARTBEAT.match(line)
+        if m:
+            core = self.core(int(m.group(1)))
+            core.instructions = int(m.group(2))
+            core.elapsed = int(m.group(6)) * 3600 + int(m.group(7)) * 60 + int(m.group(8))
+            core.history = (core.history + [(core.elapsed, core.instructions)])[-8:]
+            if core.roi and not core.finished:
+                core.ipc = float(m.group(5))
+            return
+        m = WARMUP.match(line)
+        if m:
+            self.core(int(m.group(1))).roi = True
+            return
+        m = FINISHED.match(line)
+        if m:
+            core = self.core(int(m.group(1)))
+            core.finished = True
+            core.roi = True
+            core.ipc = float(m.group(4))
+            return
+        if line.startswith(b'DEADLOCK!'):
+            self.deadlock = True
+        elif b'Assertion' in line and b'failed' in line:
+            self.failed = True
+        elif line.startswith(b'ChampSim completed all CPUs'):
+            self.completed = True
+        else:
+            m = TRACE.match(line)
+            if m:
+                self.ncores = max(self.ncores, int(m.group(1)) + 1)
+                return
+            m = KNOB.match(line)
+            if m:
+                setattr(self, 'warmup' if m.group(1) == b'warmup_instructions' else 'simulation', int(m.group(2)))
+
+    @property
+    def target(self):
+        return self.warmup + self.simulation
+
+    @property
+    def retired(self):
+        """Instructions retired by the slowest core."""
+        if not self.cores or len(self.cores) < self.ncores:
+            return 0
+        return min(c.instructions for c in self.cores.values())
+
+    @property
+    def finished(self):
+        return self.completed or (self.ncores > 0 and len(self.cores) == self.ncores
+                                  and all(c.finished for c in self.cores.values()))
+
+    def state(self, now, stall):
+        if not self.exists:
+            return 'pending'
+        if self.deadlock:
+            return 'DEADLOCK'
+        if self.failed:
+            return 'FAILED'
+        if self.finished:
+            return 'finished'
+        if stall and self.mtime is not None and now - self.mtime > stall:
+            return 'STALLED'
+        if not self.cores:
+            return 'starting'
+        if all(c.roi for c in self.cores.values()):
+            return 'running'
+        return 'warmup'
+
+    def kips(self):
+        """(average, recent) simulation speed of the slowest core in KIPS."""
+        if not self.cores:
+            return None, None
+        core = min(self.cores.values(), key=lambda c: c.instructions)
+        average = core.instructions / core.elapsed / 1e3 if core.elapsed else None
+        recent = None
+        if core.history:
+            (t0, i0), (t1, i1) = core.history[0], core.history[-1]
+            if t1 > t0:
+                recent = (i1 - i0) / (t1 - t0) / 1e3
+        return average, recent or average
+
+    def eta(self):
+        """Estimated remaining wall-clock seconds, or None."""
+        if not self.target or not self.cores:
+            return None
+        _, recent = self.kips()
+        if not recent:
+            return None
+        remaining = max(self.target - c.instructions for c in self.cores.values())
+        return max(0, remaining) / (recent * 1e3)
+
+    def ipcs(self):
+        return [self.cores[i].ipc if i in self.cores and self.cores[i].roi else None for i in range(self.ncores)]
+
+
+async def tail(job, interval):
+    """Follow a log file, feeding appended data to `job` until it is done."""
+    while True:
+        try:
+            st = os.stat(job.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            if st.st_size < job.offset:
+                # The log was truncated by a rerun of the job.
+                job.reset()
+            job.exists = True
+            job.mtime = st.st_mtime
+            if st.st_size > job.offset:
+                with open(job.path, 'rb') as fh:
+                    fh.seek(job.offset)
+                    data = fh.read(st.st_size - job.offset)
+                job.offset += len(data)
+                job.feed(data)
+        if job.finished or job.deadlock or job.failed:
+            return
+        await asyncio.sleep(interval)
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    return '%d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def report(jobs, now, stall, out=sys.stdout):
+    counts = dict.fromkeys(STATES, 0)
+    lines = []
+    for job in jobs:
+        state = job.state(now, stall)
+        counts[state] += 1
+        if state == 'pending':
+            continue
+        average, recent = job.kips()
+        progress = '%.1f%%' % (100.0 * job.retired / job.target) if job.target else '-'
+        ipc = ' '.join('%.3f' % x if x is not None else '-' for x in job.ipcs()) or '-'
+        lines.append('%-50s %-9s %12d %7s %8s %9s  %s' % (
+            job.name, state, job.retired, progress, '%.0f' % recent if recent else '-',
+            format_duration(None if state != 'running' and state != 'warmup' else job.eta()), ipc))
+    out.write('%-50s %-9s %12s %7s %8s %9s  %s\n' % ('Job', 'State', 'Instructions', 'Done', 'KIPS', 'ETA', 'IPC'))
+    for line in lines:
+        out.write(line + '\n')
+    out.write('  '.join('%s: %d' % (s, counts[s]) for s in STATES if counts[s]) + '\n\n')
+    out.flush()
+
+
+def write_rollup(jobs, path):
+    """Write the provisional ROI IPCs seen so far in rollup.pl layout."""
+    ncores = max([job.ncores for job in jobs] + [1])
+    complete = {}
+    for job in jobs:
+        ipcs = job.ipcs()
+        ok = len(ipcs) == ncores and all(x is not None for x in ipcs)
+        complete[job.trace] = complete.get(job.trace, True) and ok
+
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'w') as out:
+        out.write('Trace,Exp,%s,Progress,Filter\n' % ','.join('Core_%d_IPC' % i for i in range(ncores)))
+        for job in jobs:
+            ipcs = job.ipcs() + [None] * (ncores - job.ncores)
+            progress = job.retired / job.target if job.target else 0.0
+            out.write('%s,%s,%s,%.4f,%d\n' % (job.trace, job.exp,
+                                              ','.join('%.5f' % x if x is not None else '0' for x in ipcs),
+                                              min(progress, 1.0), complete[job.trace]))
+    os.replace(tmp, path)
+
+
+def find_writers(path):
+    """PIDs of the processes whose stdout is `path` (Linux only)."""
+    target = os.path.realpath(path)
+    pids = []
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            if os.readlink('/proc/%s/fd/1' % pid) == target:
+                pids.append(int(pid))
+        except OSError:
+            continue
+    return pids
+
+
+def kill_job(job):
+    for pid in find_writers(job.path):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+
+async def monitor(jobs, interval=1.0, refresh=10.0, stall=600.0, kill=False, rollup=None, once=False):
+    """
+    Tail all jobs and report every `refresh` seconds until all are done.
+    Return the jobs that were flagged.
+    """
+    tails = [asyncio.ensure_future(tail(job, interval)) for job in jobs]
+    killed = set()
+    started = time.time()
+    try:
+        while True:
+            await asyncio.sleep(0 if once else refresh)
+            now = time.time()
+            if kill:
+                for job in jobs:
+                    if job.name not in killed and job.state(now, stall) in FLAGGED:
+                        kill_job(job)
+                        killed.add(job.name)
+            report(jobs, now, stall)
+            if rollup:
+                write_rollup(jobs, rollup)
+            states = [job.state(now, stall) for job in jobs]
+            # Jobs that never start do not keep the monitor alive: stop once
+            # nothing is running and no log changed for `stall` seconds.
+            active = any(s in ACTIVE for s in states)
+            idle = now - max([job.mtime for job in jobs if job.mtime] + [started]) > stall
+            if once or all(s in ('finished',) + FLAGGED for s in states) or (not active and idle):
+                return [job for job, s in zip(jobs, states) if s in FLAGGED]
+    finally:
+        for t in tails:
+            t.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monitor running ChampSim simulations.')
+    parser.add_argument('--tlist', required=True, help='trace list')
+    parser.add_argument('--exp', required=True, help='experiment file')
+    parser.add_argument('--ext', default='out', help='extension of the simulation logs (default: out)')
+    parser.add_argument('--dir', default='.', help='directory holding the logs (default: .)')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between reads of a log (default: 1)')
+    parser.add_argument('--refresh', type=float, default=10.0, help='seconds between reports (default: 10)')
+    parser.add_argument('--stall', type=float, default=600.0,
+                        help='flag jobs whose log did not change for this many seconds (default: 600, 0: never)')
+    parser.add_argument('--kill', action='store_true', help='terminate deadlocked and stalled jobs')
+    parser.add_argument('--rollup', default=None, help='write a provisional IPC rollup CSV to this file')
+    parser.add_argument('--once', action='store_true', help='report the current state once and exit')
+    args = parser.parse_args()
+
+    jobs = [JobProgress(t['NAME'], e['NAME'], os.path.join(args.dir, '%s_%s.%s' % (t['NAME'], e['NAME'], args.ext)))
+            for t in parse_tlist(args.tlist) for e in parse_exp(args.exp)]
+    if args.once:
+        args.interval = 0
+    flagged = asyncio.run(monitor(jobs, args.interval, args.refresh, args.stall, args.kill, args.rollup, args.once))
+    if flagged:
+        print('%d job(s) need attention:' % len(flagged), file=sys.stderr)
+        for job in flagged:
+            print('    %s (%s)' % (job.name, job.state(time.time(), args.stall)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Multi-core metrics of a rollup against single-core isolation runs.
+
+A multi-core rollup (e.g. MICRO21_4C.tlist x rollup_4C.exp with
+rollup_4C.mfile) has one row per (mix, exp) and one Core_<i>_IPC column per
+core. Every core of a mix runs a trace that also has an isolation run in a
+single-core rollup (MICRO21_1C.tlist). mix_members() reads the mix
+composition from the trace lists and multicore_metrics() joins each core
+of each mix with its isolation IPC, for all mixes, experiments and cores
+at once as (mixes, exps, cores) arrays:
+
+    slowdown_i       = IPC_alone_i / IPC_shared_i
+    weighted speedup = sum_i IPC_shared_i / IPC_alone_i
+    harmonic speedup = ncores / sum_i IPC_alone_i / IPC_shared_i
+    unfairness       = max_i slowdown_i / min_i slowdown_i
+    throughput       = sum_i IPC_shared_i
+
+By default a core is compared with the isolation run of the same
+experiment (the prefetcher running alone); pass alone_exp='nopref' to
+compare every configuration with the same baseline isolation run.
+
+MulticoreResult.to_cube() turns the per-(mix, exp) metrics into a
+RollupCube, so speedup.py and bootstrap.py work on them unchanged:
+
+    mc = multicore_metrics(load_cube('rollup_4C.csv'), load_cube('rollup_1C.csv'),
+                           mix_members('MICRO21_4C.tlist', 'MICRO21_1C.tlist'))
+    compute_speedups(mc.to_cube(), metric='Weighted_Speedup')
+
+Command line:
+    python3 multicore.py --rollup rollup_4C.csv --alone rollup_1C.csv \\
+        --tlist ../MICRO21_4C.tlist --alone-tlist ../MICRO21_1C.tlist [--out metrics.csv]
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from exp_files import parse_tlist
+from rollup_cube import RollupCube, load_cube
+from speedup import compute_speedups
+
+METRICS = ['Weighted_Speedup', 'Harmonic_Speedup', 'Unfairness', 'Throughput']
+
+_CORE_METRIC = re.compile(r'^Core_(\d+)_(.+)$')
+_TRACE_SUFFIX = re.compile(r'\.champsimtrace(\.(xz|gz))?$')
+
+
+def core_count(cube, stat='IPC'):
+    """Return the number of cores with a Core_<i>_<stat> column in the cube."""
+    cores = [int(m.group(1)) for m in map(_CORE_METRIC.match, cube.metrics)
+             if m and m.group(2) == stat]
+    return max(cores) + 1 if cores else 0
+
+
+def core_metrics(stat, ncores):
+    return ['Core_%d_%s' % (i, stat) for i in range(ncores)]
+
+
+def per_core(cube, stat, ncores=None, exps=None):
+    """Return the (traces, exps, cores) values of Core_<i>_<stat>."""
+    ncores = ncores or core_count(cube, stat)
+    return cube.select(metrics=core_metrics(stat, ncores), exps=exps)
+
+
+def sum_cores(cube, stat, ncores=None, exps=None):
+    """Return the (traces, exps) sum of Core_<i>_<stat> over all cores."""
+    return per_core(cube, stat, ncores, exps).sum(axis=2)
+
+
+def _trace_key(path):
+    return _TRACE_SUFFIX.sub('', os.path.basename(path))
+
+
+def mix_members(tlist, alone_tlist=None):
+    """
+    Return {mix name: [isolation trace name of every core]} for the mixes of
+    a multi-core trace list. A core's trace is matched with the single-core
+    trace list entry of the same TRACE path, or else of the same trace file
+    name; without alone_tlist (or a match) the trace file name without its
+    .champsimtrace.xz suffix is used.
+    """
+    by_path = {}
+    by_key = {}
+    if alone_tlist is not None:
+        for rec in parse_tlist(alone_tlist):
+            by_path[rec['TRACE'].strip()] = rec['NAME']
+            by_key[_trace_key(rec['TRACE'].strip())] = rec['NAME']
+    members = {}
+    for rec in parse_tlist(tlist):
+        names = []
+        for path in rec.get('TRACE', '').split():
+            key = _trace_key(path)
+            names.append(by_path.get(path, by_key.get(key, key)))
+        members[rec['NAME']] = names
+    return members
+
+
+class MulticoreResult(object):
+    """
+    Multi-core metrics of `mixes` x `exps`.
+
+    shared, alone -- (mixes, exps, cores) IPC of each core in the mix and of
+                     its trace running alone (NaN where missing)
+    valid         -- (mixes, exps) mask of the cells where the mix run and
+                     every isolation run are valid with positive IPCs
+    weighted, harmonic, unfairness, throughput
+                  -- (mixes, exps) metrics, NaN where not valid
+    """
+
+    def __init__(self, mixes, exps, alone_exps, shared, alone, valid):
+        self.mixes = list(mixes)
+        self.exps = list(exps)
+        self.alone_exps = list(alone_exps)
+        self.shared = shared
+        self.alone = alone
+        self.valid = valid
+
+        ncores = shared.shape[2]
+        good = valid[:, :, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            speedup = np.where(good, shared / alone, np.nan)
+            self.slowdown = 1.0 / speedup
+            self.weighted = speedup.sum(axis=2)
+            self.harmonic = ncores / self.slowdown.sum(axis=2)
+            self.unfairness = self.slowdown.max(axis=2) / self.slowdown.min(axis=2)
+            self.throughput = np.where(valid, shared.sum(axis=2), np.nan)
+        for arr in (self.weighted, self.harmonic, self.unfairness):
+            arr[~valid] = np.nan
+
+    @property
+    def ncores(self):
+        return self.shared.shape[2]
+
+    def to_cube(self):
+        """Return the per-(mix, exp) METRICS as a RollupCube."""
+        values = np.stack([self.weighted, self.harmonic, self.unfairness, self.throughput], axis=2)
+        return RollupCube(self.mixes, self.exps, METRICS, values, self.valid.copy(), self.valid.copy())
+
+    def frame(self):
+        """Long-format metrics of the valid (mix, exp) cells as a DataFrame."""
+        rows, cols = np.nonzero(self.valid)
+        df = pd.DataFrame({
+            'Trace': [self.mixes[i] for i in rows],
+            'Exp': [self.exps[j] for j in cols],
+            'Alone_Exp': [self.alone_exps[j] for j in cols],
+        })
+        for name, arr in zip(METRICS, (self.weighted, self.harmonic, self.unfairness, self.throughput)):
+            df[name] = arr[rows, cols]
+        return df
+
+
+def multicore_metrics(cube, alone_cube, members, exps=None, alone_exp=None, ncores=None):
+    """
+    Join the Core_<i>_IPC of every mix of `cube` with the Core_0_IPC of its
+    isolation runs in `alone_cube`. `members` maps a mix to its per-core
+    isolation trace names (see mix_members()); mixes missing from it are
+    skipped. `alone_exp` is None (same experiment), an experiment name, or
+    a dict {exp: isolation exp}.
+    """
+    ncores = ncores or core_count(cube)
+    exps = list(cube.exps if exps is None else exps)
+    if alone_exp is None:
+        alone_exps = exps
+    elif isinstance(alone_exp, dict):
+        alone_exps = [alone_exp[e] for e in exps]
+    else:
+        alone_exps = [alone_exp] * len(exps)
+    mixes = [m for m in cube.traces if m in members]
+
+    shared = cube.select(metrics=core_metrics('IPC', ncores), exps=exps, traces=mixes)
+    shared_valid = cube.mask(exps=exps, traces=mixes)
+
+    # (mixes, cores) and (exps,) positions in the isolation cube, -1 where absent
+    alone_traces = {name: i for i, name in enumerate(alone_cube.traces)}
+    alone_exp_pos = {name: j for j, name in enumerate(alone_cube.exps)}
+    trace_pos = np.array([[alone_traces.get(t, -1) for t in (members[m] + [None] * ncores)[:ncores]]
+                          for m in mixes], dtype=np.int64).reshape(len(mixes), ncores)
+    exp_pos = np.array([alone_exp_pos.get(e, -1) for e in alone_exps], dtype=np.int64)
+    metric = alone_cube.metric_index(['Core_0_IPC'])[0]
+
+    t = np.maximum(trace_pos, 0)[:, None, :]
+    e = np.maximum(exp_pos, 0)[None, :, None]
+    found = (trace_pos >= 0)[:, None, :] & (exp_pos >= 0)[None, :, None]
+    alone = np.where(found, alone_cube.values[t, e, metric], np.nan)
+    alone_valid = found & alone_cube.valid[t, e]
+
+    with np.errstate(invalid='ignore'):
+        positive = (np.isfinite(shared) & (shared > 0) & np.isfinite(alone) & (alone > 0)).all(axis=2)
+    valid = shared_valid & alone_valid.all(axis=2) & positive
+    return MulticoreResult(mixes, exps, alone_exps, shared, alone, valid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Weighted/harmonic speedup and unfairness of multi-core runs')
+    parser.add_argument('--rollup', required=True, help='multi-core rollup CSV or columnar directory')
+    parser.add_argument('--alone', required=True, help='single-core (isolation) rollup CSV or columnar directory')
+    parser.add_argument('--tlist', required=True, help='multi-core trace list')
+    parser.add_argument('--alone-tlist', help='single-core trace list')
+    parser.add_argument('--alone-exp', help='isolation experiment for all configurations (default: the same experiment)')
+    parser.add_argument('--baseline', default='nopref', help='experiment to normalize the speedups to (default: %(default)s)')
+    parser.add_argument('--out', help='write the per-(mix, exp) metrics as a rollup-style CSV')
+    args = parser.parse_args()
+
+    cube = load_cube(args.rollup)
+    alone = load_cube(args.alone, metrics=['Core_0_IPC'])
+    mc = multicore_metrics(cube, alone, mix_members(args.tlist, args.alone_tlist), alone_exp=args.alone_exp)
+    print('%d mixes x %d experiments, %d cores, %d valid' % (len(mc.mixes), len(mc.exps), mc.ncores, mc.valid.sum()),
+          file=sys.stderr)
+
+    mcube = mc.to_cube()
+    table = pd.DataFrame(index=pd.Index(mc.exps, name='Exp'))
+    table['Count'] = mc.valid.sum(axis=0)
+    for name in ('Weighted_Speedup', 'Harmonic_Speedup'):
+        if mcube.has_exp(args.baseline):
+            s = compute_speedups(mcube, metric=name, baseline=args.baseline, exps=mc.exps)
+            table[name + '_Geomean'] = s.geomean
+    table['Unfairness_Mean'] = pd.DataFrame(mc.unfairness, columns=mc.exps).mean().to_numpy()
+    print(table.to_string())
+
+    if args.out:
+        df = mc.frame().drop(columns='Alone_Exp')
+        df['Filter'] = 1
+        df.to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Offline plots of the Q-value traces of the featurewise learning engine.
+
+With --le_featurewise_enable_trace=true, FeatureKnowledge::dump_feature_trace
+appends one line per traced update to --le_featurewise_trace_file_name:
+
+    timestamp,Q(s,a0),Q(s,a1),...,Q(s,aN-1),
+
+LearningEngineFeaturewise::plot_scores then plots it with gnuplot at the
+end of the simulation (--le_featurewise_enable_score_plot), which reads
+and draws every line of the trace. This script renders the same plot
+after the fact, so leave the score plot knob off and plot the traces of a
+whole sweep here, one trace per worker process.
+
+A trace is read in chunks and every action's series is reduced to a fixed
+number of points on the fly, so memory and drawing time do not grow with
+the trace:
+
+    minmax  -- the trace is cut into --bins equal bins of consecutive
+               records, and the minimum and the maximum of every bin are
+               kept (in time order). Spikes survive the reduction.
+    lttb    -- Largest-Triangle-Three-Buckets over the min/max points,
+               down to --bins points per action (MinMaxLTTB).
+
+Usage:
+    python3 plot_featurewise_trace.py trace_*.csv --actions 0 1 14 --jobs 16
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.ticker import EngFormatter
+
+from featurewise_replay import ACTIONS
+
+DEFAULT_BINS = 1000
+CHUNK_ROWS = 1 << 18
+# line styles of plot_scores
+COLORS = ['#A00000', '#00A000', '#5060D0', '#0000A0', '#D0D000', '#00D0D0', '#B200B2']
+
+
+def count_records(path):
+    """Number of lines of a trace file."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 24), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    return lines + (last != b'\n')
+
+
+def read_chunks(path, actions=None, chunk_rows=CHUNK_ROWS):
+    """
+    Yield (timestamps, q) chunks of a trace, q of shape (rows, actions) for
+    the given action indices (default: all).
+    """
+    with open(path) as fh:
+        first = fh.readline().rstrip('\n').rstrip(',')
+    if not first:
+        return
+    columns = first.count(',') + 1
+    usecols = [0] + [a + 1 for a in (actions if actions is not None else range(columns - 1))]
+    for chunk in pd.read_csv(path, header=None, usecols=usecols, chunksize=chunk_rows, dtype=np.float64):
+        data = chunk[usecols].to_numpy()
+        yield data[:, 0], data[:, 1:]
+
+
+class MinMaxBins(object):
+    """
+    Streaming min/max reduction of several series sampled at the same
+    times: `width` consecutive records per bin. Records are fed chunk by
+    chunk; a bin that straddles two chunks is completed with the next one.
+    """
+
+    def __init__(self, width):
+        self.width = max(1, width)
+        self._carry_t = None
+        self._carry_q = None
+        self.t = []
+        self.q = []
+
+    def _reduce(self, t, q):
+        """Add the bins of t, q: full bins, or one partial bin at the end of the trace."""
+        width = min(self.width, len(t))
+        bins = len(t) // width
+        tb = t.reshape(bins, width)
+        qb = q.reshape(bins, width, q.shape[1])
+        lo = qb.argmin(axis=1)
+        hi = qb.argmax(axis=1)
+        # the minimum and the maximum of every bin, the earlier one first
+        pos = np.stack([np.minimum(lo, hi), np.maximum(lo, hi)], axis=1)     # (bins, 2, series)
+        rows = np.arange(bins)[:, None, None]
+        series = np.arange(q.shape[1])[None, None, :]
+        self.t.append(tb[rows, pos].reshape(-1, q.shape[1]))
+        self.q.append(qb[rows, pos, series].reshape(-1, q.shape[1]))
+
+    def update(self, t, q):
+        if self._carry_t is not None:
+            t = np.concatenate([self._carry_t, t])
+            q = np.concatenate([self._carry_q, q])
+        full = len(t) // self.width * self.width
+        if full:
+            self._reduce(t[:full], q[:full])
+        self._carry_t, self._carry_q = t[full:], q[full:]
+
+    def finish(self):
+        """Return (t, q), both of shape (points, series)."""
+        if self._carry_t is not None and len(self._carry_t):
+            self._reduce(self._carry_t, self._carry_q)
+            self._carry_t = self._carry_q = None
+        if not self.t:
+            return np.empty((0, 0)), np.empty((0, 0))
+        return np.concatenate(self.t), np.concatenate(self.q)
+
+
+def lttb(x, y, points):
+    """Indices of the `points` points of (x, y) that Largest-Triangle-Three-Buckets keeps."""
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    # the first and the last point are kept; the others fall into points - 2 buckets
+    edges = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    keep = np.empty(points, np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # the third corner of the triangle is the average of the next bucket
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[hi:nhi].mean(), y[hi:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def reduce_trace(path, actions=None, bins=DEFAULT_BINS, method='minmax', chunk_rows=CHUNK_ROWS):
+    """
+    Read a trace and return [(t, q), ...], the reduced series of every
+    selected action.
+    """
+    records = count_records(path)
+    reducer = MinMaxBins(-(-records // bins))
+    for t, q in read_chunks(path, actions, chunk_rows):
+        reducer.update(t, q)
+    t, q = reducer.finish()
+    series = [(t[:, j], q[:, j]) for j in range(q.shape[1])]
+    if method == 'lttb':
+        series = [(ts[keep], qs[keep]) for ts, qs in series for keep in [lttb(ts, qs, bins)]]
+    return series
+
+
+def action_label(index, actions):
+    """Legend title of an action index, e.g. (+1), like plot_scores."""
+    if index < len(actions):
+        return '(%+d)' % actions[index]
+    return '(%d)' % index
+
+
+def plot_trace(path, out, actions=None, bins=DEFAULT_BINS, method='minmax', action_values=ACTIONS):
+    """
+    Plot the Q-values of the selected actions of one trace to `out`. Return
+    None without plotting if the trace has no records (the traced feature
+    never matched).
+    """
+    series = reduce_trace(path, actions, bins, method)
+    if not series or not len(series[0][0]):
+        return None
+    indices = actions if actions is not None else range(len(series))
+    fig, ax = plt.subplots(figsize=(5, 4))
+    for k, (index, (t, q)) in enumerate(zip(indices, series)):
+        color = COLORS[k] if k < len(COLORS) else None
+        ax.plot(t, q, color=color, lw=1.4, label=action_label(index, action_values))
+    ax.set_xlabel('time')
+    ax.set_ylabel('q-value')
+    ax.xaxis.set_major_formatter(EngFormatter(places=0, sep=''))
+    ax.grid(True)
+    ax.legend(loc='lower center', bbox_to_anchor=(0.5, 1.0), ncol=max(1, min(len(series), 4)), frameon=False, fontsize=9)
+    fig.tight_layout()
+    fig.savefig(out)
+    plt.close(fig)
+    return out
+
+
+def output_path(trace, out_dir, fmt):
+    base = os.path.splitext(os.path.basename(trace))[0]
+    return os.path.join(out_dir or os.path.dirname(trace), '%s.%s' % (base, fmt))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plot featurewise learning engine Q-value traces offline')
+    parser.add_argument('traces', nargs='+', help='trace files written by --le_featurewise_trace_file_name')
+    parser.add_argument('--actions', type=int, nargs='+',
+                        help='action indices to plot, like --le_featurewise_plot_actions (default: all)')
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS, help='bins (points) per action (default: %(default)s)')
+    parser.add_argument('--method', choices=['minmax', 'lttb'], default='minmax',
+                        help='downsampling method (default: %(default)s)')
+    parser.add_argument('--format', default='pdf', help='output format (default: %(default)s)')
+    parser.add_argument('--out-dir', help='directory of the plots (default: next to each trace)')
+    parser.add_argument('--force', action='store_true', help='replot traces whose plot is newer than the trace')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: all CPUs)')
+    args = parser.parse_args()
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    todo = []
+    for trace in args.traces:
+        out = output_path(trace, args.out_dir, args.format)
+        if not args.force and os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(trace):
+            continue
+        todo.append((trace, out))
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(plot_trace, trace, out, args.actions, args.bins, args.method): trace
+                   for trace, out in todo}
+        failed = 0
+        for done, future in enumerate(as_completed(futures), 1):
+            trace = futures[future]
+            try:
+                out = future.result()
+            except Exception as e:
+                failed += 1
+                print('[%d/%d] %s: FAILED (%s)' % (done, len(todo), trace, e), file=sys.stderr)
+                continue
+            if out is None:
+                print('[%d/%d] %s: no records, skipped' % (done, len(todo), trace), file=sys.stderr)
+            else:
+                print('[%d/%d] %s' % (done, len(todo), out), file=sys.stderr)
+    if failed:
+        sys.exit('%d of %d traces failed' % (failed, len(todo)))
+
+
+if __name__ == '__main__':
+    main()
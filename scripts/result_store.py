@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store of simulation outputs.
+
+Many experiment files run the same simulations (e.g. nopref at the default
+DRAM frequency is in rollup_1C_base_config.exp and in the DRAM bandwidth
+sweep). A simulation is identified by
+
+    - the SHA-256 of the simulator binary,
+    - its knobs as ChampSim ends up seeing them: every `--name=value`
+      argument is an ini line, `config=file.ini` is replaced by the
+      contents of the file where it appears, and a later value of a knob
+      replaces an earlier one, except for the prefetcher type knobs, whose
+      values add up (see parse_args() in src/knobs.cc), and
+    - the MD5 checksums of its traces, in core order. A trace file is hashed
+      once per path, size and mtime; an artifact trace under
+      $PYTHIA_HOME/traces is checked against artifact_traces.md5 then.
+      The listed sum is never taken on the file name alone: a slice
+      written by slice_trace.py has the name of the trace it was cut from.
+
+so the same simulation has the same key whatever the order of its knobs,
+the experiment file it comes from and the location of $PYTHIA_HOME and the
+traces. The store keeps one output per key:
+
+    <store>/objects/ab/abcdef....out    the output (read-only)
+    <store>/objects/ab/abcdef....json   what the key was computed from
+    <store>/hashes.json                 checksums of binaries and traces,
+                                        by path, size and mtime
+
+run_jobs.py --result-store links (or copies) the stored output of every
+job whose key is in the store instead of running it, and stores the output
+of every job that is done. `import` fills a store from the outputs of an
+earlier sweep.
+
+Usage:
+    python3 result_store.py import --store $PYTHIA_HOME/results --exe ../bin/... \\
+        --tlist ../MICRO21_1C.tlist --exp ../rollup_1C_base_config.exp --dir experiments_1C
+    python3 result_store.py status --store $PYTHIA_HOME/results
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import threading
+
+from exp_files import ini_line, parse_exp, parse_tlist, read_ini
+from job_ledger import check_output
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TRACE_MD5 = os.path.join(HERE, 'artifact_traces.md5')
+
+
+def read_md5_list(path):
+    """{file name: md5} of an md5sum listing."""
+    sums = {}
+    if os.path.exists(path):
+        with open(path) as fh:
+            for line in fh:
+                fields = line.split()
+                if len(fields) == 2:
+                    sums[os.path.basename(fields[1].lstrip('*'))] = fields[0]
+    return sums
+
+
+def file_digest(path, algorithm):
+    h = hashlib.new(algorithm)
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 24), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def canonical_knobs(args, directory='.', vectors=()):
+    """
+    Final {knob: value} of a simulator command line (without the executable
+    and traces), with config files expanded relative to `directory`. The
+    value of a `vectors` knob (see sweep_axes.knob_defaults()) is the list
+    of all its values.
+    """
+    knobs = {}
+
+    def apply(name, value, seen):
+        if name in vectors:
+            knobs.setdefault(name, []).append(value)
+            return
+        if name != 'config':
+            knobs[name] = value
+            return
+        path = os.path.join(directory, value)
+        if path in seen:
+            raise ValueError('%s includes itself' % value)
+        for n, v in read_ini(path):
+            apply(n, v, seen | {path})
+
+    for arg in args:
+        parsed = ini_line(arg[2:] if arg.startswith('--') else arg)
+        if parsed is not None:
+            apply(parsed[0], parsed[1], frozenset())
+    return knobs
+
+
+class ResultStore(object):
+    """Simulation outputs by content key; see the module documentation."""
+
+    VERSION = 1
+
+    def __init__(self, path, trace_md5=DEFAULT_TRACE_MD5):
+        self.path = path
+        self.trace_sums = read_md5_list(trace_md5)
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.dirty = False
+        # imported here: sweep_axes needs pandas, running jobs does not
+        from sweep_axes import knob_defaults
+        self.vectors = knob_defaults()[1]
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+        hashes = os.path.join(path, 'hashes.json')
+        if os.path.exists(hashes):
+            with open(hashes) as fh:
+                data = json.load(fh)
+            if data.get('version') == self.VERSION:
+                self.hashes = data['hashes']
+
+    def save(self):
+        if not self.dirty:
+            return
+        path = os.path.join(self.path, 'hashes.json')
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump({'version': self.VERSION, 'hashes': self.hashes}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+        self.dirty = False
+
+    def _file_hash(self, path, algorithm):
+        """Checksum of a file, computed once per path, size and mtime."""
+        path = os.path.realpath(path)
+        st = os.stat(path)
+        with self.lock:
+            entry = self.hashes.get(path)
+            if entry is not None and entry[:3] == [st.st_size, st.st_mtime_ns, algorithm]:
+                return entry[3]
+        digest = file_digest(path, algorithm)
+        with self.lock:
+            self.hashes[path] = [st.st_size, st.st_mtime_ns, algorithm, digest]
+            self.dirty = True
+        return digest
+
+    def trace_hash(self, path):
+        """
+        MD5 of a trace file. The file itself is hashed (once per path, size
+        and mtime); the sum listed in artifact_traces.md5 is only used for
+        the artifact trace under $PYTHIA_HOME/traces once a hash of that
+        file has confirmed it.
+        """
+        digest = self._file_hash(path, 'md5')
+        name = os.path.basename(path)
+        listed = self.trace_sums.get(name)
+        traces = os.path.realpath(os.path.join(os.environ.get('PYTHIA_HOME', ''), 'traces'))
+        if listed is not None and os.path.dirname(os.path.realpath(path)) == traces:
+            if digest != listed:
+                print('warning: %s does not match its sum in artifact_traces.md5' % path, file=sys.stderr)
+            else:
+                return listed
+        return digest
+
+    def describe(self, job, directory='.'):
+        """What the key of a run_jobs.Job is computed from, or None if its binary or a trace is missing."""
+        tokens = shlex.split(job.prefix)
+        try:
+            exe = tokens[0]
+            path = exe if os.path.sep in exe else shutil.which(exe) or exe
+            return {
+                'binary': self._file_hash(os.path.join(directory, path), 'sha256'),
+                'knobs': sorted(canonical_knobs(tokens[1:], directory, self.vectors).items()),
+                'traces': [self.trace_hash(os.path.join(directory, t)) for t in job.inputs],
+            }
+        except (IndexError, OSError):
+            return None
+
+    def key(self, job, directory='.'):
+        """Content key of a run_jobs.Job, or None if it cannot be computed."""
+        desc = self.describe(job, directory)
+        if desc is None:
+            return None
+        return hashlib.sha256(json.dumps(desc, sort_keys=True).encode()).hexdigest()
+
+    def object_path(self, key, ext='out'):
+        return os.path.join(self.path, 'objects', key[:2], '%s.%s' % (key, ext))
+
+    def has(self, key):
+        return key is not None and os.path.exists(self.object_path(key))
+
+    def fetch(self, key, dest, mode='symlink'):
+        """Put the stored output of `key` at `dest` (a symlink, hard link or copy); return False if there is none."""
+        src = self.object_path(key)
+        if not os.path.exists(src):
+            return False
+        tmp = '%s.%d.tmp' % (dest, os.getpid())
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        if mode == 'symlink':
+            os.symlink(os.path.abspath(src), tmp)
+        elif mode == 'hardlink':
+            os.link(src, tmp)
+        else:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+        return True
+
+    def put(self, key, src, job=None, directory='.'):
+        """Store the output `src` under `key`, unless the store has one already."""
+        dest = self.object_path(key)
+        if os.path.exists(dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = '%s.%d.%d.tmp' % (dest, os.getpid(), threading.get_ident())
+        shutil.copyfile(src, tmp)
+        # linked outputs must not be written through
+        os.chmod(tmp, 0o444)
+        if job is not None:
+            with open(self.object_path(key, 'json'), 'w') as fh:
+                json.dump(dict(self.describe(job, directory), trace=job.trace, exp=job.exp,
+                               cmdline=job.cmdline), fh, indent=1)
+        os.replace(tmp, dest)
+
+    def entries(self):
+        """Number and total size of the stored outputs."""
+        count = size = 0
+        for root, _, files in os.walk(os.path.join(self.path, 'objects')):
+            for name in files:
+                if name.endswith('.out'):
+                    count += 1
+                    size += os.path.getsize(os.path.join(root, name))
+        return count, size
+
+
+def main():
+    # imported here: run_jobs.py imports this module
+    from run_jobs import expand_jobs
+
+    parser = argparse.ArgumentParser(description='Content-addressed store of simulation outputs')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('import', help='store the complete outputs of a finished sweep')
+    p.add_argument('--store', required=True, help='result store directory')
+    p.add_argument('--exe', required=True, help='ChampSim executable the sweep was run with')
+    p.add_argument('--tlist', required=True, help='trace list')
+    p.add_argument('--exp', required=True, help='experiment file')
+    p.add_argument('--ncores', type=int, default=1, help='value of the $(NCORES) hook (default: 1)')
+    p.add_argument('--dir', default='.', help='directory the sweep ran in (default: .)')
+    p.add_argument('--trace-md5', default=DEFAULT_TRACE_MD5, help='trace checksums (default: artifact_traces.md5)')
+
+    p = sub.add_parser('status', help='print the number and size of the stored outputs')
+    p.add_argument('--store', required=True, help='result store directory')
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        count, size = ResultStore(args.store).entries()
+        print('%d outputs, %.1f MB' % (count, size / 1e6))
+        return
+
+    if 'PYTHIA_HOME' not in os.environ:
+        sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+    store = ResultStore(args.store, args.trace_md5)
+    stored = skipped = 0
+    try:
+        for job in expand_jobs(parse_tlist(args.tlist), parse_exp(args.exp), args.exe, args.ncores):
+            output = os.path.join(args.dir, job.output)
+            key = store.key(job, args.dir)
+            if key is None or os.path.islink(output) or check_output(output) is not None:
+                skipped += 1
+                continue
+            store.put(key, output, job, args.dir)
+            stored += 1
+    finally:
+        store.save()
+    print('%d outputs stored, %d missing or incomplete' % (stored, skipped), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
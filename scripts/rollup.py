@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Parallel Python implementation of rollup.pl.
+
+Reads the same --tlist/--exp/--mfile arguments, looks for
+`${trace}_${exp}.${ext}` stat files in the current directory (or --dir) and
+prints the same pivot-table friendly CSV, including the Filter column: a
+trace gets Filter=1 only if every metric of every experiment was found.
+Experiments that run_jobs.py --prune stopped early get Filter=-1 and do not
+count against the other experiments of their trace.
+
+Stat files are parsed on a process pool and comma-separated metric arrays
+are reduced with NumPy, so rollup time scales with the number of cores.
+
+With --cache FILE, already reduced metric vectors are kept in an on-disk
+index keyed by (trace, exp, file size, mtime, mfile hash), and only new or
+changed stat files are parsed on the next rollup.
+
+With --columnar DIR, the rollup is additionally stored as one memory-mappable
+.npy column per metric with a schema.json sidecar, which load_cube() in
+rollup_cube.py reads without any CSV parsing.
+
+Example:
+    cd experiments_1C/
+    python3 ../../scripts/rollup.py --tlist ../MICRO21_1C.tlist --exp ../MICRO21_1C.exp \\
+        --mfile ../rollup_1C_base_config.mfile > rollup.csv
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from exp_files import MFILE_TYPES, parse_exp, parse_mfile, parse_tlist
+from job_ledger import PRUNED_RECORD
+
+# Perl numifies strings by their longest numeric prefix ("12abc" -> 12).
+_NUM_PREFIX = re.compile(r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_INT_TOKEN = re.compile(r'\s*[+-]?\d+\s*$')
+# Filter of the rows of pruned jobs
+PRUNED_FILTER = -1
+_SPECIAL = {'inf': math.inf, '+inf': math.inf, '-inf': -math.inf, 'infinity': math.inf,
+            '-infinity': -math.inf, 'nan': math.nan, '-nan': math.nan}
+
+
+def perl_num(token):
+    """Numeric value Perl would give `token`."""
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    special = _SPECIAL.get(token.strip().lower())
+    if special is not None:
+        return special
+    m = _NUM_PREFIX.match(token)
+    return float(m.group(1)) if m else 0.0
+
+
+def perl_str(value, integral=False):
+    """Format a number the way Perl prints it (IVs exactly, NVs as %.15g)."""
+    if value is None:
+        return ''
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return 'Inf' if value > 0 else '-Inf'
+    if value == int(value) and (integral or abs(value) < 1e15):
+        return '%d' % value
+    return '%.15g' % value
+
+
+def reduce_metric(value, mtype):
+    """Reduce the raw value of a metric with an mfile reducer, as rollup.pl does."""
+    if mtype == 'array':
+        return value
+
+    # Perl's split drops trailing empty fields.
+    tokens = value.split(',')
+    while tokens and tokens[-1] == '':
+        tokens.pop()
+    if mtype == 'nzmean':
+        tokens = [t for t in tokens if t.strip() not in ('', '0')]
+    if not tokens:
+        return ''
+
+    try:
+        data = np.array(tokens, dtype=np.float64)
+    except ValueError:
+        data = np.array([perl_num(t) for t in tokens], dtype=np.float64)
+    count = data.size
+    # Accumulate left to right like List::Util::sum, so rounding matches Perl.
+    total = float(np.cumsum(data)[-1])
+
+    if mtype == 'sum':
+        return perl_str(total, all(_INT_TOKEN.match(t) for t in tokens))
+    if mtype in ('mean', 'nzmean'):
+        return perl_str(total / count)
+    if mtype in ('min', 'max'):
+        # Statistics::Descriptive keeps the first extreme token as-is.
+        idx = int(np.argmin(data) if mtype == 'min' else np.argmax(data))
+        return tokens[idx]
+    if mtype in ('variance', 'standard_deviation'):
+        if count == 1:
+            var = 0.0
+        else:
+            mean = total / count
+            var = float(np.cumsum(np.square(data))[-1]) - count * mean ** 2
+            var = 0.0 if var < 0 else var / (count - 1)
+        return perl_str(var if mtype == 'variance' else math.sqrt(var))
+    raise ValueError('invalid summary type %s' % mtype)
+
+
+def parse_stats(log_file, ext):
+    """
+    Return {key: value} of a stat file. `.stats` files hold `key = value`
+    lines; every other extension is a ChampSim log where only lines with
+    exactly one space (`key value`) are records.
+    """
+    records = {}
+    with open(log_file, 'rb') as fh:
+        if ext == 'stats':
+            for line in fh:
+                fields = line.rstrip(b'\n').split(b'=')
+                value = fields[1] if len(fields) > 1 else b''
+                records[fields[0].strip().decode('latin-1')] = value.strip().decode('latin-1')
+        else:
+            for line in fh:
+                line = line.rstrip(b'\n')
+                if line.count(b' ') == 1:
+                    key, value = line.split(b' ')
+                    records[key.strip().decode('latin-1')] = value.strip().decode('latin-1')
+    return records
+
+
+def rollup_file(log_file, ext, metrics):
+    """
+    Roll up one stat file. Return (values, passed), where values are the
+    formatted metric values and passed is False if the file or any metric is
+    missing, or PRUNED_FILTER if the job was pruned.
+    """
+    if not os.path.exists(log_file):
+        return ['0'] * len(metrics), False
+
+    records = parse_stats(log_file, ext)
+    if PRUNED_RECORD in records:
+        return ['0'] * len(metrics), PRUNED_FILTER
+    values = []
+    passed = True
+    for metric in metrics:
+        name = metric['NAME']
+        if name in records:
+            values.append(reduce_metric(records[name], metric['TYPE']))
+        else:
+            values.append('0')
+            passed = False
+    return values, passed
+
+
+def _rollup_task(args):
+    return rollup_file(*args)
+
+
+class RollupCache(object):
+    """
+    Persistent index of already rolled up stat files.
+
+    Entries are keyed by the mfile hash (metric names, reducers and stat file
+    extension) and the (trace, exp) pair, and remember the size and mtime of
+    the stat file they were computed from, so a rewritten log is parsed again
+    while rollups with different mfiles in the same directory keep their own
+    entries.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            if data.get('version') == self.VERSION:
+                self.entries = data['entries']
+
+    @staticmethod
+    def mfile_hash(metrics, ext):
+        h = hashlib.sha1(ext.encode())
+        for metric in metrics:
+            h.update(('\0%s:%s' % (metric['NAME'], metric['TYPE'])).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def key(mhash, trace, exp):
+        return '%s/%s/%s' % (mhash, trace, exp)
+
+    def get(self, key, st):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns:
+            return None
+        return entry[2], entry[3]
+
+    def put(self, key, st, result):
+        self.entries[key] = [st.st_size, st.st_mtime_ns, result[0], result[1]]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump({'version': self.VERSION, 'entries': self.entries}, fh, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def rollup(traces, exps, metrics, ext='out', directory='.', jobs=None, cache=None):
+    """
+    Roll up every (trace, exp) stat file. Return a list of
+    (trace_name, exp_name, values, filter) rows in rollup.pl order, where the
+    filter of a pruned job is PRUNED_FILTER. If a
+    RollupCache is given, only stat files that are not in it (or changed
+    since) are parsed, and the cache is updated.
+    """
+    for metric in metrics:
+        if metric['TYPE'] not in MFILE_TYPES:
+            raise ValueError('invalid summary type %s for metric %s' % (metric['TYPE'], metric['NAME']))
+
+    mhash = RollupCache.mfile_hash(metrics, ext) if cache is not None else None
+    results = [None] * (len(traces) * len(exps))
+    pending = []
+    tasks = []
+    for ti, trace in enumerate(traces):
+        for ei, exp in enumerate(exps):
+            idx = ti * len(exps) + ei
+            log_file = os.path.join(directory, '%s_%s.%s' % (trace['NAME'], exp['NAME'], ext))
+            if cache is not None:
+                try:
+                    st = os.stat(log_file)
+                except OSError:
+                    results[idx] = (['0'] * len(metrics), False)
+                    continue
+                key = RollupCache.key(mhash, trace['NAME'], exp['NAME'])
+                results[idx] = cache.get(key, st)
+                if results[idx] is not None:
+                    continue
+            else:
+                key, st = None, None
+            pending.append((idx, key, st))
+            tasks.append((log_file, ext, metrics))
+
+    if jobs == 1 or len(tasks) <= 1:
+        parsed = [rollup_file(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(tasks) // (4 * (jobs or os.cpu_count() or 1)))
+            parsed = list(pool.map(_rollup_task, tasks, chunksize=chunksize))
+    for (idx, key, st), result in zip(pending, parsed):
+        results[idx] = result
+        if cache is not None:
+            cache.put(key, st, result)
+
+    rows = []
+    for ti, trace in enumerate(traces):
+        per_trace = results[ti * len(exps):(ti + 1) * len(exps)]
+        passed = int(all(ok for _, ok in per_trace if ok != PRUNED_FILTER))
+        for exp, (values, ok) in zip(exps, per_trace):
+            rows.append((trace['NAME'], exp['NAME'], values, PRUNED_FILTER if ok == PRUNED_FILTER else passed))
+    return rows
+
+
+def write_csv(rows, metrics, out):
+    out.write('Trace,Exp,' + ','.join(m['NAME'] for m in metrics) + ',Filter\n')
+    for trace, exp, values, passed in rows:
+        out.write('%s,%s,%s,%d\n' % (trace, exp, ','.join(values), passed))
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def write_columnar(rows, traces, exps, metrics, path):
+    """
+    Store rollup rows in the columnar layout of rollup_cube.write_columnar().
+    `array` metrics are not numeric and are left out.
+    """
+    from rollup_cube import RollupCube, write_columnar as write_cube
+
+    keep = [j for j, m in enumerate(metrics) if m['TYPE'] != 'array']
+    values = np.array([[_to_float(row[2][j]) for j in keep] for row in rows], dtype=np.float64)
+    values = values.reshape(len(traces), len(exps), len(keep))
+    passed = np.array([row[3] == 1 for row in rows], dtype=bool).reshape(len(traces), len(exps))
+    present = np.ones_like(passed)
+    cube = RollupCube([t['NAME'] for t in traces], [e['NAME'] for e in exps],
+                      [metrics[j]['NAME'] for j in keep], values, present, passed)
+    write_cube(cube, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rollup ChampSim statistics into a CSV (parallel rollup.pl).')
+    parser.add_argument('--tlist', required=True, help='trace list')
+    parser.add_argument('--exp', required=True, help='experiment file')
+    parser.add_argument('--mfile', required=True, help='metric file')
+    parser.add_argument('--ext', default='out', help='extension of the statistics files (default: out)')
+    parser.add_argument('--dir', default='.', help='directory holding the statistics files (default: .)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--output', default=None, help='output CSV (default: stdout)')
+    parser.add_argument('--cache', default=None, help='incremental rollup cache file (default: no cache)')
+    parser.add_argument('--columnar', default=None, help='also write a columnar .npy rollup to this directory')
+    args = parser.parse_args()
+
+    traces = parse_tlist(args.tlist)
+    exps = parse_exp(args.exp)
+    metrics = parse_mfile(args.mfile)
+    cache = RollupCache(args.cache) if args.cache else None
+    rows = rollup(traces, exps, metrics, ext=args.ext, directory=args.dir, jobs=args.jobs, cache=cache)
+    if cache is not None:
+        cache.save()
+    if args.columnar:
+        write_columnar(rows, traces, exps, metrics, args.columnar)
+    if args.output:
+        with open(args.output, 'w') as out:
+            write_csv(rows, metrics, out)
+    else:
+        write_csv(rows, metrics, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
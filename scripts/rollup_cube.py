@@ -0,0 +1,273 @@
+"""
+Dense Trace x Exp x Metric view of a rollup produced by rollup.pl.
+
+The rollup CSV is pivot-table friendly: one row per (trace, experiment) with
+one column per metric of the mfile, followed by the `Filter` column. Figure
+scripts used to re-scan the whole DataFrame with boolean masks for every
+(benchmark, prefetcher) pair. load_cube() reads the rollup once and scatters
+it into a NumPy array indexed by integer trace/exp/metric positions, so
+every lookup afterwards is a plain array slice.
+
+to_shared_memory()/from_shared_memory() let worker processes use one cube
+without copying or pickling its arrays.
+
+A rollup can also be stored in a columnar directory (rollup.py --columnar):
+one (traces, exps) float64 .npy file per metric plus a schema.json sidecar
+with the axis labels. load_cube() memory-maps that layout and only reads
+the metric columns that are asked for.
+
+Usage:
+    from rollup_cube import load_cube
+    cube = load_cube('rollup.csv')
+    ipc = cube.metric('Core_0_IPC')                  # (traces, exps)
+    ipc = cube.metric('Core_0_IPC', exps=['nopref', 'pythia'])
+"""
+
+import json
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ('Trace', 'Exp')
+FILTER_COLUMN = 'Filter'
+
+COLUMNAR_SCHEMA = 'schema.json'
+COLUMNAR_VERSION = 1
+
+
+class RollupCube(object):
+    """
+    Rollup statistics stored as a dense (trace, exp, metric) array.
+
+    values  -- float64 array of shape (len(traces), len(exps), len(metrics)).
+               Cells without a rollup row are NaN.
+    present -- bool array of shape (len(traces), len(exps)), True where the
+               rollup had a row for (trace, exp).
+    valid   -- bool array of the same shape, True where the row is present
+               and its Filter column is 1. If the rollup has no Filter
+               column, valid is equal to present.
+    """
+
+    def __init__(self, traces, exps, metrics, values, present, valid):
+        self.traces = list(traces)
+        self.exps = list(exps)
+        self.metrics = list(metrics)
+        self.values = values
+        self.present = present
+        self.valid = valid
+        self._trace_pos = {name: i for i, name in enumerate(self.traces)}
+        self._exp_pos = {name: i for i, name in enumerate(self.exps)}
+        self._metric_pos = {name: i for i, name in enumerate(self.metrics)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def missing(self):
+        """Mask of (trace, exp) cells that must not be used for statistics."""
+        return ~self.valid
+
+    def has_exp(self, name):
+        return name in self._exp_pos
+
+    def has_metric(self, name):
+        return name in self._metric_pos
+
+    def trace_index(self, names):
+        return self._lookup(self._trace_pos, names, 'trace')
+
+    def exp_index(self, names):
+        return self._lookup(self._exp_pos, names, 'experiment')
+
+    def metric_index(self, names):
+        return self._lookup(self._metric_pos, names, 'metric')
+
+    def metric(self, name, exps=None, traces=None):
+        """
+        Return the (traces, exps) array of a single metric. `exps` and `traces`
+        optionally restrict (and reorder) the axes by name.
+        """
+        return self.select([name], exps=exps, traces=traces)[:, :, 0]
+
+    def select(self, metrics=None, exps=None, traces=None):
+        """Return the (traces, exps, metrics) sub-cube for the given names."""
+        t = self._axis(self._trace_pos, traces, 'trace')
+        e = self._axis(self._exp_pos, exps, 'experiment')
+        m = self._axis(self._metric_pos, metrics, 'metric')
+        return self.values[np.ix_(t, e, m)]
+
+    def mask(self, exps=None, traces=None):
+        """Return the (traces, exps) validity mask for the given names."""
+        t = self._axis(self._trace_pos, traces, 'trace')
+        e = self._axis(self._exp_pos, exps, 'experiment')
+        return self.valid[np.ix_(t, e)]
+
+    def row(self, trace, exp):
+        """Return {metric: value} for a single (trace, exp) cell."""
+        vals = self.values[self._trace_pos[trace], self._exp_pos[exp]]
+        return dict(zip(self.metrics, vals.tolist()))
+
+    @staticmethod
+    def _lookup(positions, names, what):
+        if isinstance(names, str):
+            if names not in positions:
+                raise KeyError('unknown %s: %s' % (what, names))
+            return positions[names]
+        try:
+            return np.fromiter((positions[n] for n in names), dtype=np.intp)
+        except KeyError as e:
+            raise KeyError('unknown %s: %s' % (what, e.args[0]))
+
+    @classmethod
+    def _axis(cls, positions, names, what):
+        if names is None:
+            return np.arange(len(positions))
+        if isinstance(names, str):
+            names = [names]
+        return cls._lookup(positions, names, what)
+
+
+def from_frame(df, metrics=None):
+    """Build a RollupCube from a DataFrame in rollup.pl layout."""
+    for col in KEY_COLUMNS:
+        if col not in df.columns:
+            raise ValueError('rollup is missing the %s column' % col)
+    if metrics is None:
+        metrics = [c for c in df.columns if c not in KEY_COLUMNS and c != FILTER_COLUMN]
+    metrics = list(metrics)
+
+    # factorize() keeps first-appearance order, which is the tlist/exp order
+    # in which rollup.pl prints its rows.
+    t_codes, traces = pd.factorize(df['Trace'].astype(str))
+    e_codes, exps = pd.factorize(df['Exp'].astype(str))
+
+    data = np.empty((len(df), len(metrics)), dtype=np.float64)
+    for j, name in enumerate(metrics):
+        data[:, j] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+
+    values = np.full((len(traces), len(exps), len(metrics)), np.nan)
+    values[t_codes, e_codes] = data
+    present = np.zeros((len(traces), len(exps)), dtype=bool)
+    present[t_codes, e_codes] = True
+
+    if FILTER_COLUMN in df.columns:
+        passed = pd.to_numeric(df[FILTER_COLUMN], errors='coerce').to_numpy() == 1
+        valid = np.zeros_like(present)
+        valid[t_codes, e_codes] = passed
+    else:
+        valid = present.copy()
+
+    return RollupCube(traces, exps, metrics, values, present, valid)
+
+
+def write_columnar(cube, path):
+    """
+    Store a RollupCube as a columnar directory: schema.json, present.npy,
+    valid.npy and one metric_<n>.npy (traces, exps) array per metric.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = []
+    for j, name in enumerate(cube.metrics):
+        filename = 'metric_%04d.npy' % j
+        np.save(os.path.join(path, filename), np.ascontiguousarray(cube.values[:, :, j]))
+        columns.append({'name': name, 'file': filename})
+    np.save(os.path.join(path, 'present.npy'), cube.present)
+    np.save(os.path.join(path, 'valid.npy'), cube.valid)
+
+    schema = {
+        'version': COLUMNAR_VERSION,
+        'traces': cube.traces,
+        'exps': cube.exps,
+        'metrics': columns,
+    }
+    # Write the schema last, so a reader never sees a half-written rollup.
+    tmp = os.path.join(path, COLUMNAR_SCHEMA + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(schema, fh, indent=1)
+    os.replace(tmp, os.path.join(path, COLUMNAR_SCHEMA))
+
+
+def load_columnar(path, metrics=None):
+    """
+    Load a columnar rollup directory. Metric columns are memory-mapped and
+    only the requested `metrics` (default: all) are read.
+    """
+    with open(os.path.join(path, COLUMNAR_SCHEMA)) as fh:
+        schema = json.load(fh)
+    if schema.get('version') != COLUMNAR_VERSION:
+        raise ValueError('unsupported columnar rollup version in %s' % path)
+
+    # Like pandas, the first of several columns with the same name wins.
+    files = {}
+    for c in schema['metrics']:
+        files.setdefault(c['name'], c['file'])
+    if metrics is None:
+        metrics = list(files)
+    metrics = [m for m in metrics if m in files]
+
+    shape = (len(schema['traces']), len(schema['exps']), len(metrics))
+    values = np.empty(shape, dtype=np.float64)
+    for j, name in enumerate(metrics):
+        values[:, :, j] = np.load(os.path.join(path, files[name]), mmap_mode='r')
+    present = np.load(os.path.join(path, 'present.npy'))
+    valid = np.load(os.path.join(path, 'valid.npy'))
+    return RollupCube(schema['traces'], schema['exps'], metrics, values, present, valid)
+
+
+def load_cube(path, metrics=None):
+    """
+    Read a rollup once and return it as a RollupCube. `path` is either a
+    rollup CSV or a columnar rollup directory. If `metrics` is given, only
+    those metric columns are read; metrics missing from the rollup are
+    skipped.
+    """
+    if os.path.isdir(path):
+        return load_columnar(path, metrics)
+
+    usecols = None
+    if metrics is not None:
+        wanted = set(KEY_COLUMNS) | set(metrics) | {FILTER_COLUMN}
+        usecols = lambda c: c in wanted
+    df = pd.read_csv(path, usecols=usecols, skipinitialspace=True)
+    if metrics is not None:
+        metrics = [m for m in metrics if m in df.columns]
+    return from_frame(df, metrics)
+
+
+def to_shared_memory(cube):
+    """
+    Copy the arrays of a cube into shared memory blocks. Return (blocks,
+    spec): spec is a small picklable description that from_shared_memory()
+    turns back into a RollupCube in another process. The caller owns the
+    blocks and must close() and unlink() them when all users are done.
+    """
+    blocks = []
+    arrays = {}
+    for name in ('values', 'present', 'valid'):
+        arr = np.ascontiguousarray(getattr(cube, name))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        arrays[name] = (shm.name, arr.shape, arr.dtype.str)
+    spec = {'traces': cube.traces, 'exps': cube.exps, 'metrics': cube.metrics, 'arrays': arrays}
+    return blocks, spec
+
+
+def from_shared_memory(spec):
+    """
+    Attach to the blocks described by a to_shared_memory() spec. Return
+    (cube, blocks); the cube's arrays are views of the blocks, which must
+    stay open while the cube is in use.
+    """
+    blocks = []
+    arrays = {}
+    for name, (shm_name, shape, dtype) in spec['arrays'].items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    cube = RollupCube(spec['traces'], spec['exps'], spec['metrics'],
+                      arrays['values'], arrays['present'], arrays['valid'])
+    return cube, blocks
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Run a .tlist x .exp sweep on the local machine.
+
+This is the local counterpart of `create_jobfile.pl --local 1`: every
+(trace, exp) pair is expanded into the same command line (including the
+$(PYTHIA_HOME), $(EXP), $(TRACE) and $(NCORES) hooks) and its output is
+written to `${trace}_${exp}.out`, so rollup.pl/rollup.py work unchanged.
+Instead of running the jobs one after another, up to --jobs simulations run
+at the same time.
+
+Wall-clock runtimes of finished jobs are recorded in a JSON file (default:
+.runtimes.json in the output directory). The next sweep starts the jobs that
+took longest first, so a few long traces do not end up running alone at the
+end of the sweep. Jobs without a recorded runtime are estimated from the
+other runs of the same trace, then of the same experiment, and are started
+first when nothing is known about them.
+
+With --share-traces, jobs that read the same trace are started together
+and every trace is decompressed only once for all of them (see
+trace_server.py) instead of once per simulated core of every job.
+
+Every job is recorded in a job ledger (default: .jobs.db in the output
+directory, see job_ledger.py) with its exit code, wall time and whether
+its output is complete. --retries reruns jobs that fail or stop early, and
+--resume runs only the jobs of the sweep that are not done yet, e.g. after
+the machine went down in the middle of a sweep.
+
+With --prune, the heartbeats of the running jobs are compared with the best
+job on the same trace as the sweep goes on, and jobs that are unlikely to
+catch up with it are killed and recorded as pruned (see early_stop.py).
+
+With --result-store, a job whose simulation (binary, effective knobs and
+trace checksums, see result_store.py) is already in the store gets the
+stored output linked in instead of being run, and the output of every job
+that is done is added to the store.
+
+Example:
+    cd experiments_1C/
+    python3 ../../scripts/run_jobs.py --exe $PYTHIA_HOME/bin/perceptron-multi-multi-no-ship-1core \\
+        --tlist ../MICRO21_1C.tlist --exp ../MICRO21_1C.exp --jobs 64
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import early_stop
+from exp_files import parse_exp, parse_tlist
+from job_ledger import JobLedger, check_output, exit_reason
+from result_store import ResultStore
+from trace_server import TraceServer
+
+
+class Job(object):
+    """One simulation: a (trace, exp) pair and its command line."""
+
+    def __init__(self, trace, exp, prefix, trace_input):
+        self.trace = trace
+        self.exp = exp
+        self.prefix = prefix
+        self.trace_input = trace_input
+        self.name = '%s_%s' % (trace, exp)
+        self.estimate = None
+        self.result_key = None
+
+    @property
+    def output(self):
+        return self.name + '.out'
+
+    @property
+    def inputs(self):
+        return self.trace_input.split()
+
+    @property
+    def cmdline(self):
+        return '%s -traces %s' % (self.prefix, self.trace_input)
+
+    def command(self, inputs):
+        """Command line with the -traces replaced by `inputs`."""
+        return '%s -traces %s' % (self.prefix, ' '.join(inputs))
+
+
+def substitute_hooks(cmdline, exp_name, trace_name, ncores, pythia_home):
+    """Replace the create_jobfile.pl hooks in a command line."""
+    cmdline = cmdline.replace('$(PYTHIA_HOME)', pythia_home)
+    cmdline = cmdline.replace('$(EXP)', exp_name)
+    cmdline = cmdline.replace('$(TRACE)', trace_name)
+    return cmdline.replace('$(NCORES)', str(ncores))
+
+
+def expand_jobs(traces, exps, exe, ncores=1, pythia_home=None):
+    """Return the Jobs of a sweep in create_jobfile.pl order."""
+    if pythia_home is None:
+        pythia_home = os.environ['PYTHIA_HOME']
+    jobs = []
+    for trace in traces:
+        for exp in exps:
+            hooks = (exp['NAME'], trace['NAME'], ncores, pythia_home)
+            prefix = '%s %s %s' % (exe, exp['KNOBS'], trace.get('KNOBS', ''))
+            jobs.append(Job(trace['NAME'], exp['NAME'], substitute_hooks(prefix, *hooks),
+                            substitute_hooks(trace['TRACE'], *hooks)))
+    return jobs
+
+
+class RuntimeDB(object):
+    """Recorded wall-clock runtimes (seconds) of finished jobs, by job name."""
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.runtimes = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            if data.get('version') == self.VERSION:
+                self.runtimes = data['runtimes']
+
+    def record(self, job, seconds):
+        with self.lock:
+            self.runtimes[job.name] = seconds
+            self._save()
+
+    def _save(self):
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump({'version': self.VERSION, 'runtimes': self.runtimes}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def estimate(self, jobs):
+        """
+        Set job.estimate for every job: its recorded runtime, else the mean
+        recorded runtime of its trace, else of its experiment, else None.
+        """
+        by_trace, by_exp = {}, {}
+        for job in jobs:
+            seconds = self.runtimes.get(job.name)
+            if seconds is not None:
+                by_trace.setdefault(job.trace, []).append(seconds)
+                by_exp.setdefault(job.exp, []).append(seconds)
+        for job in jobs:
+            job.estimate = self.runtimes.get(job.name)
+            for group, key in ((by_trace, job.trace), (by_exp, job.exp)):
+                if job.estimate is None and key in group:
+                    job.estimate = sum(group[key]) / len(group[key])
+
+
+def longest_first(jobs):
+    """Order jobs by decreasing estimated runtime; unknown jobs go first."""
+    return sorted(jobs, key=lambda job: float('inf') if job.estimate is None else job.estimate, reverse=True)
+
+
+class Runner(object):
+    """
+    Run jobs on at most `workers` concurrent simulator processes. With a
+    TraceServer, jobs that read the same traces are started together and
+    share a single decoder per trace. With a JobLedger, every attempt is
+    recorded there and a job only succeeds if its output is complete; a job
+    that does not succeed is run up to `retries` more times. With an
+    early_stop.Pruner, the running jobs are checked every `poll` seconds and
+    the ones it prunes are killed. With a ResultStore, the output of every
+    job that succeeds is stored under its job.result_key.
+    """
+
+    def __init__(self, workers, directory='.', runtimes=None, server=None, ledger=None, retries=0,
+                 pruner=None, poll=30.0, store=None):
+        self.workers = workers
+        self.directory = directory
+        self.runtimes = runtimes
+        self.server = server
+        self.ledger = ledger
+        self.retries = retries
+        self.pruner = pruner
+        self.poll = poll
+        self.store = store
+        self.procs = set()
+        self.running = {}
+        self.prune_reasons = {}
+        self.pruned = []
+        self.lock = threading.Lock()
+        self.slots = threading.Condition()
+        self.free = workers
+        self.stopping = False
+        self.done = 0
+        self.total = 0
+        self.failed = []
+
+    def units(self, jobs):
+        """Split jobs into groups that are started together, in job order."""
+        if self.server is None:
+            return [[job] for job in jobs]
+        groups = {}
+        for job in jobs:
+            key = tuple(sorted(set(os.path.abspath(os.path.join(self.directory, p)) for p in job.inputs)))
+            groups.setdefault(key, []).append(job)
+        return [group[i:i + self.workers] for group in groups.values()
+                for i in range(0, len(group), self.workers)]
+
+    def run_one(self, job, share=None, j=0):
+        try:
+            try:
+                problem, elapsed = self._attempt(job, share.inputs[j] if share else None)
+            finally:
+                if share is not None:
+                    share.release(j)
+            for retry in range(1, self.retries + 1):
+                if problem is None or self.stopping or job.name in self.prune_reasons:
+                    break
+                print('%s FAILED (%s), retry %d/%d' % (job.name, problem, retry, self.retries), flush=True)
+                # a retry reads its traces itself: the shared decoders have moved on
+                problem, elapsed = self._attempt(job, None)
+        finally:
+            with self.slots:
+                self.free += 1
+                self.slots.notify_all()
+        if problem is None and self.runtimes is not None:
+            self.runtimes.record(job, elapsed)
+        if problem is None and self.store is not None and job.result_key is not None:
+            self.store.put(job.result_key, os.path.join(self.directory, job.output), job, self.directory)
+        with self.lock:
+            self.done += 1
+            if job.name in self.prune_reasons:
+                status = 'PRUNED (%s)' % problem
+                self.pruned.append((job, problem))
+            elif problem is None:
+                status = 'ok'
+            else:
+                status = 'FAILED (%s)' % problem
+                self.failed.append((job, problem))
+            print('[%d/%d] %s %s in %.0fs' % (self.done, self.total, job.name, status, elapsed), flush=True)
+
+    def _attempt(self, job, inputs):
+        """Run a job once; return (problem, elapsed), where problem is None if the job succeeded."""
+        returncode, elapsed = self._execute(job, inputs)
+        if returncode is None:
+            return 'not started', elapsed
+        output = os.path.join(self.directory, job.output)
+        pruned = self.prune_reasons.get(job.name)
+        if pruned is not None:
+            early_stop.mark_pruned(output, pruned)
+        if self.ledger is None:
+            reason = pruned or (None if returncode == 0 else exit_reason(returncode))
+        else:
+            reason = self.ledger.finish(job.trace, job.exp, job.cmdline, returncode, elapsed, output, pruned)[1]
+        if self.pruner is not None:
+            self.pruner.finish(job, reason is None)
+        return reason, elapsed
+
+    def _execute(self, job, inputs):
+        if self.stopping:
+            return None, 0.0
+        cmdline = job.cmdline if inputs is None else job.command(inputs)
+        start = time.time()
+        output = os.path.join(self.directory, job.output)
+        # never write through a link to a stored output
+        if os.path.islink(output):
+            os.unlink(output)
+        with open(output, 'w') as out:
+            with self.lock:
+                if self.stopping:
+                    return None, 0.0
+                if self.ledger is not None:
+                    self.ledger.start(job.trace, job.exp, job.cmdline, job.output, job.name)
+                if self.pruner is not None:
+                    self.pruner.start(job, os.path.join(self.directory, job.output))
+                # exec, so that terminate() reaches the simulator rather than the shell
+                proc = subprocess.Popen('exec ' + cmdline, shell=True, cwd=self.directory,
+                                        stdout=out, stderr=subprocess.STDOUT)
+                self.procs.add(proc)
+                self.running[job.name] = proc
+            returncode = proc.wait()
+            with self.lock:
+                self.procs.discard(proc)
+                self.running.pop(job.name, None)
+        return returncode, time.time() - start
+
+    def monitor(self, finished):
+        """Kill the running jobs the pruner prunes, every `poll` seconds until `finished` is set."""
+        while not finished.wait(self.poll):
+            for job, reason in self.pruner.check():
+                with self.lock:
+                    proc = self.running.get(job.name)
+                    if proc is None or job.name in self.prune_reasons:
+                        continue
+                    self.prune_reasons[job.name] = reason
+                    proc.terminate()
+
+    def kill(self):
+        with self.lock:
+            self.stopping = True
+            for proc in self.procs:
+                proc.terminate()
+
+    def run(self, jobs):
+        """Run all jobs; return the list of (job, problem) that failed."""
+        self.total = len(jobs)
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        finished = threading.Event()
+        if self.pruner is not None:
+            threading.Thread(target=self.monitor, args=(finished,), daemon=True).start()
+        try:
+            for unit in self.units(jobs):
+                with self.slots:
+                    while self.free < len(unit):
+                        self.slots.wait(1.0)
+                    self.free -= len(unit)
+                share = None
+                if self.server is not None:
+                    share = self.server.share([[os.path.abspath(os.path.join(self.directory, p)) for p in job.inputs]
+                                               for job in unit])
+                    share.start()
+                for j, job in enumerate(unit):
+                    pool.submit(self.run_one, job, share, j)
+        except KeyboardInterrupt:
+            self.kill()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            finished.set()
+        return self.failed
+
+
+def reuse_stored(store, jobs, directory, mode, ledger):
+    """
+    Set job.result_key of every job and put the stored output of the jobs
+    that are in the store in place, recording them as done in the ledger.
+    Return the jobs that still have to run.
+    """
+    todo = []
+    for job in jobs:
+        job.result_key = store.key(job, directory)
+        output = os.path.join(directory, job.output)
+        if job.result_key is None or not store.fetch(job.result_key, output, mode):
+            todo.append(job)
+            continue
+        if ledger is not None:
+            ledger.start(job.trace, job.exp, job.cmdline, job.output, job.name)
+            ledger.finish(job.trace, job.exp, job.cmdline, 0, 0.0, output)
+    store.save()
+    return todo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a tlist x exp sweep on a local process pool.')
+    parser.add_argument('--exe', required=True, help='ChampSim executable')
+    parser.add_argument('--tlist', required=True, help='trace list')
+    parser.add_argument('--exp', required=True, help='experiment file')
+    parser.add_argument('--ncores', type=int, default=1, help='value of the $(NCORES) hook (default: 1)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='concurrent simulations (default: all cores)')
+    parser.add_argument('--dir', default='.', help='directory to run in and write the .out files to (default: .)')
+    parser.add_argument('--runtimes', default=None, help='runtime database (default: <dir>/.runtimes.json)')
+    parser.add_argument('--share-traces', action='store_true',
+                        help='decode every trace once for all concurrent jobs that read it')
+    parser.add_argument('--ledger', default=None, help='job ledger database (default: <dir>/.jobs.db)')
+    parser.add_argument('--resume', action='store_true', help='run only the jobs that are not done in the ledger')
+    parser.add_argument('--max-attempts', type=int, default=None,
+                        help='with --resume, leave out jobs that already ran this many times')
+    parser.add_argument('--retries', type=int, default=0,
+                        help='rerun a job that fails or stops early up to this many times (default: 0)')
+    parser.add_argument('--prune', action='store_true',
+                        help='kill jobs whose heartbeat IPC is unlikely to catch up with the best job on their trace')
+    parser.add_argument('--prune-alpha', type=float, default=early_stop.DEFAULT_ALPHA,
+                        help='prune a job if its chance to catch up is below this (default: %(default)s)')
+    parser.add_argument('--prune-margin', type=float, default=early_stop.DEFAULT_MARGIN * 100,
+                        help='catching up means ending within this many percent of the best IPC (default: %(default)s)')
+    parser.add_argument('--prune-min-intervals', type=int, default=early_stop.DEFAULT_MIN_INTERVALS,
+                        help='heartbeat intervals after the warmup before a job can be pruned (default: %(default)s)')
+    parser.add_argument('--prune-keep', nargs='*', default=early_stop.DEFAULT_KEEP,
+                        help='experiments that are never pruned (default: %(default)s)')
+    parser.add_argument('--prune-poll', type=float, default=30.0,
+                        help='seconds between two checks of the running jobs (default: %(default)s)')
+    parser.add_argument('--result-store', default=None,
+                        help='reuse the outputs of simulations in this store and add new ones (see result_store.py)')
+    parser.add_argument('--store-mode', choices=['symlink', 'hardlink', 'copy'], default='symlink',
+                        help='how a stored output is put in place (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true', help='only print the commands in scheduling order')
+    args = parser.parse_args()
+
+    if 'PYTHIA_HOME' not in os.environ:
+        sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+    if args.ncores == 0:
+        sys.exit('have to supply -ncores')
+
+    jobs = expand_jobs(parse_tlist(args.tlist), parse_exp(args.exp), args.exe, args.ncores)
+    runtimes = RuntimeDB(args.runtimes or os.path.join(args.dir, '.runtimes.json'))
+    runtimes.estimate(jobs)
+    jobs = longest_first(jobs)
+
+    ledger = JobLedger(args.ledger or os.path.join(args.dir, '.jobs.db'))
+    sweep = jobs
+    if args.resume:
+        jobs = ledger.todo(jobs, args.max_attempts)
+        print('%d of %d jobs to run' % (len(jobs), len(sweep)), file=sys.stderr)
+
+    store = None
+    if args.result_store:
+        store = ResultStore(args.result_store)
+        if args.dry_run:
+            jobs = [job for job in jobs if not store.has(store.key(job, args.dir))]
+        else:
+            ledger.register(jobs)
+            total = len(jobs)
+            jobs = reuse_stored(store, jobs, args.dir, args.store_mode, ledger)
+            print('%d of %d jobs found in the result store' % (total - len(jobs), total), file=sys.stderr)
+
+    if args.dry_run:
+        for job in jobs:
+            print('%s > %s 2>&1' % (job.cmdline, job.output))
+        return
+
+    ledger.register(jobs)
+    server = TraceServer() if args.share_traces else None
+    pruner = None
+    if args.prune:
+        pruner = early_stop.Pruner(args.prune_alpha, args.prune_margin / 100.0, args.prune_min_intervals,
+                                   args.prune_keep)
+        # the jobs of the sweep that are done already are the ones to catch up with
+        todo = set(job.name for job in jobs)
+        for job in sweep:
+            output = os.path.join(args.dir, job.output)
+            if job.name not in todo and check_output(output) is None:
+                pruner.add_done(job, output)
+    runner = Runner(args.jobs, args.dir, runtimes, server, ledger, args.retries, pruner, args.prune_poll, store)
+    try:
+        failed = runner.run(jobs)
+    finally:
+        if server is not None:
+            server.cleanup()
+        if store is not None:
+            store.save()
+        ledger.close()
+    if runner.pruned:
+        print('%d of %d jobs pruned' % (len(runner.pruned), len(jobs)), file=sys.stderr)
+    if failed:
+        print('%d of %d jobs failed:' % (len(failed), len(jobs)), file=sys.stderr)
+        for job, problem in failed:
+            print('    %s (%s)' % (job.name, problem), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Cut short slices out of ChampSim traces for smoke runs.
+
+Every trace of a trace list is streamed through champsim_trace.py and the
+`count` records after the first `skip` are written to a trace of the same
+file name (ChampSim seeds some structures from the file name) and the same
+compression in the output directory, one trace per worker process. A new
+trace list with the same NAMEs and KNOBS points at the slices, so a sweep
+runs unchanged on it:
+
+    python3 slice_trace.py --tlist ../experiments/MICRO21_1C.tlist --count 5000000 \\
+        --out-dir $PYTHIA_HOME/traces_smoke --out-tlist MICRO21_1C_smoke.tlist
+
+Pair the slices with a warmup + simulation window that fits in them (e.g.
+--warmup_instructions=1000000 --simulation_instructions=4000000 for 5M
+records); ChampSim rewinds a trace that runs out.
+
+The output directory keeps a manifest of the slices it holds, so a rerun
+only cuts traces whose source or slice window changed.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from champsim_trace import read_chunks, write_chunks
+from exp_files import parse_tlist, write_tlist
+
+MANIFEST = 'slices.json'
+
+# lzma preset of the slices: decompressing is as fast as for the default
+# preset and compressing is several times faster
+DEFAULT_PRESET = 1
+
+
+def slice_trace(src, dst, skip=0, count=None, cloudsuite=False, preset=DEFAULT_PRESET):
+    """
+    Write records [skip, skip + count) of trace `src` to trace `dst`.
+    Return the number of records written.
+    """
+    tmp = '%s.%d.tmp%s' % (dst, os.getpid(), os.path.splitext(dst)[1])
+    try:
+        written = write_chunks(tmp, read_chunks(src, cloudsuite=cloudsuite, skip=skip, count=count), preset)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return written
+
+
+class SliceManifest(object):
+    """Slices in an output directory, with the source and window they were cut from."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, MANIFEST)
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as fh:
+                self.entries = json.load(fh)
+
+    @staticmethod
+    def _key(src, st, skip, count):
+        return [os.path.abspath(src), st.st_size, st.st_mtime_ns, skip, count]
+
+    def current(self, filename, src, st, skip, count):
+        entry = self.entries.get(filename)
+        return (entry is not None and entry['source'] == self._key(src, st, skip, count)
+                and os.path.exists(os.path.join(os.path.dirname(self.path), filename)))
+
+    def put(self, filename, src, st, skip, count, records):
+        self.entries[filename] = {'source': self._key(src, st, skip, count), 'records': records}
+
+    def save(self):
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as fh:
+            json.dump(self.entries, fh, indent=1)
+        os.replace(tmp, self.path)
+
+
+def _expand(path, pythia_home):
+    return path.replace('$(PYTHIA_HOME)', pythia_home)
+
+
+def _contract(path, pythia_home):
+    """Write paths under $PYTHIA_HOME with the $(PYTHIA_HOME) hook, like the shipped trace lists."""
+    path = os.path.abspath(path)
+    home = os.path.abspath(pythia_home)
+    if path.startswith(home + os.sep):
+        return '$(PYTHIA_HOME)' + path[len(home):]
+    return path
+
+
+def slice_tlist(traces, out_dir, skip=0, count=None, cloudsuite=False, preset=DEFAULT_PRESET,
+                jobs=None, pythia_home=None):
+    """
+    Slice every trace file of `traces` (parse_tlist() records; a multi-core
+    record lists several) into `out_dir` and return the records of the
+    trace list of the slices.
+    """
+    pythia_home = pythia_home or os.environ.get('PYTHIA_HOME', os.getcwd())
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = SliceManifest(out_dir)
+
+    sources = {}
+    for rec in traces:
+        for path in rec['TRACE'].split():
+            src = _expand(path, pythia_home)
+            name = os.path.basename(src)
+            if sources.setdefault(name, src) != src:
+                sys.exit('%s and %s would be sliced to the same file' % (sources[name], src))
+
+    todo = []
+    for name, src in sorted(sources.items()):
+        st = os.stat(src)
+        if not manifest.current(name, src, st, skip, count):
+            todo.append((name, src, st))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(slice_trace, src, os.path.join(out_dir, name), skip, count, cloudsuite, preset):
+                   (name, src, st) for name, src, st in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            name, src, st = futures[future]
+            records = future.result()
+            manifest.put(name, src, st, skip, count, records)
+            manifest.save()
+            print('[%d/%d] %s: %d records' % (done, len(todo), name, records), file=sys.stderr)
+            if count is not None and records < count:
+                print('warning: %s has only %d records after the first %d' % (src, records, skip), file=sys.stderr)
+
+    sliced = []
+    for rec in traces:
+        paths = [_contract(os.path.join(out_dir, os.path.basename(_expand(p, pythia_home))), pythia_home)
+                 for p in rec['TRACE'].split()]
+        sliced.append(dict(rec, TRACE=' '.join(paths)))
+    return sliced
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Slice ChampSim traces into short traces for smoke runs')
+    parser.add_argument('--tlist', required=True, help='trace list of the traces to slice')
+    parser.add_argument('--out-dir', required=True, help='directory of the sliced traces')
+    parser.add_argument('--out-tlist', required=True, help='trace list of the sliced traces to write')
+    parser.add_argument('--skip', type=int, default=0, help='records to skip (default: %(default)s)')
+    parser.add_argument('--count', type=int, required=True, help='records per slice')
+    parser.add_argument('--cloudsuite', action='store_true', help='CloudSuite record format')
+    parser.add_argument('--preset', type=int, default=DEFAULT_PRESET,
+                        help='xz/gzip compression level of the slices (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: all CPUs)')
+    args = parser.parse_args()
+
+    if 'PYTHIA_HOME' not in os.environ:
+        sys.exit('$PYTHIA_HOME env variable is not defined.\nHave you sourced setvars.sh?')
+
+    sliced = slice_tlist(parse_tlist(args.tlist), args.out_dir, args.skip, args.count, args.cloudsuite,
+                         args.preset, args.jobs)
+    with open(args.out_tlist, 'w') as out:
+        write_tlist(sliced, out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Vectorized speedup engine over a RollupCube.
+
+Every experiment is paired with a baseline experiment (by default `nopref`,
+or `nopref<suffix>` when the experiment carries a sweep suffix such as
+`_MTPS150`, see suffix_baseline). Per-trace ratios, geometric
+means and arithmetic means for all experiments are computed in one pass in
+log space.
+
+Cells that cannot produce a meaningful ratio are never silently turned into
+NaN/inf: a ratio is only used when the experiment has a baseline, both runs
+are valid in the rollup (Filter column) and both metric values are finite
+and strictly positive. Everything else is excluded from the means and
+counted in `dropped`; pass strict=True to raise instead.
+
+Usage:
+    from rollup_cube import load_cube
+    from speedup import compute_speedups
+    s = compute_speedups(load_cube('rollup.csv'), exps=['spp', 'pythia'])
+    s.geomean, s.mean, s.count
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# the value at the end of a sweep suffix: _MTPS150 is in the _MTPS family
+_SUFFIX_VALUE = re.compile(r'[\d.]+$')
+
+
+def suffix_baseline(base):
+    """
+    Return a baseline selector that maps `<name><suffix>` to `<base><suffix>`
+    for the longest `_`-delimited suffix whose baseline exists in the cube.
+
+    A suffix that ends in a value belongs to the family of suffixes without
+    it (_MTPS150 and _MTPS600 are both _MTPS). If the cube has a baseline of
+    the family of one of the experiment's suffixes but not the one of its
+    own suffix, the experiment has no baseline (None): comparing a sweep
+    point with the baseline of another point would be wrong. Only names
+    without any such baseline family fall back to `base` itself. E.g. with
+    base='nopref' and nopref_MTPS150 and nopref_MTPS600 in the cube:
+        pythia_MTPS150 -> nopref_MTPS150, pythia_MTPS300 -> None,
+        spp_ppf_dev -> nopref
+    """
+    def select(exp, cube):
+        suffixes = [exp[m.start():] for m in re.finditer('_', exp)]
+        for suffix in suffixes:
+            if cube.has_exp(base + suffix):
+                return base + suffix
+        for suffix in suffixes:
+            family = base + _SUFFIX_VALUE.sub('', suffix)
+            if family != base + suffix and len(family) > len(base) + 1 and \
+                    any(e != exp and e.startswith(family) and _SUFFIX_VALUE.fullmatch(e[len(family):])
+                        for e in cube.exps):
+                return None
+        return base
+    return select
+
+
+def resolve_baselines(cube, exps, baseline):
+    """
+    Map each experiment to its baseline experiment name, or None if it has
+    none. `baseline` can be an experiment name (see suffix_baseline), a dict
+    {exp: baseline}, or a callable (exp, cube) -> baseline.
+    """
+    if isinstance(baseline, str):
+        baseline = suffix_baseline(baseline)
+    if isinstance(baseline, dict):
+        mapping = baseline
+        baseline = lambda exp, cube: mapping[exp]
+    names = [baseline(exp, cube) for exp in exps]
+    for exp, name in zip(exps, names):
+        if name is not None and not cube.has_exp(name):
+            raise KeyError('baseline %s of experiment %s is not in the rollup' % (name, exp))
+    return names
+
+
+class SpeedupResult(object):
+    """
+    Speedups of `exps` over their `baselines` on every trace of the cube.
+
+    values, baseline_values -- (traces, exps) metric values
+    ratios   -- (traces, exps) values / baseline_values, NaN where not usable
+    usable   -- (traces, exps) mask of the ratios that enter the means
+    dropped  -- dict of (traces, exps) masks explaining excluded cells:
+                'no_baseline' (the experiment has no baseline),
+                'missing' (run absent or Filter != 1 for either side),
+                'zero_baseline' (baseline value <= 0 or not finite),
+                'zero_value' (experiment value <= 0 or not finite)
+    count, geomean, mean -- (exps,) per-experiment summaries; experiments
+                without any usable trace have count 0 and NaN means
+    """
+
+    def __init__(self, traces, exps, baselines, metric, values, baseline_values, usable, dropped):
+        self.traces = list(traces)
+        self.exps = list(exps)
+        self.baselines = list(baselines)
+        self.metric = metric
+        self.values = values
+        self.baseline_values = baseline_values
+        self.usable = usable
+        self.dropped = dropped
+
+        self.ratios = np.full(values.shape, np.nan)
+        np.divide(values, baseline_values, out=self.ratios, where=usable)
+        log_ratios = np.zeros(values.shape)
+        np.log(self.ratios, out=log_ratios, where=usable)
+
+        self.count = usable.sum(axis=0)
+        has_data = self.count > 0
+        denom = np.where(has_data, self.count, 1)
+        self.geomean = np.where(has_data, np.exp(log_ratios.sum(axis=0) / denom), np.nan)
+        self.mean = np.where(has_data, np.where(usable, self.ratios, 0.0).sum(axis=0) / denom, np.nan)
+
+    def index(self, exp):
+        return self.exps.index(exp)
+
+    def trace_ratios(self, exp):
+        """Return (traces, ratios) of the usable traces of one experiment."""
+        j = self.index(exp)
+        rows = np.flatnonzero(self.usable[:, j])
+        return [self.traces[i] for i in rows], self.ratios[rows, j]
+
+    def summary(self):
+        """Per-experiment summary as a DataFrame indexed by experiment."""
+        return pd.DataFrame({
+            'Baseline': self.baselines,
+            'Count': self.count,
+            'Geomean': self.geomean,
+            'Mean': self.mean,
+        }, index=pd.Index(self.exps, name='Exp'))
+
+    def per_trace(self):
+        """Long-format usable (Trace, Exp) ratios as a DataFrame."""
+        rows, cols = np.nonzero(self.usable)
+        return pd.DataFrame({
+            'Trace': [self.traces[i] for i in rows],
+            'Exp': [self.exps[j] for j in cols],
+            'Baseline': [self.baselines[j] for j in cols],
+            'Baseline_' + self.metric: self.baseline_values[rows, cols],
+            self.metric: self.values[rows, cols],
+            'Ratio': self.ratios[rows, cols],
+        })
+
+
+def compute_speedups(cube, metric='Core_0_IPC', baseline='nopref', exps=None, strict=False):
+    """
+    Compute `metric` speedups of every experiment in `exps` (default: every
+    experiment that is not its own baseline) over its baseline.
+    """
+    if exps is None:
+        all_baselines = resolve_baselines(cube, cube.exps, baseline)
+        exps = [e for e, b in zip(cube.exps, all_baselines) if e != b]
+    exps = list(exps)
+    baselines = resolve_baselines(cube, exps, baseline)
+
+    no_baseline = np.array([b is None for b in baselines], dtype=bool)
+    if strict and no_baseline.any():
+        raise KeyError('%d experiment(s) without a baseline, e.g. %s'
+                       % (no_baseline.sum(), exps[int(np.argmax(no_baseline))]))
+    values = cube.metric(metric, exps=exps)
+    has = np.flatnonzero(~no_baseline)
+    paired = [baselines[j] for j in has]
+    baseline_values = np.full(values.shape, np.nan)
+    valid = np.zeros(values.shape, dtype=bool)
+    if len(has):
+        baseline_values[:, has] = cube.metric(metric, exps=paired)
+        valid[:, has] = cube.mask(exps=[exps[j] for j in has]) & cube.mask(exps=paired)
+    no_baseline = np.broadcast_to(no_baseline, values.shape).copy()
+
+    with np.errstate(invalid='ignore'):
+        good_baseline = np.isfinite(baseline_values) & (baseline_values > 0)
+        good_value = np.isfinite(values) & (values > 0)
+    dropped = {
+        'no_baseline': no_baseline,
+        'missing': ~valid & ~no_baseline,
+        'zero_baseline': valid & ~good_baseline,
+        'zero_value': valid & good_baseline & ~good_value,
+    }
+    usable = valid & good_baseline & good_value
+
+    if strict:
+        bad = dropped['zero_baseline'] | dropped['zero_value']
+        if bad.any():
+            i, j = np.argwhere(bad)[0]
+            raise ValueError('%d unusable %s ratio(s), e.g. trace %s exp %s (%g) over %s (%g)'
+                             % (bad.sum(), metric, cube.traces[i], exps[j], values[i, j],
+                                baselines[j], baseline_values[i, j]))
+
+    return SpeedupResult(cube.traces, exps, baselines, metric, values, baseline_values, usable, dropped)
@@ -0,0 +1,298 @@
+"""
+Typed, fixed-shape arrays of the bucketed statistics of ChampSim logs.
+
+A lot of the simulator output is one series printed as many `key value`
+lines, e.g.
+
+    learning_engine_featurewise.q_value_histogram.bucket_3 1234
+    learning_engine_featurewise.action.index_-6_exploited 42
+    Core_0_L2C_acc_level_7 19
+    scooby_reward_22 0,12,340,1002,0,0,
+
+rollup.pl sees every line as an unrelated scalar (or a raw comma list) and
+an mfile has to name each of them. A Family describes one such series with
+a regular expression over the stat name: every named group is an axis of
+the series, and for comma-separated values the position in the list is one
+more axis. load_stats() parses the `${trace}_${exp}.${ext}` files of a
+sweep on a process pool and returns every family as one NumPy array of
+shape (traces, exps, *axes), together with the labels of each axis and a
+`found` mask of the cells that were in the logs. A whole-sweep question
+("how often does every experiment pick action -6?") is then one array
+operation.
+
+Axis labels are the union over all logs: integer labels are sorted
+numerically, other labels keep the order in which they first appear.
+
+Usage:
+    from stats_schema import load_stats
+    stats = load_stats(parse_tlist('MICRO21_1C.tlist'), parse_exp('MICRO21_1C.exp'))
+    hist = stats['q_value_histogram']
+    hist.values                                     # (traces, exps, buckets)
+    exploited = stats['featurewise_action'].sel(mode='exploited')   # (traces, exps, actions)
+
+Command line (summary of the families found, optionally saved as .npz):
+    python3 stats_schema.py --tlist ../MICRO21_1C.tlist --exp ../MICRO21_1C.exp --out stats.npz
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from exp_files import parse_exp, parse_tlist
+from rollup import parse_stats, perl_num
+
+# MapRewardTypeString (prefetcher/scooby_helper.cc)
+REWARD_TYPES = ['none', 'incorrect', 'correct_untimely', 'correct_timely', 'out_of_bounds', 'tracker_hit']
+
+_INT_LABEL = re.compile(r'-?\d+$')
+
+
+class Family(object):
+    """
+    A series of stats whose names match `pattern` (a regular expression
+    matched against the whole name). The named groups of the pattern are
+    the axes, in order. If `array_axis` is given, the values are comma
+    separated lists and their positions form the last axis, labeled by
+    `array_labels` (default: 0, 1, ...).
+    """
+
+    def __init__(self, name, pattern, array_axis=None, array_labels=None, dtype=np.int64):
+        self.name = name
+        self.regex = re.compile(pattern)
+        self.group_axes = list(self.regex.groupindex)
+        self.array_axis = array_axis
+        self.array_labels = array_labels
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def axes(self):
+        return self.group_axes + ([self.array_axis] if self.array_axis else [])
+
+    def match(self, key):
+        """Return the axis labels of a stat name, or None if it is not in the family."""
+        m = self.regex.fullmatch(key)
+        if m is None:
+            return None
+        return tuple(int(v) if _INT_LABEL.match(v) else v for v in m.groups())
+
+    def _num(self, token):
+        # counters are printed as %lu: keep them exact past 2^53
+        if self.dtype.kind == 'i':
+            try:
+                return int(token)
+            except ValueError:
+                pass
+        return perl_num(token)
+
+    def value(self, raw):
+        if self.array_axis:
+            tokens = raw.split(',')
+            while tokens and tokens[-1] == '':
+                tokens.pop()
+            return [self._num(t) for t in tokens]
+        return self._num(raw)
+
+
+FAMILIES = [
+    Family('q_value_histogram', r'learning_engine_featurewise\.q_value_histogram\.bucket_(?P<bucket>\d+)'),
+    Family('featurewise_action', r'learning_engine_featurewise\.action\.index_(?P<action>-?\d+)_(?P<mode>explored|exploited)'),
+    Family('featurewise_weight', r'learning_engine_featurewise\.feature_(?P<feature>\w+?)_(?P<bound>min|max)_weight',
+           dtype=np.float64),
+    Family('basic_action', r'learning_engine\.action\.index_(?P<action>-?\d+)_(?P<mode>explored|exploited)'),
+    Family('cache_acc_level', r'Core_(?P<core>\d+)_(?P<cache>[A-Z0-9]+)_acc_level_(?P<level>\d+)'),
+    Family('dram_bw_level', r'DRAM_bw_level_(?P<level>\d+)'),
+    Family('scooby_predict', r'scooby_predict_(?P<kind>action|issue_action|hit_action|out_of_bounds_action)_(?P<action>-?\d+)'),
+    Family('scooby_multi_deg', r'scooby_predict_multi_deg_(?P<degree>\d+)'),
+    Family('scooby_selected_deg', r'scooby_selected_deg_(?P<degree>\d+)'),
+    Family('scooby_action_degree', r'scooby_action_(?P<action>-?\d+)_deg_dist', array_axis='degree'),
+    Family('scooby_action_reward', r'scooby_reward_(?P<action>-?\d+)', array_axis='reward', array_labels=REWARD_TYPES),
+    Family('scooby_reward_bw', r'scooby_reward_(?P<reward>[a-z_]+?)_(?P<bw>low|high)_bw'),
+    Family('scooby_bw_level', r'scooby_bw_level_(?P<level>\d+)'),
+    Family('scooby_ipc_level', r'scooby_ipc_level_(?P<level>\d+)'),
+    Family('scooby_cache_acc_level', r'scooby_cache_acc_level_(?P<level>\d+)'),
+]
+
+
+class FamilyArray(object):
+    """
+    One family over a sweep.
+
+    values -- array of shape (len(traces), len(exps), *axis lengths) of the
+              family dtype; cells that are not in the logs are 0.
+    found  -- bool array of the same shape, True where the log had the stat.
+    axes   -- [(axis name, labels), ...] of the family axes.
+    """
+
+    def __init__(self, name, traces, exps, axes, values, found):
+        self.name = name
+        self.traces = list(traces)
+        self.exps = list(exps)
+        self.axes = [(axis, list(labels)) for axis, labels in axes]
+        self.values = values
+        self.found = found
+
+    def labels(self, axis):
+        return dict(self.axes)[axis]
+
+    def masked(self):
+        """values as a masked array, with the cells missing from the logs masked."""
+        return np.ma.MaskedArray(self.values, mask=~self.found)
+
+    def sel(self, traces=None, exps=None, **labels):
+        """
+        Return the values at the given trace/exp names and axis labels. A
+        single label drops its axis; a list keeps it.
+        """
+        index = [slice(None)] * self.values.ndim
+        for dim, names, known in ((0, traces, self.traces), (1, exps, self.exps)):
+            if names is not None:
+                index[dim] = _positions(known, names, self.name)
+        for dim, (axis, known) in enumerate(self.axes, 2):
+            if axis in labels:
+                index[dim] = _positions(known, labels.pop(axis), '%s.%s' % (self.name, axis))
+        if labels:
+            raise KeyError('%s has no axis %s' % (self.name, ', '.join(labels)))
+        # index one dimension at a time, so that several lists do not broadcast together
+        values = self.values
+        for dim in reversed(range(len(index))):
+            values = values[(slice(None),) * dim + (index[dim],)]
+        return values
+
+
+def _positions(known, names, what):
+    pos = {label: i for i, label in enumerate(known)}
+    try:
+        if isinstance(names, (list, tuple)):
+            return [pos[n] for n in names]
+        return pos[names]
+    except KeyError as e:
+        raise KeyError('%s has no label %s' % (what, e.args[0]))
+
+
+def parse_families(log_file, ext, families):
+    """Return {family name: {labels: value}} of one stat file, or None if it does not exist."""
+    if not os.path.exists(log_file):
+        return None
+    found = {family.name: {} for family in families}
+    for key, raw in parse_stats(log_file, ext).items():
+        for family in families:
+            labels = family.match(key)
+            if labels is not None:
+                found[family.name][labels] = family.value(raw)
+                break
+    return found
+
+
+def _parse_task(args):
+    return parse_families(*args)
+
+
+def _axis_labels(seen):
+    if all(isinstance(label, int) for label in seen):
+        return sorted(seen)
+    return list(seen)
+
+
+def load_stats(traces, exps, families=FAMILIES, ext='out', directory='.', jobs=None):
+    """
+    Load the families of every `${trace}_${exp}.${ext}` file of a sweep
+    (parse_tlist() and parse_exp() records). Return {family name: FamilyArray}.
+    """
+    tasks = [(os.path.join(directory, '%s_%s.%s' % (trace['NAME'], exp['NAME'], ext)), ext, families)
+             for trace in traces for exp in exps]
+    if jobs == 1 or len(tasks) <= 1:
+        parsed = [parse_families(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(tasks) // (4 * (jobs or os.cpu_count() or 1)))
+            parsed = list(pool.map(_parse_task, tasks, chunksize=chunksize))
+
+    arrays = {}
+    for family in families:
+        # labels of every axis, in first appearance order (dicts keep it)
+        seen = [dict() for _ in family.axes]
+        for result in parsed:
+            for labels, value in (result or {}).get(family.name, {}).items():
+                for axis, label in enumerate(labels):
+                    seen[axis].setdefault(label, None)
+                if family.array_axis:
+                    for position in range(len(value)):
+                        seen[-1].setdefault(position, None)
+        axes = [_axis_labels(s) for s in seen]
+        if family.array_axis and family.array_labels and len(axes[-1]) <= len(family.array_labels):
+            axes[-1] = family.array_labels[:len(axes[-1])]
+        pos = [{label: i for i, label in enumerate(labels)} for labels in axes]
+        array_pos = pos[:-1] if family.array_axis else pos
+
+        shape = (len(traces), len(exps)) + tuple(len(labels) for labels in axes)
+        values = np.zeros(shape, dtype=family.dtype)
+        found = np.zeros(shape, dtype=bool)
+        for cell, result in enumerate(parsed):
+            if not result:
+                continue
+            ti, ei = divmod(cell, len(exps))
+            for labels, value in result[family.name].items():
+                index = (ti, ei) + tuple(p[label] for p, label in zip(array_pos, labels))
+                if family.array_axis:
+                    values[index][:len(value)] = value
+                    found[index][:len(value)] = True
+                else:
+                    values[index] = value
+                    found[index] = True
+        arrays[family.name] = FamilyArray(family.name, [t['NAME'] for t in traces], [e['NAME'] for e in exps],
+                                          zip(family.axes, axes), values, found)
+    return arrays
+
+
+def save_stats(arrays, path):
+    """Store loaded families in one .npz file (values, found and a JSON schema)."""
+    schema = {name: {'traces': a.traces, 'exps': a.exps, 'axes': a.axes} for name, a in arrays.items()}
+    data = {'schema': np.array(json.dumps(schema))}
+    for name, a in arrays.items():
+        data[name] = a.values
+        data[name + '.found'] = a.found
+    np.savez_compressed(path, **data)
+
+
+def read_stats(path):
+    """Read families stored by save_stats()."""
+    with np.load(path) as data:
+        schema = json.loads(str(data['schema']))
+        return {name: FamilyArray(name, s['traces'], s['exps'], s['axes'], data[name], data[name + '.found'])
+                for name, s in schema.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load the histogram and array stats of a sweep as typed arrays')
+    parser.add_argument('--tlist', required=True, help='trace list')
+    parser.add_argument('--exp', required=True, help='experiment file')
+    parser.add_argument('--ext', default='out', help='extension of the statistics files (default: out)')
+    parser.add_argument('--dir', default='.', help='directory holding the statistics files (default: .)')
+    parser.add_argument('--families', nargs='+', help='families to load (default: all)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--out', help='save the arrays to this .npz file')
+    args = parser.parse_args()
+
+    families = FAMILIES
+    if args.families:
+        known = {f.name: f for f in FAMILIES}
+        unknown = [name for name in args.families if name not in known]
+        if unknown:
+            sys.exit('unknown families: %s (known: %s)' % (', '.join(unknown), ', '.join(known)))
+        families = [known[name] for name in args.families]
+
+    arrays = load_stats(parse_tlist(args.tlist), parse_exp(args.exp), families, args.ext, args.dir, args.jobs)
+    for name, a in arrays.items():
+        axes = ', '.join('%s[%d]' % (axis, len(labels)) for axis, labels in a.axes)
+        print('%-24s %-22s %s  %d/%d cells found' % (name, a.values.shape, axes, a.found.sum(), a.found.size))
+    if args.out:
+        save_stats(arrays, args.out)
+
+
+if __name__ == '__main__':
+    main()
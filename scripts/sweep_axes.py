@@ -0,0 +1,327 @@
+"""
+Sweep axes of an experiment file.
+
+Experiment names such as `pythia_MTPS150` encode a point of a parameter
+sweep only by convention. The .exp file says what each experiment really
+runs: expand_knobs() applies its knob list the way ChampSim's parse_args()
+does (in order, `--config=<ini>` files expanded in place, later values
+overriding earlier ones, `vector<string>` knobs such as
+l2c_prefetcher_types accumulating), with the defaults of src/knobs.cc for
+everything not set. The knobs that vary across the experiments become the
+axes of a SweepAxes frame indexed by experiment name, e.g.
+
+    Exp             l2c_prefetcher_types  dram_io_freq
+    nopref_MTPS150  none                  150
+    pythia_MTPS150  scooby                150
+
+Knobs that are fully determined by an axis already chosen (`config`, the
+scooby_* knobs of pythia.ini, ...) are not separate axes. Without an .exp
+file, axes_from_names() falls back to the naming convention
+`<name>[_<AXIS><number>...]`.
+
+sweep_speedups() pairs every experiment with the baseline at the same
+coordinates (e.g. l2c_prefetcher_types=none at the same dram_io_freq) and
+aggregates per-trace speedups over any subset of axes with one group-by:
+
+    sweep = load_sweep('rollup_1C_varying_DRAM_bw.exp')
+    s = sweep_speedups(cube, sweep, baseline={'l2c_prefetcher_types': 'none'})
+    s['Geomean'].unstack('dram_io_freq')              # prefetcher x MTPS
+    sweep_speedups(cube, sweep, baseline=..., by=['dram_io_freq'])
+
+Command line:
+    python3 sweep_axes.py --exp ../rollup_1C_varying_DRAM_bw.exp --rollup rollup.csv \
+        --baseline l2c_prefetcher_types=none [--by dram_io_freq] [--out speedups.csv]
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from bootstrap import DEFAULT_RESAMPLES, bootstrap_means
+from exp_files import ini_line, parse_exp, read_ini
+from rollup_cube import load_cube
+from speedup import compute_speedups
+
+PYTHIA_HOME = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+_DECL = re.compile(r'^\s*(?:const\s+)?([\w:<>]+)\s+(\w+)\s*(?:=\s*(.*?))?\s*;')
+
+
+def knob_defaults(knobs_cc=None):
+    """
+    Read the knob declarations of src/knobs.cc. Return (defaults, vectors):
+    the default value of every scalar knob as a string, and the set of
+    vector<string> knobs whose values accumulate.
+    """
+    knobs_cc = knobs_cc or os.path.join(PYTHIA_HOME, 'src', 'knobs.cc')
+    defaults = {}
+    vectors = set()
+    if not os.path.isfile(knobs_cc):
+        return defaults, vectors
+    with open(knobs_cc) as fh:
+        text = fh.read()
+    start = text.find('namespace knob')
+    end = text.find('\n}', start)
+    for line in text[start:end].split('\n'):
+        m = _DECL.match(line)
+        if not m:
+            continue
+        ctype, name, value = m.groups()
+        if ctype == 'vector<string>':
+            vectors.add(name)
+        elif value is not None:
+            value = re.sub(r'^string\("(.*)"\)$', r'\1', value.strip())
+            defaults[name] = value.strip('"')
+    return defaults, vectors
+
+
+def expand_knobs(knobs, pythia_home=PYTHIA_HOME, vectors=()):
+    """
+    Apply a knob string (`--name=value ...`) and return {name: value}. Config
+    files are expanded in place when they can be read; otherwise `config`
+    is kept as a knob. Accumulated vector knobs are joined with ','.
+    """
+    values = {}
+
+    def apply(name, value):
+        if name == 'config':
+            path = value.replace('$(PYTHIA_HOME)', pythia_home)
+            if os.path.isfile(path):
+                for n, v in read_ini(path):
+                    apply(n, v)
+                return
+            value = os.path.splitext(os.path.basename(value))[0]
+        if name in vectors and name in values:
+            values[name] = values[name] + ',' + value
+        else:
+            values[name] = value
+
+    for token in knobs.split():
+        if not token.startswith('--'):
+            continue
+        parsed = ini_line(token[2:])
+        if parsed is not None:
+            apply(*parsed)
+    return values
+
+
+class SweepAxes(object):
+    """
+    Coordinates of experiments along the sweep axes.
+
+    frame -- DataFrame indexed by experiment name ('Exp') with one column
+             per axis; numeric axes hold numbers, the others strings.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @property
+    def axes(self):
+        return list(self.frame.columns)
+
+    @property
+    def exps(self):
+        return list(self.frame.index)
+
+    def coords(self, exp):
+        return self.frame.loc[exp].to_dict()
+
+    def where(self, **coords):
+        """Return the experiments at the given coordinates, in frame order."""
+        mask = np.ones(len(self.frame), dtype=bool)
+        for axis, value in coords.items():
+            mask &= (self.frame[axis] == value).to_numpy()
+        return list(self.frame.index[mask])
+
+    def restrict(self, exps):
+        """Return the sweep limited to `exps` (unknown names are dropped)."""
+        keep = [e for e in exps if e in self.frame.index]
+        return SweepAxes(self.frame.loc[keep])
+
+    def baselines(self, baseline):
+        """
+        Map every experiment to the experiment with the same coordinates
+        except for the `baseline` axes ({axis: value}). Experiments without
+        such a baseline are left out.
+        """
+        keys = self.axes
+        target = self.frame.assign(**baseline)
+        lookup = self.frame.reset_index().drop_duplicates(keys)
+        merged = target.reset_index().merge(lookup, on=keys, how='left', suffixes=('', '_baseline'))
+        merged = merged.dropna(subset=['Exp_baseline'])
+        return dict(zip(merged['Exp'], merged['Exp_baseline']))
+
+
+def _numeric(column):
+    try:
+        numbers = pd.to_numeric(column)
+    except (ValueError, TypeError):
+        return column
+    if (numbers == numbers.round()).all():
+        return numbers.astype(np.int64)
+    return numbers
+
+
+def _choose_axes(table, order):
+    """
+    Pick the varying columns of `table` in `order`, skipping every column
+    that is a function of the axes chosen before it.
+    """
+    axes = []
+    for name in order:
+        if table[name].nunique(dropna=False) < 2:
+            continue
+        if axes and (table.groupby(axes, sort=False)[name].nunique(dropna=False) <= 1).all():
+            continue
+        axes.append(name)
+    return axes
+
+
+def axes_from_exps(exps, axes=None, pythia_home=PYTHIA_HOME, knobs_cc=None):
+    """
+    Build a SweepAxes from parsed experiments ([{'NAME':, 'KNOBS':}, ...]).
+    `axes` selects the knobs to use; by default every varying knob that is
+    not determined by an earlier one, in command-line order.
+    """
+    defaults, vectors = knob_defaults(knobs_cc)
+    rows = []
+    order = []
+    explicit = []
+    for exp in exps:
+        knobs = expand_knobs(exp['KNOBS'], pythia_home, vectors)
+        rows.append(knobs)
+        for token in exp['KNOBS'].split():
+            name = token[2:].partition('=')[0]
+            if token.startswith('--') and name != 'config' and name not in explicit:
+                explicit.append(name)
+        for name in knobs:
+            if name not in order:
+                order.append(name)
+    table = pd.DataFrame(rows, index=pd.Index([e['NAME'] for e in exps], name='Exp'), columns=order)
+    for name in order:
+        table[name] = table[name].fillna(defaults.get(name, 'none' if name in vectors else ''))
+    if axes is None:
+        # Knobs given on the experiment line come before those of config files
+        order = explicit + [n for n in order if n not in explicit and n != 'config']
+        axes = _choose_axes(table, order)
+    frame = table[list(axes)].copy()
+    for name in frame.columns:
+        frame[name] = _numeric(frame[name])
+    return SweepAxes(frame)
+
+
+def load_sweep(exp_file, axes=None, pythia_home=PYTHIA_HOME):
+    """Build the SweepAxes of every experiment of an .exp file."""
+    return axes_from_exps(parse_exp(exp_file), axes=axes, pythia_home=pythia_home)
+
+
+_NAME_AXIS = re.compile(r'^([A-Za-z]+)(\d+(?:\.\d+)?)$')
+
+
+def axes_from_names(exps):
+    """
+    Build a SweepAxes from experiment names alone: `_<AXIS><number>` tokens
+    (e.g. `_MTPS150`) are axes, the remaining tokens form the `name` axis.
+    Experiments without an axis token get NaN on that axis.
+    """
+    rows = []
+    for exp in exps:
+        row = {}
+        name = []
+        for token in exp.split('_'):
+            m = _NAME_AXIS.match(token)
+            if m and name:
+                row[m.group(1)] = float(m.group(2))
+            else:
+                name.append(token)
+        row['name'] = '_'.join(name)
+        rows.append(row)
+    frame = pd.DataFrame(rows, index=pd.Index(list(exps), name='Exp'))
+    frame = frame[['name'] + [c for c in frame.columns if c != 'name']]
+    for name in frame.columns[1:]:
+        if frame[name].notna().all():
+            frame[name] = _numeric(frame[name])
+    return SweepAxes(frame)
+
+
+def sweep_speedups(cube, sweep, metric='Core_0_IPC', baseline=None, by=None, strict=False,
+                   ci=None, resamples=DEFAULT_RESAMPLES, seed=0):
+    """
+    Speedups of every experiment of `sweep` present in the cube over its
+    baseline at the same coordinates (`baseline` = {axis: value}), grouped
+    by the axes in `by` (default: all axes). Return a DataFrame indexed by
+    those axes with Count, Geomean and Mean over all usable (trace, exp)
+    ratios of each group, and the contributing experiments in Exps. With
+    a confidence level `ci` (e.g. 0.95), Low and High hold the bootstrap
+    interval of each Geomean (traces resampled, see bootstrap.py).
+    """
+    sweep = sweep.restrict([e for e in sweep.exps if cube.has_exp(e)])
+    pairs = sweep.baselines(baseline or {})
+    exps = [e for e in sweep.exps if e in pairs and pairs[e] != e]
+    result = compute_speedups(cube, metric=metric, baseline=pairs, exps=exps, strict=strict)
+    by = sweep.axes if by is None else list(by)
+
+    rows, cols = np.nonzero(result.usable)
+    data = sweep.frame.loc[exps].iloc[cols][by].reset_index()
+    data['LogRatio'] = np.log(result.ratios[rows, cols])
+    data['Ratio'] = result.ratios[rows, cols]
+    grouped = data.groupby(by, sort=True)
+    out = pd.DataFrame({
+        'Count': grouped['Ratio'].count(),
+        'Geomean': np.exp(grouped['LogRatio'].mean()),
+        'Mean': grouped['Ratio'].mean(),
+        'Exps': grouped['Exp'].agg(lambda e: sorted(set(e))),
+    })
+    if ci is not None:
+        keys = sweep.frame.loc[exps, by]
+        groups = list(keys.itertuples(index=False, name=None)) if len(by) > 1 else list(keys[by[0]])
+        boot = bootstrap_means(result.ratios, result.usable, groups=groups, log=True,
+                               resamples=resamples, level=ci, seed=seed).summary()
+        if len(by) > 1:
+            boot.index = pd.MultiIndex.from_tuples(boot.index, names=by)
+        else:
+            boot.index.name = by[0]
+        out = out.join(boot[['Low', 'High']])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Speedups aggregated over the sweep axes of an experiment file')
+    parser.add_argument('--exp', required=True, help='experiment file')
+    parser.add_argument('--rollup', help='rollup CSV or columnar directory (default: only print the axes)')
+    parser.add_argument('--metric', default='Core_0_IPC', help='metric to compare (default: %(default)s)')
+    parser.add_argument('--baseline', action='append', default=[], metavar='AXIS=VALUE',
+                        help='coordinates of the baseline experiment (repeatable)')
+    parser.add_argument('--axes', help='comma separated knobs to use as axes (default: varying knobs)')
+    parser.add_argument('--by', help='comma separated axes to group by (default: all axes)')
+    parser.add_argument('--ci', type=float, help='add bootstrap confidence bounds at this level (e.g. 0.95)')
+    parser.add_argument('--pythia-home', default=PYTHIA_HOME, help='value of $(PYTHIA_HOME) (default: %(default)s)')
+    parser.add_argument('--out', help='also write the result to this CSV file')
+    args = parser.parse_args()
+
+    axes = args.axes.split(',') if args.axes else None
+    sweep = load_sweep(args.exp, axes=axes, pythia_home=args.pythia_home)
+    if args.rollup is None:
+        table = sweep.frame
+    else:
+        baseline = {}
+        for item in args.baseline:
+            axis, sep, value = item.partition('=')
+            if not sep or axis not in sweep.axes:
+                parser.error('bad baseline %s (axes: %s)' % (item, ', '.join(sweep.axes)))
+            baseline[axis] = sweep.frame[axis].dtype.type(value)
+        cube = load_cube(args.rollup, metrics=[args.metric])
+        by = args.by.split(',') if args.by else None
+        table = sweep_speedups(cube, sweep, metric=args.metric, baseline=baseline, by=by,
+                               ci=args.ci).drop(columns='Exps')
+    print(table.to_string())
+    if args.out:
+        table.to_csv(args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+Decode a ChampSim trace once and fan the decoded stream out to every
+simulator instance that reads it.
+
+ChampSim popens `xz -dc`/`gunzip -c` for every core of every run, so a sweep
+that runs the same trace under several prefetchers at once (or a multi-core
+tlist that lists the same trace for every core) decompresses it once per
+consumer. TraceServer.share() gives each consumer a named pipe instead, with
+the same basename as the original trace so ChampSim derives the same seed
+from it, and a single decoder per trace feeds all pipes. ChampSim reads a
+named pipe with `cat` instead of a decompressor (see main.cc).
+
+Every consumer has a bounded queue. The decoder runs at the pace of the
+slowest consumer, but a consumer that falls more than `max_lag` bytes
+behind the fastest one is detached: it drains its queue and continues on a
+private decoder that skips the bytes it has already received, so one slow
+simulation never holds back the others. When a simulation reaches the end
+of its trace, ChampSim reopens it; the pipe is then served again from a
+private decoder.
+
+Usage:
+    server = TraceServer()
+    share = server.share([job.inputs for job in group])
+    ... run job j with share.inputs[j] as its -traces ...
+    share.release(j)
+"""
+
+import errno
+import fcntl
+import itertools
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+CHUNK_SIZE = 1 << 20
+MAX_LAG = 256 << 20
+POLL_INTERVAL = 0.05
+
+
+def decode_command(path):
+    """Return the decompressor main.cc would use for `path`, or None."""
+    ext = os.path.splitext(path)[1]
+    if ext.startswith('.g'):
+        return ['gunzip', '-c', path]
+    if ext.startswith('.x'):
+        return ['xz', '-dc', path]
+    return None
+
+
+class TraceConsumer(object):
+    """One named pipe fed from a shared TraceStream."""
+
+    def __init__(self, path, fifo, chunk_size, depth):
+        self.path = path
+        self.fifo = fifo
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=depth)
+        self.written = 0
+        self.detached = False
+        self.closed = False
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    def close(self):
+        self.closed = True
+
+    def _open(self):
+        """Wait for the simulator to open the pipe; None if closed first."""
+        while not self.closed:
+            try:
+                fd = os.open(self.fifo, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO:
+                    raise
+                time.sleep(POLL_INTERVAL)
+                continue
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_NONBLOCK)
+            return fd
+        return None
+
+    def _finish_pass(self, fd):
+        """
+        Close the pipe so the reader sees the end of the trace. The pipe is
+        replaced by a new one first: the old reader may still have it open,
+        and reopening the same pipe would make it read the next pass instead.
+        """
+        tmp = self.fifo + '.next'
+        os.mkfifo(tmp)
+        os.replace(tmp, self.fifo)
+        os.close(fd)
+
+    def _write(self, fd, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def _private(self, fd, skip):
+        """Serve the trace from a decoder of our own, skipping `skip` bytes."""
+        proc = subprocess.Popen(decode_command(self.path), stdout=subprocess.PIPE)
+        try:
+            while not self.closed:
+                chunk = proc.stdout.read(self.chunk_size)
+                if not chunk:
+                    break
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                self._write(fd, chunk[skip:])
+                self.written += len(chunk) - skip
+                skip = 0
+        finally:
+            proc.kill()
+            proc.wait()
+
+    def _serve(self):
+        fd = self._open()
+        try:
+            if fd is None:
+                return
+            while not self.closed:
+                try:
+                    chunk = self.queue.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if self.detached:
+                        self._private(fd, self.written)
+                        break
+                    continue
+                if chunk is None:
+                    break
+                self._write(fd, chunk)
+                self.written += len(chunk)
+            self._finish_pass(fd)
+            fd = None
+
+            # ChampSim reopens the trace when it reaches its end.
+            while True:
+                fd = self._open()
+                if fd is None:
+                    return
+                self._private(fd, 0)
+                self._finish_pass(fd)
+                fd = None
+        except BrokenPipeError:
+            pass
+        finally:
+            if fd is not None:
+                os.close(fd)
+            self.closed = True
+
+
+class TraceStream(object):
+    """A single decoder of `path` feeding several TraceConsumers."""
+
+    def __init__(self, path, consumers, chunk_size, max_lag):
+        self.path = path
+        self.consumers = consumers
+        self.chunk_size = chunk_size
+        self.max_lag = max_lag
+        self.thread = threading.Thread(target=self._pump, daemon=True)
+
+    def start(self):
+        for consumer in self.consumers:
+            consumer.thread.start()
+        self.thread.start()
+
+    def _active(self):
+        return [c for c in self.consumers if not c.detached and not c.closed]
+
+    def _put(self, consumer, chunk):
+        while not consumer.closed:
+            try:
+                consumer.queue.put(chunk, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                lead = max(c.written for c in self.consumers)
+                if lead - consumer.written >= self.max_lag:
+                    consumer.detached = True
+                    return
+
+    def _pump(self):
+        proc = subprocess.Popen(decode_command(self.path), stdout=subprocess.PIPE)
+        try:
+            while True:
+                active = self._active()
+                if not active:
+                    return
+                chunk = proc.stdout.read(self.chunk_size)
+                for consumer in active:
+                    self._put(consumer, chunk or None)
+                if not chunk:
+                    return
+        finally:
+            proc.kill()
+            proc.wait()
+
+
+class TraceShare(object):
+    """
+    Named pipes handed out to a group of simulations. inputs[j] is the
+    -traces list of simulation j.
+    """
+
+    def __init__(self, inputs, streams, consumers, directories):
+        self.inputs = inputs
+        self.streams = streams
+        self.consumers = consumers
+        self.directories = directories
+        self.released = set()
+
+    def start(self):
+        for stream in self.streams:
+            stream.start()
+
+    def release(self, j):
+        """Stop serving simulation j; remove the pipes once all are released."""
+        for consumer in self.consumers[j]:
+            consumer.close()
+        self.released.add(j)
+        if len(self.released) == len(self.inputs):
+            for directory in self.directories:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+class TraceServer(object):
+    """Hands out named pipes backed by shared decoders."""
+
+    def __init__(self, directory=None, chunk_size=CHUNK_SIZE, max_lag=MAX_LAG):
+        self.directory = tempfile.mkdtemp(prefix='trace_server.', dir=directory)
+        self.chunk_size = chunk_size
+        self.max_lag = max_lag
+        self._ids = itertools.count()
+
+    def share(self, inputs):
+        """
+        `inputs` holds the trace list of every simulation of a group. Traces
+        that are read more than once within the group are replaced by named
+        pipes served from one decoder; all other paths are kept.
+        """
+        users = {}
+        for j, paths in enumerate(inputs):
+            for k, path in enumerate(paths):
+                if decode_command(path) is not None and os.path.isfile(path):
+                    users.setdefault(path, []).append((j, k))
+
+        shared = [list(paths) for paths in inputs]
+        consumers = [[] for _ in inputs]
+        streams = []
+        directories = []
+        depth = max(1, self.max_lag // self.chunk_size)
+        for path, readers in users.items():
+            if len(readers) < 2:
+                continue
+            stream_consumers = []
+            for j, k in readers:
+                directory = os.path.join(self.directory, str(next(self._ids)))
+                os.mkdir(directory)
+                fifo = os.path.join(directory, os.path.basename(path))
+                os.mkfifo(fifo)
+                consumer = TraceConsumer(path, fifo, self.chunk_size, depth)
+                shared[j][k] = fifo
+                consumers[j].append(consumer)
+                stream_consumers.append(consumer)
+                directories.append(directory)
+            streams.append(TraceStream(path, stream_consumers, self.chunk_size, self.max_lag))
+        return TraceShare(shared, streams, consumers, directories)
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
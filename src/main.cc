@@ -5,6 +5,7 @@
 #include "uncore.h"
 #include "knobs.h"
 #include <fstream>
+#include <sys/stat.h>
 
 #define FIXED_FLOAT(x) std::fixed << std::setprecision(5) << (x)
 
@@ -662,14 +663,22 @@ int main(int argc, char** argv)
             char *full_name = ooo_cpu[count_traces].trace_string,
                  *last_dot = strrchr(ooo_cpu[count_traces].trace_string, '.');
 
-			ifstream test_file(full_name);
-			if(!test_file.good()){
-				printf("TRACE FILE DOES NOT EXIST\n");
-				assert(false);
-			}
+            // a named pipe (scripts/trace_server.py) carries an already decoded trace,
+            // and opening it just to test it would disconnect the writer
+            struct stat trace_stat;
+            bool trace_fifo = (stat(full_name, &trace_stat) == 0) && S_ISFIFO(trace_stat.st_mode);
 
+            if (!trace_fifo) {
+                ifstream test_file(full_name);
+                if(!test_file.good()){
+                    printf("TRACE FILE DOES NOT EXIST\n");
+                    assert(false);
+                }
+            }
 
-            if (full_name[last_dot - full_name + 1] == 'g') // gzip format
+            if (trace_fifo)
+                sprintf(ooo_cpu[count_traces].gunzip_command, "cat %s", argv[i]);
+            else if (full_name[last_dot - full_name + 1] == 'g') // gzip format
                 sprintf(ooo_cpu[count_traces].gunzip_command, "gunzip -c %s", argv[i]);
             else if (full_name[last_dot - full_name + 1] == 'x') // xz
                 sprintf(ooo_cpu[count_traces].gunzip_command, "xz -dc %s", argv[i]);
@@ -1,4 +1,9 @@
 #!/bin/bash
 
 echo "Original cmd-> $1 $2"
-$1 $2
+if [ -n "$3" ]; then
+	# wrapper.sh <exe> <knobs> <ledger> <trace> <exp>: record the run in a job ledger
+	python3 $PYTHIA_HOME/scripts/job_ledger.py run --db $3 --trace $4 --exp $5 -- "$1 $2"
+else
+	$1 $2
+fi